@@ -39,6 +39,37 @@ class GlobalConfig(BaseConfig):
     TERMINAL: Optional[List[str]] = []
     ACCEPTED_LANGUAGES: List[str] = []
     SUBMISSION_QUEUE_KEY: Optional[str] = None
+    # "list" (LPUSH) or "stream" (XADD to a consumer-group stream); must match the judge
+    SUBMISSION_QUEUE_BACKEND: str = "list"
+    SUBMISSION_STREAM_KEY: Optional[str] = None  # defaults to "<SUBMISSION_QUEUE_KEY>:stream"
+    # priority queue for "run" mode requests, served by the judges' run slots
+    SUBMISSION_RUN_QUEUE_KEY: Optional[str] = None  # defaults to "<SUBMISSION_QUEUE_KEY>:run"
+    # reuse the result of an identical earlier submission instead of judging again
+    SUBMISSION_REUSE: bool = True
+    # an identical submission pending for longer than this is not waited on
+    SUBMISSION_COALESCE_WINDOW_SEC: int = 600
+    # a coalesced submission still pending this long after it was sent is
+    # queued on its own (its leader's job was lost); checked every
+    # SUBMISSION_FOLLOWER_SWEEP_SEC (0 = never)
+    SUBMISSION_FOLLOWER_TIMEOUT_SEC: int = 900
+    SUBMISSION_FOLLOWER_SWEEP_SEC: int = 60
+    # Redis hash counting judged / reused / coalesced submissions
+    SUBMISSION_REUSE_STATS_KEY: str = "submission_reuse:stats"
+    # SSE clients share one pub/sub connection per process; each buffers at
+    # most this many messages, a slow client loses its oldest ones first
+    SSE_CLIENT_QUEUE_SIZE: int = 256
+    # per-submission Redis stream of status/progress events (prefix + id),
+    # replayed to late or reconnecting SSE clients; must match the judge's
+    # EVENT_LOG_* (TTL 0 = no log)
+    SUBMISSION_EVENTS_KEY_PREFIX: str = "submission_events:"
+    SUBMISSION_EVENTS_MAXLEN: int = 1000
+    SUBMISSION_EVENTS_TTL_SEC: int = 3600
+    # listing totals are cached per user (and user+problem) for this long,
+    # and dropped when the user submits (0 = count on every request)
+    SUBMISSION_COUNT_CACHE_PREFIX: str = "submission_count:"
+    SUBMISSION_COUNT_CACHE_TTL_SEC: int = 300
+    # create the indexes declared on the models at startup (see core/indexes.py)
+    ENSURE_INDEXES: bool = True
 
     @field_validator("TERMINAL", "ACCEPTED_LANGUAGES", mode="before")
     def _split_str_to_list(cls, v):
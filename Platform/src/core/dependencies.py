@@ -3,10 +3,12 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from Platform.src.config.config import config
 
 from redis.asyncio import Redis
+from Platform.src.submission_management.event_hub import SubmissionEventHub
 
 _client: AsyncIOMotorClient | None = None
 _engine: AIOEngine | None = None
 _redis: Redis | None = None
+_event_hub: SubmissionEventHub | None = None
 
 def get_motor_client() -> AsyncIOMotorClient:
     global _client
@@ -29,3 +31,15 @@ async def get_redis() -> Redis:
     if _redis is None:
         _redis = await Redis.from_url(config.REDIS_URL)
     return _redis
+
+async def get_event_hub() -> SubmissionEventHub:
+    global _event_hub
+    if _event_hub is None:
+        _event_hub = SubmissionEventHub(await get_redis(), config.SSE_CLIENT_QUEUE_SIZE)
+    return _event_hub
+
+async def close_event_hub() -> None:
+    global _event_hub
+    if _event_hub is not None:
+        await _event_hub.close()
+        _event_hub = None
@@ -0,0 +1,165 @@
+"""
+Index registry: every collection's indexes are declared on its ODMantic
+model (`Field(unique=True/index=True)` or `model_config["indexes"]`), and
+the models listed here are checked against the database.
+
+    python -m Platform.src.core.indexes          # create missing indexes
+    python -m Platform.src.core.indexes --check  # only report; exit 1 if any is missing
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Type
+
+from odmantic import AIOEngine, Model
+from odmantic.index import ODMBaseIndex
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from Platform.src.user_management.models import User
+from Platform.src.problem_management.models import Problem, TestCase, Asset
+from Platform.src.submission_management.models import Submission
+
+logger = logging.getLogger(__name__)
+
+INDEXED_MODELS: List[Type[Model]] = [User, Problem, TestCase, Asset, Submission]
+
+
+class IndexReport(NamedTuple):
+    """Index names as "<collection>.<index>"."""
+    created: List[str]
+    missing: List[str]  # declared but absent (or different); left as is when only checking
+    extra: List[str]  # present but not declared; never dropped
+    failed: List[str]  # could not be built, e.g. duplicates under a unique index
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.failed
+
+
+def declared_indexes(model: Type[Model]) -> List[IndexModel]:
+    return [
+        index.get_pymongo_index() if isinstance(index, ODMBaseIndex) else index
+        for index in model.__indexes__()
+    ]
+
+
+async def ensure_indexes(
+    engine: AIOEngine,
+    models: Optional[Sequence[Type[Model]]] = None,
+    apply: bool = True,
+) -> IndexReport:
+    """
+    Compare each model's declared indexes with the collection's. With
+    `apply`, missing ones are created, and ones whose keys or options
+    changed are dropped and rebuilt; running it again changes nothing.
+    A rebuild that cannot succeed (duplicates under a new unique index)
+    is reported as failed and the old index stays. Undeclared indexes are
+    only reported.
+    """
+    report = IndexReport([], [], [], [])
+    for model in models if models is not None else INDEXED_MODELS:
+        collection = engine.get_collection(model)
+        existing = await collection.index_information()
+        declared = declared_indexes(model)
+        declared_names = {index.document["name"] for index in declared}
+
+        for index in declared:
+            name = index.document["name"]
+            label = f"{collection.name}.{name}"
+            current = existing.get(name)
+            if current is not None and _same_index(current, index.document):
+                continue
+            if not apply:
+                report.missing.append(label)
+                continue
+            if (
+                current is not None and index.document.get("unique")
+                and await _has_duplicates(collection, index.document)
+            ):
+                # dropping the old index first would leave the collection with none
+                logger.error("Could not rebuild index %s: duplicate keys; kept the old one", label)
+                report.failed.append(label)
+                continue
+            try:
+                if current is not None:
+                    await collection.drop_index(name)
+                await collection.create_indexes([index])
+                report.created.append(label)
+            except OperationFailure as e:
+                logger.error("Could not build index %s: %s", label, e)
+                report.failed.append(label)
+                if current is not None:
+                    await _restore_index(collection, name, current)
+
+        report.extra.extend(
+            f"{collection.name}.{name}"
+            for name in existing
+            if name != "_id_" and name not in declared_names
+        )
+
+    if report.created:
+        logger.info("Created indexes: %s", ", ".join(report.created))
+    if report.missing:
+        logger.warning("Missing indexes: %s", ", ".join(report.missing))
+    if report.extra:
+        logger.warning("Undeclared indexes (left in place): %s", ", ".join(report.extra))
+    return report
+
+
+def _same_index(info: Dict[str, Any], document: Dict[str, Any]) -> bool:
+    """index_information() entry vs a declared IndexModel document."""
+    return (
+        [(field, int(direction)) for field, direction in info["key"]]
+        == [(field, int(direction)) for field, direction in document["key"].items()]
+        and bool(info.get("unique")) == bool(document.get("unique"))
+        and info.get("partialFilterExpression") == document.get("partialFilterExpression")
+    )
+
+
+async def _has_duplicates(collection: Any, document: Dict[str, Any]) -> bool:
+    """Whether documents covered by the index share its key."""
+    pipeline: List[Dict[str, Any]] = []
+    if document.get("partialFilterExpression"):
+        pipeline.append({"$match": document["partialFilterExpression"]})
+    pipeline += [
+        {"$group": {
+            "_id": {f"k{i}": f"${field}" for i, field in enumerate(document["key"])},
+            "n": {"$sum": 1},
+        }},
+        {"$match": {"n": {"$gt": 1}}},
+        {"$limit": 1},
+    ]
+    return bool(await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1))
+
+
+async def _restore_index(collection: Any, name: str, info: Dict[str, Any]) -> None:
+    """Put back an index dropped for a rebuild that then failed."""
+    options = {k: v for k, v in info.items() if k not in ("key", "v", "ns")}
+    try:
+        await collection.create_indexes([IndexModel(info["key"], name=name, **options)])
+        logger.warning("Restored the previous %s.%s", collection.name, name)
+    except OperationFailure as e:
+        logger.error("Could not restore index %s.%s: %s", collection.name, name, e)
+
+
+async def _main(check: bool) -> int:
+    from Platform.src.core.dependencies import get_engine
+
+    report = await ensure_indexes(get_engine(), apply=not check)
+    for title, names in (
+        ("created", report.created), ("missing", report.missing),
+        ("extra", report.extra), ("failed", report.failed),
+    ):
+        for name in names:
+            print(f"{title:8} {name}")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or check the declared MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="only report, change nothing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.check)))
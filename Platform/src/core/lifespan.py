@@ -1,13 +1,46 @@
+import asyncio
+import contextlib
+import logging
 from contextlib import asynccontextmanager
-from Platform.src.core.dependencies import get_motor_client, get_engine
+from Platform.src.core.dependencies import get_motor_client, get_engine, get_redis, close_event_hub
+from Platform.src.core.indexes import ensure_indexes
+from Platform.src.submission_management.service import requeue_stranded_followers
+from Platform.src.config.config import config
 from Platform.src.config.logging_config import configure_logging
 
+logger = logging.getLogger(__name__)
+
 @asynccontextmanager
 async def lifespan(app):
     configure_logging()
     get_motor_client()
     get_engine()
+    if config.ENSURE_INDEXES:
+        try:
+            await ensure_indexes(get_engine())
+        except Exception as e:
+            # serve anyway; `python -m Platform.src.core.indexes` can apply them later
+            logger.error("Could not check indexes at startup: %s", e, exc_info=True)
+
+    sweeper = None
+    if config.SUBMISSION_FOLLOWER_TIMEOUT_SEC > 0 and config.SUBMISSION_FOLLOWER_SWEEP_SEC > 0:
+        sweeper = asyncio.create_task(_sweep_followers())
 
     yield
 
+    if sweeper is not None:
+        sweeper.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await sweeper
+    await close_event_hub()
     get_motor_client().close()
+
+
+async def _sweep_followers():
+    """Requeue coalesced submissions whose leader never settled them."""
+    while True:
+        await asyncio.sleep(config.SUBMISSION_FOLLOWER_SWEEP_SEC)
+        try:
+            await requeue_stranded_followers(get_engine(), await get_redis())
+        except Exception as e:
+            logger.error("Could not requeue stranded submissions: %s", e, exc_info=True)
@@ -1,6 +1,6 @@
 from .asset import Asset
 from .testcase import TestCase
-from .problem import Problem, Description, Constraints, SampleTestCase
+from .problem import Problem, Description, Constraints, SampleTestCase, CheckerConfig
 
 __all__ = ['Asset', 'TestCase', 'Problem',
-           'Constraints', 'SampleTestCase']
\ No newline at end of file
+           'Constraints', 'SampleTestCase', 'CheckerConfig']
\ No newline at end of file
@@ -1,7 +1,7 @@
 import datetime
 from typing import Optional
 from pydantic import ConfigDict
-from odmantic import Model, Field, ObjectId
+from odmantic import Model, Field, Index, ObjectId
 class Asset(Model):
     problemId: ObjectId
     filename: str
@@ -15,4 +15,10 @@ class Asset(Model):
     isPublic: bool
     uploadedAt: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
 
-    model_config = ConfigDict(collection="assets", arbitrary_types_allowed=True)
+    model_config = ConfigDict(
+        collection="assets",
+        arbitrary_types_allowed=True,
+        indexes=lambda: [
+            Index(Asset.filePath, Asset.pId, Asset.purpose, unique=True, name="filePath_pId_purpose_unique"),
+        ],
+    )
@@ -24,13 +24,45 @@ class SampleTestCase(EmbeddedModel):
     explanation: str = ""
 
 
+CHECKER_TYPES = ("exact", "tokens", "float", "custom")
+
+
+class CheckerConfig(EmbeddedModel):
+    """
+    How the judge compares program output with the expected output:
+    - exact: equal after stripping leading/trailing whitespace (default)
+    - tokens: same whitespace-separated tokens
+    - float: tokens, numbers within absTolerance or relTolerance
+    - custom: a checker program (language + sourceCode), run as
+      `checker <input> <expected> <output>`; exit 0 accepts, 1/2 rejects
+    """
+    type: str = "exact"
+    absTolerance: float = 1e-6
+    relTolerance: float = 1e-6
+    language: Optional[str] = None
+    sourceCode: Optional[str] = None
+
+    @field_validator("type")
+    @classmethod
+    def _known_type(cls, v: str):
+        if v not in CHECKER_TYPES:
+            raise ValueError(f"checker type must be one of {', '.join(CHECKER_TYPES)}")
+        return v
+
+    @model_validator(mode="after")
+    def _custom_has_program(self):
+        if self.type == "custom" and not (self.language and self.sourceCode):
+            raise ValueError("a custom checker needs language and sourceCode")
+        return self
+
+
 class Statistics(EmbeddedModel):
     submissions: int = 0
     accepted: int = 0
 
 
 class Problem(Model):
-    pId: int
+    pId: int = Field(unique=True)
     title: str
     slug: str = Field(default="")
     description: Description
@@ -41,7 +73,10 @@ class Problem(Model):
     statistics: Statistics = Field(default_factory=Statistics)
     visibility: str = Field(default="public")
     assets: Optional[List[ObjectId]] = []
-    createdAt: datetime = Field(default_factory=datetime.utcnow)
+    # bumped whenever the problem's test cases change; drives test-case ETags
+    testSetVersion: int = 0
+    checker: CheckerConfig = Field(default_factory=CheckerConfig)
+    createdAt: datetime = Field(default_factory=datetime.utcnow, index=True)  # listing order
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
@@ -1,7 +1,8 @@
 from pydantic import ConfigDict
 from datetime import datetime
 from typing import Optional, Dict, Any
-from odmantic import Model, Field, ObjectId
+from odmantic import Model, Field, Index, ObjectId
+from pymongo import IndexModel
 
 class TestCase(Model):
     pId: int
@@ -15,5 +16,17 @@ class TestCase(Model):
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
-        collection="test_cases"
+        collection="test_cases",
+        indexes=lambda: [
+            Index(TestCase.problemId, TestCase.isHidden, name="problemId_isHidden"),
+            # the scraper's dedup keys; partial, as the other kind leaves them null
+            IndexModel(
+                [("pId", 1), ("input", 1), ("expectedOutput", 1)], name="pId_inline_unique",
+                unique=True, partialFilterExpression={"isLargeFile": False},
+            ),
+            IndexModel(
+                [("pId", 1), ("fileReferences.inputFileId", 1)], name="pId_file_unique",
+                unique=True, partialFilterExpression={"isLargeFile": True},
+            ),
+        ],
     )
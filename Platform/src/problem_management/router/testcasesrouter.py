@@ -1,7 +1,7 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
 from bson import ObjectId
 from bson.errors import InvalidId
 from odmantic import AIOEngine
@@ -25,7 +25,7 @@ router = APIRouter(
 )
 
 
-async def ensure_problem_exists(problem_id: str, engine: AIOEngine):
+async def ensure_problem_exists(problem_id: str, engine: AIOEngine) -> Problem:
     # 1) Validate & convert incoming ID
     try:
         oid = ObjectId(problem_id)
@@ -41,27 +41,62 @@ async def ensure_problem_exists(problem_id: str, engine: AIOEngine):
     if not problem:
         logger.warning(f"Problem not found in DB: {oid}")
         raise HTTPException(status_code=404, detail="Problem does not exist")
+    return problem
+
+
+def testcase_etag(problem: Optional[Problem], variant: str) -> Optional[str]:
+    """
+    ETag of a problem's test-case listing, derived from its testSetVersion,
+    so a conditional GET can be answered without loading any test case.
+    """
+    if problem is None:
+        return None
+    return f'W/"{problem.id}-{problem.testSetVersion}-{variant}"'
+
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
 
 
 @router.get("", response_model=AllTestCasesResponse)
 async def list_test_cases(
     problem_id: str,
+    request: Request,
+    response: Response,
     include_hidden: bool = Query(False, alias="includeHidden"),
     engine: AIOEngine = Depends(engine_dep),
 ) -> AllTestCasesResponse:
-    await ensure_problem_exists(problem_id, engine)
+    problem = await ensure_problem_exists(problem_id, engine)
+    etag = testcase_etag(problem, "all" if include_hidden else "visible")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     data: List[Dict[str, Any]] = await get_all_test_cases(
         problem_id, include_hidden, engine
     )
+    if etag:
+        response.headers["ETag"] = etag
     return AllTestCasesResponse(testCases=data)
 
 
 @router.get("/public", response_model=PublicTestCasesResponse)
 async def list_public_test_cases(
     problem_id: str,
+    request: Request,
+    response: Response,
     engine: AIOEngine = Depends(engine_dep),
 ) -> PublicTestCasesResponse:
-    await ensure_problem_exists(problem_id, engine)
+    problem = await ensure_problem_exists(problem_id, engine)
+    etag = testcase_etag(problem, "public")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     data: List[Dict[str, Any]] = await get_public_test_cases(problem_id, engine)
+    if etag:
+        response.headers["ETag"] = etag
     return PublicTestCasesResponse(testCases=data)
 
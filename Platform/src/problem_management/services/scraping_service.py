@@ -4,6 +4,7 @@ import zipfile
 import logging
 import asyncio
 from bson import ObjectId
+from odmantic.exceptions import DuplicateKeyError
 from Platform.src.config.config import config, DevConfig
 from Platform.src.config.logging_config import configure_logging
 from Platform.src.core.dependencies import get_engine
@@ -76,8 +77,7 @@ class ScrapingService:
                 purpose="problem-image",
                 isPublic=True
             )
-            saved_asset = await self.engine.save(asset)
-            asset_ids.append(saved_asset.id)
+            asset_ids.append(await self.save_asset_once(asset))
 
         # Construct and return the Problem document
         return Problem(
@@ -122,16 +122,12 @@ class ScrapingService:
             title = li.a.text.strip()
             problem_doc = await self.build_problem(url, title)
 
-            # 1) Check if this problem already exists
-            existing = await self.engine.find_one(
-                Problem, Problem.pId == problem_doc.pId
-            )
-            if existing:
-                logger.debug("Skipped Problem '%s' (already exists)", title)
-            else:
-                # 2) Insert new
+            # insert; the unique pId index rejects problems already stored
+            try:
                 saved = await self.engine.save(problem_doc)
                 logger.info("Saved new Problem '%s' → %s", title, saved.id)
+            except DuplicateKeyError:
+                logger.debug("Skipped Problem '%s' (already exists)", title)
 
             await asyncio.sleep(5)
 
@@ -159,18 +155,21 @@ class ScrapingService:
             isPublic=False
         )
 
-        # Check asset uniqueness (e.g. by path & pId & purpose)
-        existing = await self.engine.find_one(
-            Asset,
-            Asset.filePath == path,
-            Asset.pId == cses_id,
-            Asset.purpose == purpose
-        )
-        if existing:
-            return existing.id
+        return await self.save_asset_once(asset)
 
-        saved_asset = await self.engine.save(asset)
-        return saved_asset.id
+    async def save_asset_once(self, asset: Asset) -> ObjectId:
+        """Insert the asset, or return the id of the one with the same path, pId and purpose."""
+        try:
+            saved_asset = await self.engine.save(asset)
+            return saved_asset.id
+        except DuplicateKeyError:
+            existing = await self.engine.find_one(
+                Asset,
+                Asset.filePath == asset.filePath,
+                Asset.pId == asset.pId,
+                Asset.purpose == asset.purpose
+            )
+            return existing.id
 
 
     async def fetch_and_store_testcases(self, cses_id: int, problemId: ObjectId) -> None:
@@ -192,9 +191,7 @@ class ScrapingService:
             logger.error("Failed to download ZIP (%d)", download.status_code)
             return
 
-        # get the raw Motor collection for TestCase
-        tc_coll = self.engine.get_collection(TestCase)
-
+        added = 0
         with zipfile.ZipFile(io.BytesIO(download.content)) as z:
             ins = sorted(f for f in z.namelist() if f.endswith(".in"))
             outs = sorted(f for f in z.namelist() if f.endswith(".out"))
@@ -213,38 +210,33 @@ class ScrapingService:
                         out_b, cses_id, problemId, outs[idx], "test_output"
                     )
                     refs = {"inputFileId": in_id, "outputFileId": out_id}
-
-                    # raw Mongo filter for dict sub-field
-                    filter_q = {
-                        "pId": cses_id,
-                        "isLargeFile": True,
-                        "fileReferences.inputFileId": in_id
-                    }
-
                 else:
                     refs = None
-                    filter_q = {
-                        "pId": cses_id,
-                        "isLargeFile": False,
-                        "input": inp,
-                        "expectedOutput": out
-                    }
-
-                existing_tc = await tc_coll.find_one(filter_q)
-                if existing_tc:
-                    logger.debug("Skipped TC %d for %s (already exists)", idx + 1, cses_id)
-                else:
-                    tc = TestCase(
-                        pId=cses_id,
-                        problemId=problemId,
-                        input=None if is_large else inp,
-                        expectedOutput=None if is_large else out,
-                        isHidden=True,
-                        isLargeFile=is_large,
-                        fileReferences=refs,
-                    )
+
+                tc = TestCase(
+                    pId=cses_id,
+                    problemId=problemId,
+                    input=None if is_large else inp,
+                    expectedOutput=None if is_large else out,
+                    isHidden=True,
+                    isLargeFile=is_large,
+                    fileReferences=refs,
+                )
+                # the unique test-case indexes reject what is already stored
+                try:
                     saved_tc = await self.engine.save(tc)
-                    logger.info("Saved TC %d for %s → %s", idx + 1, cses_id, saved_tc.id)
+                except DuplicateKeyError:
+                    logger.debug("Skipped TC %d for %s (already exists)", idx + 1, cses_id)
+                    continue
+                logger.info("Saved TC %d for %s → %s", idx + 1, cses_id, saved_tc.id)
+                added += 1
+
+        if added:
+            # invalidates judge-side test-case caches (ETag is built from it)
+            await self.engine.get_collection(Problem).update_one(
+                {"_id": problemId}, {"$inc": {"testSetVersion": 1}}
+            )
+            logger.info("Added %d TCs for %s, bumped testSetVersion", added, cses_id)
 
         await asyncio.sleep(2)
 
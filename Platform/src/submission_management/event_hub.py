@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionEventHub:
+    """
+    One Redis pub/sub connection per Platform process, shared by every SSE
+    client. A channel is subscribed when its first watcher arrives and
+    unsubscribed when its last one leaves, so the number of Redis
+    connections does not grow with the number of watchers.
+
+    Each watcher reads from its own bounded queue. The reader never waits
+    on a slow client: when a queue is full its oldest message is dropped
+    to make room, so a client always ends with the latest messages,
+    including the terminal status.
+    """
+
+    def __init__(self, redis: Redis, queue_size: int = 256, poll_sec: float = 1.0):
+        self.redis = redis
+        self.queue_size = queue_size
+        self.poll_sec = poll_sec
+        self.dropped = 0  # messages dropped for slow clients, over the hub's life
+        self._pubsub = None
+        self._watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = asyncio.Lock()  # keeps SUBSCRIBE/UNSUBSCRIBE in refcount order
+        self._reader: Optional[asyncio.Task] = None
+
+    @property
+    def channel_count(self) -> int:
+        return len(self._watchers)
+
+    @property
+    def watcher_count(self) -> int:
+        return sum(len(queues) for queues in self._watchers.values())
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        """Queue of the channel's decoded messages while the block runs."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.redis.pubsub()
+            first = channel not in self._watchers
+            self._watchers.setdefault(channel, set()).add(queue)
+            if first:
+                try:
+                    await self._pubsub.subscribe(channel)
+                except Exception:
+                    self._watchers.pop(channel, None)
+                    raise
+                logger.debug("Hub subscribed to channel %s", channel)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        try:
+            yield queue
+        finally:
+            await self._leave(channel, queue)
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as error:
+                logger.warning("Could not close the event hub's pub/sub: %s", error)
+            self._pubsub = None
+        self._watchers.clear()
+
+    # ─── internals ─────────────────────────────────────────────────────────────
+
+    async def _leave(self, channel: str, queue: asyncio.Queue) -> None:
+        async with self._lock:
+            queues = self._watchers.get(channel)
+            if queues is None:
+                return
+            queues.discard(queue)
+            if queues:
+                return
+            del self._watchers[channel]
+            try:
+                await self._pubsub.unsubscribe(channel)
+                logger.debug("Hub unsubscribed from channel %s", channel)
+            except Exception as error:
+                # the connection is gone; it will not resubscribe a dropped channel
+                logger.warning("Could not unsubscribe from %s: %s", channel, error)
+
+    async def _read(self) -> None:
+        """Fan messages out until no channel is watched any more."""
+        backoff = self.poll_sec
+        while self._watchers:
+            try:
+                msg = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.poll_sec
+                )
+                backoff = self.poll_sec
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                # the next read reconnects, and redis-py resubscribes our channels
+                logger.warning("Event hub read failed, retrying in %.1fs: %s", backoff, error)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            if msg is None or msg.get("type") != "message":
+                continue
+            self._dispatch(_decode(msg["channel"]), msg["data"])
+
+    def _dispatch(self, channel: str, raw: Any) -> None:
+        queues = self._watchers.get(channel)
+        if not queues:
+            return
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            logger.warning("Dropping malformed message on %s: %r", channel, raw)
+            return
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+                logger.debug("Slow SSE client on %s, dropped its oldest message", channel)
+            queue.put_nowait(data)
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
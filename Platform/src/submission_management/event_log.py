@@ -0,0 +1,77 @@
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+from Platform.src.config.config import config
+
+logger = logging.getLogger(__name__)
+
+_EVENT_ID = re.compile(r"^\d+-\d+$")
+
+
+def events_key(submission_id: str) -> str:
+    return f"{config.SUBMISSION_EVENTS_KEY_PREFIX}{submission_id}"
+
+
+def event_log_enabled() -> bool:
+    return config.SUBMISSION_EVENTS_TTL_SEC > 0
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[int, int]]:
+    """A stream entry id ("<ms>-<seq>") as a comparable tuple; None if malformed."""
+    if not event_id or not _EVENT_ID.match(event_id):
+        return None
+    ms, seq = event_id.split("-")
+    return int(ms), int(seq)
+
+
+async def append_event(redis: Redis, submission_id: str, message: Dict[str, Any]) -> None:
+    """
+    Log a status the Platform sets itself (a new or reused submission), the
+    way the judge logs the ones it publishes. Never fails the request.
+    """
+    if not event_log_enabled():
+        return
+    key = events_key(submission_id)
+    try:
+        # one round trip for the entry and its TTL
+        pipe = redis.pipeline(transaction=False)
+        pipe.xadd(
+            key, {"data": json.dumps(message)},
+            maxlen=config.SUBMISSION_EVENTS_MAXLEN, approximate=True,
+        )
+        pipe.expire(key, config.SUBMISSION_EVENTS_TTL_SEC)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning("Could not log event for %s: %s", submission_id, e)
+
+
+async def read_events(
+    redis: Redis, submission_id: str, after: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Logged messages after entry `after` (all without one), oldest first, each with its "eventId"."""
+    entries = await redis.xrange(
+        events_key(submission_id), min=f"({after}" if after else "-", max="+"
+    )
+    events = []
+    for entry_id, fields in entries:
+        data = fields.get(b"data", fields.get("data"))
+        events.append({**json.loads(data), "eventId": _decode(entry_id)})
+    return events
+
+
+async def latest_event(redis: Redis, submission_id: str) -> Optional[Dict[str, Any]]:
+    """The last logged message with its "eventId"; None when the log is empty or gone."""
+    entries = await redis.xrevrange(events_key(submission_id), max="+", min="-", count=1)
+    if not entries:
+        return None
+    entry_id, fields = entries[0]
+    data = fields.get(b"data", fields.get("data"))
+    return {**json.loads(data), "eventId": _decode(entry_id)}
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
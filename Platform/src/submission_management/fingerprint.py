@@ -0,0 +1,46 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+
+
+def normalize_source(source: str) -> str:
+    """
+    Source as it is fingerprinted: line endings unified, a leading BOM and
+    trailing whitespace at the end of the file dropped. Whitespace inside
+    lines is kept; it can be significant (string literals, Python).
+    """
+    source = source.replace("\r\n", "\n").replace("\r", "\n")
+    if source.startswith("\ufeff"):
+        source = source[1:]
+    return source.rstrip() + "\n"
+
+
+def submission_fingerprint(
+    problem_id: ObjectId,
+    test_set_version: int,
+    language: str,
+    source: str,
+    time_limit_ms: int,
+    memory_limit_b: int,
+    checker: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    sha256 over everything that decides a submission's verdict. Two
+    submissions with the same fingerprint are judged alike, as long as the
+    problem's tests (testSetVersion) and checker have not changed.
+    """
+    key = json.dumps(
+        {
+            "problem": str(problem_id),
+            "tests": test_set_version,
+            "language": language,
+            "source": normalize_source(source),
+            "timeLimitMs": time_limit_ms,
+            "memoryLimitB": memory_limit_b,
+            "checker": checker,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
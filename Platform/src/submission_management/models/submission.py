@@ -2,7 +2,8 @@ from datetime import datetime
 from typing import List, Optional
 
 from bson import ObjectId
-from odmantic import Model, Field as ODMField
+from odmantic import Model, Index, Field as ODMField
+from odmantic.query import desc
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -11,9 +12,19 @@ class TestDetail(BaseModel):
     verdict: str
     status: str
     stdout: str
-    runtime_ms: float = Field(..., alias="runtime_ms")
-    memory_bytes: int = Field(..., alias="memory_bytes")
+    runtime_ms: float = Field(..., alias="runtime_ms")  # CPU time, what the limit applies to
+    memory_bytes: int = Field(..., alias="memory_bytes")  # peak resident memory
+    wall_time_ms: Optional[float] = Field(None, alias="wallTimeMs")
+    # where the output first differs from the expected one (wrong answers)
+    first_diff_line: Optional[int] = Field(None, alias="firstDiffLine")
+    first_diff_column: Optional[int] = Field(None, alias="firstDiffColumn")
     error_message: Optional[str] = Field(None, alias="errorMessage")
+    # full output sizes; stdout/errorMessage only keep a preview
+    stdout_bytes: Optional[int] = Field(None, alias="stdoutBytes")
+    stderr_bytes: Optional[int] = Field(None, alias="stderrBytes")
+    # limits the run actually got, after the judge node's calibration
+    effective_time_limit_ms: Optional[float] = Field(None, alias="effectiveTimeLimitMs")
+    effective_memory_limit_bytes: Optional[int] = Field(None, alias="effectiveMemoryLimitBytes")
 
     # allow passing values by field name or by alias
     model_config = ConfigDict(populate_by_name=True)
@@ -35,6 +46,8 @@ class Submission(Model):
     language: str
     sourceCode: str
     stdin: Optional[str] = ""
+    # "submit" (judged against all test cases) or "run" (custom input only)
+    mode: str = ODMField(default="submit")
     status: str = ODMField(default="pending")
     submittedAt: datetime
     completedAt: Optional[datetime] = None
@@ -48,4 +61,24 @@ class Submission(Model):
     timeLimitMs: int
     memoryLimitB: int
 
-    model_config = ConfigDict(collection="submissions")
\ No newline at end of file
+    # hash of what decides the verdict (see fingerprint.py); identical
+    # submissions share results
+    fingerprint: Optional[str] = None
+    # the submission whose result this one carries (or waits for, while pending)
+    reusedFrom: Optional[ObjectId] = None
+    # set by the judge when the result may be handed to identical submissions
+    resultReusable: bool = ODMField(default=False)
+
+    model_config = ConfigDict(
+        collection="submissions",
+        indexes=lambda: [
+            # the listings: newest first, keyset on submittedAt/_id
+            Index(Submission.userId, desc(Submission.submittedAt), desc(Submission.id),
+                  name="userId_submittedAt"),
+            Index(Submission.userId, Submission.problemId, desc(Submission.submittedAt),
+                  desc(Submission.id), name="userId_problemId_submittedAt"),
+            # result reuse: identical submissions, and those waiting on a leader
+            Index(Submission.fingerprint, Submission.resultReusable, name="fingerprint_resultReusable"),
+            Index(Submission.reusedFrom, Submission.status, name="reusedFrom_status"),
+        ],
+    )
\ No newline at end of file
@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from bson import ObjectId
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    total: Optional[int]  # None when the count was not asked for
+    next_cursor: Optional[str]  # None on the last page
+
+
+def encode_cursor(submitted_at: datetime, submission_id: ObjectId) -> str:
+    """Opaque cursor pointing just past the given submission in newest-first order."""
+    if submitted_at.tzinfo is None:  # Mongo hands back naive UTC datetimes
+        submitted_at = submitted_at.replace(tzinfo=timezone.utc)
+    payload = {"t": round(submitted_at.timestamp() * 1000), "id": str(submission_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """(submittedAt, _id) of the last submission already returned; ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload: Any = json.loads(raw)
+        submitted_at = datetime.fromtimestamp(payload["t"] / 1000, tz=timezone.utc)
+        return submitted_at, ObjectId(payload["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
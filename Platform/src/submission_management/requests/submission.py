@@ -1,9 +1,17 @@
 from pydantic import BaseModel, Field
 from bson import ObjectId
-from typing import Optional
+from typing import Literal, Optional
 
 class SubmissionCreate(BaseModel):
     problemId: str = Field(..., description="MongoDB ObjectId as hex string")
     language: str
     sourceCode: str
-    stdin: Optional[str] = ""
\ No newline at end of file
+    stdin: Optional[str] = ""
+    mode: Literal["submit", "run"] = Field(
+        "submit",
+        description="'submit' judges against all test cases; 'run' only executes "
+                    "`stdin` on the priority queue",
+    )
+    includeSamples: bool = Field(
+        False, description="In 'run' mode, also check the problem's sample test cases"
+    )
\ No newline at end of file
@@ -1,3 +1,5 @@
-from .submission import SubmissionResponse, SubmissionResponseList, SubmissionSummary
+from .submission import (
+    SubmissionResponse, SubmissionResponseList, SubmissionSummary, SubmissionSummaryPage,
+)
 
-__all__ = ['SubmissionResponse', 'SubmissionResponseList', 'SubmissionSummary']
\ No newline at end of file
+__all__ = ['SubmissionResponse', 'SubmissionResponseList', 'SubmissionSummary', 'SubmissionSummaryPage']
\ No newline at end of file
@@ -12,10 +12,12 @@ class SubmissionResponse(BaseModel):
     language: str
     sourceCode: str
     stdin: Optional[str]
+    mode: str = "submit"
     status: str
     submittedAt: datetime
     completedAt: Optional[datetime]
     result: Optional[SubmissionResult]
+    reusedFrom: Optional[str] = None
     canceled: bool
     createdAt: datetime
     updatedAt: datetime
@@ -29,9 +31,10 @@ class SubmissionResponse(BaseModel):
 
 class SubmissionResponseList(BaseModel):
     submissions: List[SubmissionResponse]
-    total: int
+    total: Optional[int] = None  # left out of cursor pages unless includeTotal=true
     page: int
     limit: int
+    nextCursor: Optional[str] = None  # pass as `cursor` for the next page; None on the last
 
     model_config = ConfigDict(
         validate_by_name=True,
@@ -61,3 +64,8 @@ class SubmissionSummary(BaseModel):
             return str(v)
         return v
 
+
+class SubmissionSummaryPage(BaseModel):
+    items: List[SubmissionSummary]
+    nextCursor: Optional[str] = None  # pass as `cursor` for the next page; None on the last
+    total: Optional[int] = None  # only with includeTotal=true
@@ -2,19 +2,19 @@ import json
 import time
 import logging
 
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, Header, status, Query
 from fastapi.exceptions import HTTPException
 from odmantic import AIOEngine, ObjectId
 from redis.asyncio import Redis
-from typing import List
+from typing import List, Optional
 from sse_starlette.sse import EventSourceResponse
 
-from Platform.src.core.dependencies import engine_dep, get_redis
+from Platform.src.core.dependencies import engine_dep, get_redis, get_event_hub
 from Platform.src.auth.dependencies import get_current_user
 from Platform.src.submission_management.requests import SubmissionCreate
 from Platform.src.submission_management.responses import (
     SubmissionResponse,
-    SubmissionResponseList, SubmissionSummary,
+    SubmissionResponseList, SubmissionSummaryPage,
 )
 from Platform.src.submission_management.service import (
     create_submission_service,
@@ -33,26 +33,34 @@ router = APIRouter(
 
 @router.get(
     "/submissions",
-    response_model=List[SubmissionSummary],
+    response_model=SubmissionSummaryPage,
     summary="List your submissions (paginated)"
 )
 async def list_my_submissions(
     page: int = Query(1, ge=1, description="Page number, starting from 1"),
     limit: int = Query(5, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(
+        None, description="nextCursor of the previous page; takes precedence over `page`"
+    ),
+    includeTotal: bool = Query(False, description="Also return the total count"),
     current_user=Depends(get_current_user),
     engine: AIOEngine = Depends(engine_dep),
+    redis: Redis = Depends(get_redis),
 ):
     logger.info(
-        "START list_my_submissions – user=%s page=%d limit=%d",
-        current_user.id, page, limit
+        "START list_my_submissions – user=%s page=%d limit=%d cursor=%s",
+        current_user.id, page, limit, cursor
     )
     start_ts = time.monotonic()
 
-    response = await get_user_submissions_response(user_id=current_user.id,
-                                                   engine=engine, page=page, limit=limit)
+    items, total, next_cursor = await get_user_submissions_response(
+        user_id=current_user.id, engine=engine, page=page, limit=limit,
+        cursor=cursor, include_total=includeTotal, redis=redis,
+    )
 
-    if not response:
+    if not items:
         logger.warning("No submissions found – user=%s", current_user.id)
+    response = SubmissionSummaryPage(items=items, nextCursor=next_cursor, total=total)
 
 
     logger.debug("Response body: %r", response)
@@ -106,10 +114,12 @@ async def create_submission(
         language=sub.language,
         sourceCode=sub.sourceCode,
         stdin=sub.stdin,
+        mode=sub.mode,
         status=sub.status,
         submittedAt=sub.submittedAt,
         completedAt=sub.completedAt,
         result=sub.result,
+        reusedFrom=str(sub.reusedFrom) if sub.reusedFrom else None,
         canceled=sub.canceled,
         createdAt=sub.createdAt,
         updatedAt=sub.updatedAt
@@ -125,21 +135,31 @@ async def create_submission(
 )
 async def submission_events(
     submission_id: str,
-    redis=Depends(get_redis)
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    redis=Depends(get_redis),
+    hub=Depends(get_event_hub),
+    engine: AIOEngine = Depends(engine_dep),
 ):
-    logger.info("Client CONNECTED to SSE – submissionId=%s", submission_id)
+    logger.info(
+        "Client CONNECTED to SSE – submissionId=%s lastEventId=%s", submission_id, last_event_id
+    )
     start_ts = time.monotonic()
 
     async def event_generator():
         try:
-            async for update in subscribe_submission_events(submission_id, redis):
+            async for update in subscribe_submission_events(
+                submission_id, redis, hub, last_event_id, engine
+            ):
                 logger.debug(
                     "SSE UPDATE – submissionId=%s update=%s",
                     submission_id, update
                 )
+                # judge progress carries its own event name ("compile", "tests");
+                # the event log's entry id lets a reconnecting client resume
                 yield {
-                    "event": "status",
-                    "data": json.dumps(update)
+                    "id": update.get("eventId"),
+                    "event": update.get("event", "status"),
+                    "data": json.dumps({k: v for k, v in update.items() if k != "eventId"})
                 }
         except Exception as e:
             logger.error(
@@ -165,21 +185,30 @@ async def list_my_submissions_for_problem(
     problem_id: str,
     page: int = Query(1, ge=1, description="Page number, starting from 1"),
     limit: int = Query(5, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(
+        None, description="nextCursor of the previous page; takes precedence over `page`"
+    ),
+    includeTotal: bool = Query(False, description="Count the total in cursor mode too"),
     current_user=Depends(get_current_user),
     engine: AIOEngine = Depends(engine_dep),
+    redis: Redis = Depends(get_redis),
 ):
     logger.info(
-        "START list_submissions – user=%s problem=%s page=%d limit=%d",
-        current_user.id, problem_id, page, limit
+        "START list_submissions – user=%s problem=%s page=%d limit=%d cursor=%s",
+        current_user.id, problem_id, page, limit, cursor
     )
     start_ts = time.monotonic()
 
-    docs, total = await get_user_submissions_for_problem(
+    docs, total, next_cursor = await get_user_submissions_for_problem(
         user_id=current_user.id,
         problem_id=problem_id,
         engine=engine,
         page=page,
         limit=limit,
+        cursor=cursor,
+        # page-number clients always got the total
+        include_total=includeTotal or not cursor,
+        redis=redis,
     )
 
     if not docs:
@@ -197,7 +226,7 @@ async def list_my_submissions_for_problem(
         subs_payload.append(d)
     elapsed = time.monotonic() - start_ts
     logger.info(
-        "Fetched %d submissions out of %d – duration=%.3fs",
+        "Fetched %d submissions out of %s – duration=%.3fs",
         len(subs_payload), total, elapsed
     )
 
@@ -206,6 +235,7 @@ async def list_my_submissions_for_problem(
         total=total,
         page=page,
         limit=limit,
+        nextCursor=next_cursor,
     )
     logger.debug("Response body: %r", response)
     logger.info("END list_submissions – user=%s", current_user.id)
@@ -251,10 +281,12 @@ async def get_submission(
         language=sub.language,
         sourceCode=sub.sourceCode,
         stdin=sub.stdin,
+        mode=sub.mode,
         status=sub.status,
         submittedAt=sub.submittedAt,
         completedAt=sub.completedAt,
         result=sub.result,
+        reusedFrom=str(sub.reusedFrom) if sub.reusedFrom else None,
         canceled=sub.canceled,
         createdAt=sub.createdAt,
         updatedAt=sub.updatedAt
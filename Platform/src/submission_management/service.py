@@ -1,15 +1,23 @@
+import asyncio
 import json
+from contextlib import asynccontextmanager
 from redis.asyncio import Redis
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from bson import ObjectId
-from typing import AsyncGenerator, List, Tuple
+from typing import AsyncGenerator, AsyncIterator, List, Optional, Tuple
 
 from fastapi import HTTPException, status
-from odmantic import AIOEngine
+from odmantic import AIOEngine, query
 
 from Platform.src.user_management.models import User
 from Platform.src.problem_management.models.problem import Problem
 from Platform.src.submission_management.models.submission import Submission
+from Platform.src.submission_management.fingerprint import submission_fingerprint
+from Platform.src.submission_management.pagination import Page, decode_cursor, encode_cursor
+from Platform.src.submission_management.event_hub import SubmissionEventHub
+from Platform.src.submission_management.event_log import (
+    append_event, event_log_enabled, latest_event, parse_event_id, read_events,
+)
 from Platform.src.submission_management.requests import SubmissionCreate
 from Platform.src.submission_management.responses import SubmissionSummary
 
@@ -89,6 +97,7 @@ async def create_submission_service(
         language=payload.language,
         sourceCode=payload.sourceCode,
         stdin=payload.stdin or "",
+        mode=payload.mode,
         status="pending",
         submittedAt=now,
         createdAt=now,
@@ -97,62 +106,335 @@ async def create_submission_service(
         timeLimitMs=problem.constraints.timeLimit_ms,
         memoryLimitB=problem.constraints.memoryLimit_mb * 1024 * 1024,
     )
+    if sub.mode == "submit" and config.SUBMISSION_REUSE:
+        sub.fingerprint = submission_fingerprint(
+            problem_obj_id, problem.testSetVersion, sub.language, sub.sourceCode,
+            sub.timeLimitMs, sub.memoryLimitB, problem.checker.model_dump(),
+        )
+        if await _reuse_identical_submission(sub, engine, redis):
+            await append_event(redis, str(sub.id), {"status": sub.status})
+            await _forget_counts(redis, sub)
+            logger.info("EXIT create_submission_service: submissionId=%s (reused)", sub.id)
+            return sub
+
     await engine.save(sub)
     logger.info("Saved submission: submissionId=%s", sub.id)
+    # logged before the judge can log anything, so late SSE clients never wait on Mongo
+    await append_event(redis, str(sub.id), {"status": sub.status})
+    await _forget_counts(redis, sub)
 
     # 6. Enqueue execution job
-    job = {
+    job = _judge_job(sub, problem)
+    if sub.mode == "run":
+        # judged against the user's input (and samples) only, on the fast lane
+        if payload.includeSamples:
+            job["sampleTestCases"] = [
+                {"input": s.input, "expectedOutput": s.expectedOutput}
+                for s in problem.sampleTestCases
+            ]
+        await enqueue_job(redis, job, queue_key=run_queue_key())
+    else:
+        await enqueue_job(redis, job)
+        if sub.fingerprint:
+            await _count_reuse(redis, "judged")
+
+    logger.info("EXIT create_submission_service: submissionId=%s", sub.id)
+    return sub
+
+
+def _judge_job(sub: Submission, problem: Problem) -> dict:
+    return {
         "submissionId": str(sub.id),
         "mongoId": str(sub.id),
-        "problemId": payload.problemId,
+        "problemId": str(sub.problemId),
         "language": sub.language,
         "sourceCode": sub.sourceCode,
         "stdin": sub.stdin or "",
+        # everything the judge needs, so it never has to read the submission
+        "timeLimitMs": sub.timeLimitMs,
+        "memoryLimitB": sub.memoryLimitB,
+        "checker": problem.checker.model_dump(),
+        # epoch seconds; the judge reports queue wait from it
+        "enqueuedAt": datetime.now(timezone.utc).timestamp(),
+        "mode": sub.mode,
+        # identical submissions that arrive meanwhile wait for this one's result
+        "fingerprint": sub.fingerprint,
     }
-    await redis.lpush(config.SUBMISSION_QUEUE_KEY, json.dumps(job))
-    logger.info(
-        "Enqueued job to Redis [%s]: %s",
-        config.SUBMISSION_QUEUE_KEY, job
+
+
+async def requeue_stranded_followers(engine: AIOEngine, redis: Redis, limit: int = 100) -> int:
+    """
+    Queue the coalesced submissions still pending SUBMISSION_FOLLOWER_TIMEOUT_SEC
+    after they were sent, as jobs of their own. Their leader's judge settles
+    them when it finishes; these are the ones whose leader never did (its
+    job was lost or its worker died). Returns how many were queued.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=config.SUBMISSION_FOLLOWER_TIMEOUT_SEC)
+    stranded = await engine.find(
+        Submission,
+        Submission.status == "pending",
+        Submission.reusedFrom != None,  # noqa: E711
+        Submission.submittedAt < cutoff,
+        limit=limit,
     )
+    requeued = 0
+    for sub in stranded:
+        # only one Platform process gets to requeue it
+        res = await engine.get_collection(Submission).update_one(
+            {"_id": sub.id, "status": "pending", "reusedFrom": sub.reusedFrom},
+            {"$set": {"reusedFrom": None, "updatedAt": datetime.now(timezone.utc)}},
+        )
+        if not res.matched_count:
+            continue
+        problem = await engine.find_one(Problem, Problem.id == sub.problemId)
+        if problem is None:
+            logger.error("Problem %s of stranded submission %s is gone", sub.problemId, sub.id)
+            continue
+        await enqueue_job(redis, _judge_job(sub, problem))
+        requeued += 1
+        logger.warning("Requeued submission %s; its leader %s never settled it", sub.id, sub.reusedFrom)
+    return requeued
+
+
+async def _reuse_identical_submission(sub: Submission, engine: AIOEngine, redis: Redis) -> bool:
+    """
+    Settle `sub` from an identical submission (same fingerprint) instead of
+    judging it: copy a finished, reusable result, or wait for an identical
+    submission still pending or running, whose judge copies its result
+    here when done. Returns False when `sub` has to be judged itself.
+    """
+    source = await engine.find_one(
+        Submission,
+        query.and_(Submission.fingerprint == sub.fingerprint, Submission.resultReusable == True),  # noqa: E712
+    )
+    if source is not None:
+        sub.status = source.status
+        sub.result = source.result
+        sub.completedAt = sub.submittedAt
+        sub.reusedFrom = source.id
+        sub.resultReusable = True
+        await engine.save(sub)
+        await _count_reuse(redis, "reused")
+        logger.info("Submission %s reuses the result of %s", sub.id, source.id)
+        return True
+
+    window_start = sub.submittedAt - timedelta(seconds=config.SUBMISSION_COALESCE_WINDOW_SEC)
+    leader = await engine.find_one(
+        Submission,
+        query.and_(
+            Submission.fingerprint == sub.fingerprint,
+            query.in_(Submission.status, ["pending", "running"]),
+            Submission.reusedFrom == None,  # noqa: E711
+            Submission.submittedAt >= window_start,
+        ),
+    )
+    if leader is None:
+        return False
 
-    logger.info("EXIT create_submission_service: submissionId=%s", sub.id)
-    return sub
+    sub.reusedFrom = leader.id
+    await engine.save(sub)
+    await _count_reuse(redis, "coalesced")
+    logger.info("Submission %s waits for identical submission %s", sub.id, leader.id)
+
+    # the leader may have finished before `sub` was saved, in which case its
+    # judge did not see `sub`: copy a reusable result here, or judge `sub`
+    leader = await engine.find_one(Submission, Submission.id == leader.id)
+    if leader is None or leader.status not in config.TERMINAL:
+        return True
+    now = datetime.now(timezone.utc)
+    collection = engine.get_collection(Submission)
+    if leader.resultReusable and leader.result is not None:
+        res = await collection.update_one(
+            {"_id": sub.id, "status": "pending"},
+            {"$set": {
+                "status": leader.status,
+                "result": leader.result.model_dump(),
+                "completedAt": now,
+                "updatedAt": now,
+            }},
+        )
+        if res.matched_count:
+            sub.status, sub.result, sub.completedAt = leader.status, leader.result, now
+        return True
+
+    # e.g. a fetch error or an unstable verdict: nothing to copy. Unless the
+    # leader's judge already requeued `sub`, it is judged like any other
+    res = await collection.update_one(
+        {"_id": sub.id, "status": "pending", "reusedFrom": leader.id},
+        {"$set": {"reusedFrom": None, "updatedAt": now}},
+    )
+    if not res.matched_count:
+        return True
+    sub.reusedFrom = None
+    logger.info("Identical submission %s has no reusable result, judging %s", leader.id, sub.id)
+    return False
+
+
+async def _count_reuse(redis: Redis, outcome: str) -> None:
+    """Count a submission as judged, reused or coalesced; never fails the request."""
+    try:
+        await redis.hincrby(config.SUBMISSION_REUSE_STATS_KEY, outcome, 1)
+    except Exception as e:
+        logger.warning("Could not count submission reuse (%s): %s", outcome, e)
+
+
+def run_queue_key() -> str:
+    return config.SUBMISSION_RUN_QUEUE_KEY or f"{config.SUBMISSION_QUEUE_KEY}:run"
+
+
+async def enqueue_job(redis: Redis, job: dict, queue_key: Optional[str] = None) -> None:
+    """
+    Hand a judge job to the configured queue backend: the main submission
+    queue, or `queue_key` (the run queue) with its stream at "<key>:stream".
+    """
+    if config.SUBMISSION_QUEUE_BACKEND == "stream":
+        if queue_key is None:
+            stream = config.SUBMISSION_STREAM_KEY or f"{config.SUBMISSION_QUEUE_KEY}:stream"
+        else:
+            stream = f"{queue_key}:stream"
+        entry_id = await redis.xadd(stream, {"job": json.dumps(job)})
+        logger.info("Enqueued job to Redis stream [%s] as %s: %s", stream, entry_id, job)
+        return
+
+    key = queue_key or config.SUBMISSION_QUEUE_KEY
+    await redis.lpush(key, json.dumps(job))
+    logger.info("Enqueued job to Redis [%s]: %s", key, job)
 
 
 async def subscribe_submission_events(
     submission_id: str,
-    redis: Redis
+    redis: Redis,
+    hub: Optional[SubmissionEventHub] = None,
+    last_event_id: Optional[str] = None,
+    engine: Optional[AIOEngine] = None,
 ) -> AsyncGenerator[dict, None]:
+    """
+    Yield the submission's messages until a terminal status. The live
+    subscription starts first, then the submission's event log is replayed
+    from `last_event_id` (all of it without one). A terminal status in the
+    log ends the stream at once; otherwise live messages follow, skipping
+    those the replay already yielded. When nothing is replayed, a client
+    caught up with the log is done if the last logged status is terminal
+    and waits for live messages if not; Mongo (`engine`) is only read when
+    there is no log (expired or disabled), for a stored terminal status.
+
+    With a hub the process-wide pub/sub connection is shared; without one
+    this opens a pub/sub connection of its own.
+    """
     logger.info("ENTER subscribe_submission_events: submissionId=%s", submission_id)
-    pubsub = redis.pubsub()
-    await pubsub.subscribe(submission_id)
-    logger.debug("Subscribed to channel: %s", submission_id)
-
+    seen = parse_event_id(last_event_id)
     try:
-        async for msg in pubsub.listen():
-            if msg["type"] != "message":
-                continue
-            data = json.loads(msg["data"])
-            logger.debug(
-                "PubSub message [%s]: %s", submission_id, data
-            )
-            yield data
-            if data.get("status") in config.TERMINAL:
-                logger.info(
-                    "Terminal status '%s' for %s — breaking subscription",
-                    data.get("status"), submission_id
+        async with _live_events(submission_id, redis, hub) as live:
+            backlog = await _replay(redis, submission_id, last_event_id if seen else None)
+            if not backlog:
+                # e.g. EventSource reconnecting after the terminal event
+                latest = await _latest(redis, submission_id) if seen else None
+                if latest is not None:
+                    # caught up with a live log: the next message comes over pub/sub
+                    if latest.get("status") in config.TERMINAL:
+                        logger.info(
+                            "Client already has terminal status '%s' for %s — ending subscription",
+                            latest.get("status"), submission_id
+                        )
+                        return
+                elif engine is not None:
+                    backlog = await _stored_status(engine, submission_id)
+            for data in backlog:
+                yield data
+                seen = parse_event_id(data.get("eventId")) or seen
+                if data.get("status") in config.TERMINAL:
+                    logger.info(
+                        "Terminal status '%s' for %s replayed — ending subscription",
+                        data.get("status"), submission_id
+                    )
+                    return
+
+            async for data in live:
+                event_id = parse_event_id(data.get("eventId"))
+                if seen is not None and event_id is not None and event_id <= seen:
+                    continue
+                logger.debug(
+                    "PubSub message [%s]: %s", submission_id, data
                 )
-                break
+                yield data
+                if data.get("status") in config.TERMINAL:
+                    logger.info(
+                        "Terminal status '%s' for %s — breaking subscription",
+                        data.get("status"), submission_id
+                    )
+                    break
     except Exception as e:
         logger.error(
             "Error in subscribe_submission_events [%s]: %s",
             submission_id, e, exc_info=True
         )
         raise
+    finally:
+        logger.info("EXIT subscribe_submission_events: submissionId=%s", submission_id)
+
+
+@asynccontextmanager
+async def _live_events(
+    submission_id: str, redis: Redis, hub: Optional[SubmissionEventHub]
+) -> AsyncIterator[AsyncIterator[dict]]:
+    """Subscribed for the duration of the block; yields the live message iterator."""
+    if hub is not None:
+        async with hub.subscribe(submission_id) as queue:
+            yield _queued_messages(queue)
+        return
+
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(submission_id)
+    logger.debug("Subscribed to channel: %s", submission_id)
+    try:
+        yield _pubsub_messages(pubsub)
     finally:
         await pubsub.unsubscribe(submission_id)
         logger.info("Unsubscribed from channel: %s", submission_id)
-        logger.info("EXIT subscribe_submission_events: submissionId=%s", submission_id)
+
+
+async def _queued_messages(queue: asyncio.Queue) -> AsyncIterator[dict]:
+    while True:
+        yield await queue.get()
+
+
+async def _pubsub_messages(pubsub) -> AsyncIterator[dict]:
+    async for msg in pubsub.listen():
+        if msg["type"] == "message":
+            yield json.loads(msg["data"])
+
+
+async def _replay(redis: Redis, submission_id: str, after: Optional[str]) -> List[dict]:
+    if not event_log_enabled():
+        return []
+    try:
+        return await read_events(redis, submission_id, after)
+    except Exception as e:
+        # a live-only stream is still better than none
+        logger.warning("Could not replay events for %s: %s", submission_id, e)
+        return []
+
+
+async def _latest(redis: Redis, submission_id: str) -> Optional[dict]:
+    if not event_log_enabled():
+        return None
+    try:
+        return await latest_event(redis, submission_id)
+    except Exception as e:
+        logger.warning("Could not read the last event for %s: %s", submission_id, e)
+        return None
+
+
+async def _stored_status(engine: AIOEngine, submission_id: str) -> List[dict]:
+    """The submission's terminal status from Mongo, for submissions whose log is gone."""
+    try:
+        obj_id = ObjectId(submission_id)
+    except Exception:
+        return []
+    doc = await engine.get_collection(Submission).find_one({"_id": obj_id}, {"status": 1})
+    if doc is None or doc.get("status") not in config.TERMINAL:
+        return []
+    return [{"status": doc["status"]}]
 
 
 async def get_user_submissions_for_problem(
@@ -161,10 +443,13 @@ async def get_user_submissions_for_problem(
     engine: AIOEngine,
     page: int = 1,
     limit: int = 10,
-) -> Tuple[List[Submission], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    redis: Optional[Redis] = None,
+) -> Page:
     logger.info(
-        "ENTER get_user_submissions_for_problem: user_id=%s problem_id=%s page=%d limit=%d",
-        user_id, problem_id, page, limit
+        "ENTER get_user_submissions_for_problem: user_id=%s problem_id=%s page=%d limit=%d cursor=%s",
+        user_id, problem_id, page, limit, cursor
     )
 
     # Validate IDs
@@ -179,38 +464,17 @@ async def get_user_submissions_for_problem(
             detail="Invalid user ID or problem ID format",
         )
 
-    if page < 1 or limit < 1:
-        logger.warning("Invalid pagination params: page=%d limit=%d", page, limit)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="`page` and `limit` must be positive integers",
-        )
-
     filters = [
         Submission.userId == user_obj_id,
         Submission.problemId == problem_obj_id,
+        Submission.mode != "run",
     ]
-    logger.debug("Query filters: %s", filters)
-
-    # 1) total count
-    total = await engine.count(Submission, *filters)
-    logger.info("Total submissions count: %d", total)
-
-    # 2) paged fetch
-    skip = (page - 1) * limit
-    submissions = await engine.find(
-        Submission,
-        *filters,
-        sort=Submission.submittedAt.desc(),
-        skip=skip,
-        limit=limit,
+    result = await _page_submissions(
+        engine, filters, page, limit, cursor, include_total,
+        redis, _count_key(user_obj_id, problem_obj_id),
     )
-    logger.info(
-        "Fetched %d submissions (skip=%d limit=%d)", len(submissions), skip, limit
-    )
-
     logger.info("EXIT get_user_submissions_for_problem")
-    return submissions, total
+    return result
 
 
 async def get_user_submissions(
@@ -218,10 +482,13 @@ async def get_user_submissions(
     engine: AIOEngine,
     page: int = 1,
     limit: int = 10,
-) -> Tuple[List[Submission], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    redis: Optional[Redis] = None,
+) -> Page:
     logger.info(
-        "ENTER get_user_submissions: user_id=%s page=%d limit=%d",
-        user_id, page, limit
+        "ENTER get_user_submissions: user_id=%s page=%d limit=%d cursor=%s",
+        user_id, page, limit, cursor
     )
 
     # Validate IDs
@@ -235,37 +502,128 @@ async def get_user_submissions(
             detail="Invalid user ID format",
         )
 
-    if page < 1 or limit < 1:
-        logger.warning("Invalid pagination params: page=%d limit=%d", page, limit)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="`page` and `limit` must be positive integers",
-        )
-
     filters = [
         Submission.userId == user_obj_id,
+        Submission.mode != "run",
     ]
-    logger.debug("Query filters: %s", filters)
+    result = await _page_submissions(
+        engine, filters, page, limit, cursor, include_total, redis, _count_key(user_obj_id)
+    )
+    logger.info("EXIT get_user_submissions")
+    return result
 
-    # 1) total count
-    total = await engine.count(Submission, *filters)
-    logger.info("Total submissions count: %d", total)
 
-    # 2) paged fetch
-    skip = (page - 1) * limit
+async def _page_submissions(
+    engine: AIOEngine,
+    filters: list,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+    include_total: bool,
+    redis: Optional[Redis],
+    count_key: str,
+) -> Page:
+    """
+    One page of submissions, newest first (submittedAt, then _id). With a
+    cursor the page starts right after the submission it points to, which
+    an index on the filter fields plus submittedAt/_id serves without
+    skipping; otherwise `page` is counted off with skip. Every page but
+    the last returns the cursor of the next one.
+    """
+    page_filters, skip = _page_filters(filters, page, limit, cursor)
+
+    # one extra document tells whether there is a next page
     submissions = await engine.find(
         Submission,
-        *filters,
-        sort=Submission.submittedAt.desc(),
+        *page_filters,
+        sort=(Submission.submittedAt.desc(), Submission.id.desc()),
         skip=skip,
-        limit=limit,
+        limit=limit + 1,
     )
+    next_cursor = None
+    if len(submissions) > limit:
+        submissions = submissions[:limit]
+        last = submissions[-1]
+        next_cursor = encode_cursor(last.submittedAt, last.id)
     logger.info(
-        "Fetched %d submissions (skip=%d limit=%d)", len(submissions), skip, limit
+        "Fetched %d submissions (skip=%d limit=%d keyset=%s)", len(submissions), skip, limit, bool(cursor)
     )
 
-    logger.info("EXIT get_user_submissions")
-    return submissions, total
+    total = None
+    if include_total:
+        total = await _count_submissions(engine, filters, redis, count_key)
+        logger.info("Total submissions count: %d", total)
+    return Page(submissions, total, next_cursor)
+
+
+def _page_filters(
+    filters: list, page: int, limit: int, cursor: Optional[str]
+) -> Tuple[list, int]:
+    """Validated (filters, skip) of one newest-first page: keyset after `cursor`, else skip to `page`."""
+    if page < 1 or limit < 1:
+        logger.warning("Invalid pagination params: page=%d limit=%d", page, limit)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="`page` and `limit` must be positive integers",
+        )
+
+    skip = (page - 1) * limit
+    page_filters = filters
+    if cursor:
+        try:
+            after_ts, after_id = decode_cursor(cursor)
+        except ValueError:
+            logger.warning("Invalid pagination cursor: %s", cursor)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        page_filters = [
+            *filters,
+            query.or_(
+                Submission.submittedAt < after_ts,
+                query.and_(Submission.submittedAt == after_ts, Submission.id < after_id),
+            ),
+        ]
+        skip = 0
+    logger.debug("Query filters: %s", page_filters)
+    return page_filters, skip
+
+
+def _count_key(user_id: ObjectId, problem_id: Optional[ObjectId] = None) -> str:
+    key = f"{config.SUBMISSION_COUNT_CACHE_PREFIX}{user_id}"
+    return f"{key}:{problem_id}" if problem_id is not None else key
+
+
+async def _count_submissions(
+    engine: AIOEngine, filters: list, redis: Optional[Redis], key: str
+) -> int:
+    """Listing total, cached in Redis for SUBMISSION_COUNT_CACHE_TTL_SEC."""
+    use_cache = redis is not None and config.SUBMISSION_COUNT_CACHE_TTL_SEC > 0
+    if use_cache:
+        try:
+            cached = await redis.get(key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning("Could not read cached count %s: %s", key, e)
+    total = await engine.count(Submission, *filters)
+    if use_cache:
+        try:
+            await redis.set(key, total, ex=config.SUBMISSION_COUNT_CACHE_TTL_SEC)
+        except Exception as e:
+            logger.warning("Could not cache count %s: %s", key, e)
+    return total
+
+
+async def _forget_counts(redis: Redis, sub: Submission) -> None:
+    """A new submission changes both of its user's listing totals."""
+    if config.SUBMISSION_COUNT_CACHE_TTL_SEC <= 0 or sub.mode == "run":
+        return
+    try:
+        await redis.delete(_count_key(sub.userId), _count_key(sub.userId, sub.problemId))
+    except Exception as e:
+        logger.warning("Could not drop cached counts for user %s: %s", sub.userId, e)
 
 
 async def get_user_submissions_response(
@@ -273,61 +631,84 @@ async def get_user_submissions_response(
     engine: AIOEngine,
     page: int = 1,
     limit: int = 10,
-) -> List[SubmissionSummary]:
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    redis: Optional[Redis] = None,
+) -> Page:
     """
-    Fetch paginated submissions for a user and return lightweight DTOs
-    including the problem's pId.
+    A page of the user's submissions as lightweight DTOs with the problem's
+    pId and title, newest first, paged like `get_user_submissions`. One
+    aggregation projects the summary fields before joining the problem, so
+    source code and test output never leave Mongo.
     """
     logger.info(
-        "ENTER get_user_submissions_response: user_id=%s page=%d limit=%d",
-        user_id, page, limit,
+        "ENTER get_user_submissions_response: user_id=%s page=%d limit=%d cursor=%s",
+        user_id, page, limit, cursor,
     )
 
-    # 1) Delegate ID validation, pagination, and fetch to existing helper
     try:
-        submissions, total = await get_user_submissions(user_id, engine, page, limit)
-        logger.debug("Fetched %d submissions (total=%d)", len(submissions), total)
-    except HTTPException as exc:
-        logger.error(
-            "Error in get_user_submissions for user_id=%s: %s",
-            user_id, exc.detail,
+        user_obj_id = ObjectId(user_id)
+    except Exception:
+        logger.error("Invalid ID format: user_id=%s", user_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user ID format",
         )
-        raise
 
-    # 2) Bulk-load Problems to grab each pId
-    problem_ids = {sub.problemId for sub in submissions}
-    logger.debug("Loading Problem docs for IDs: %s", problem_ids)
-    problems = await engine.find(Problem, Problem.id.in_(problem_ids))
-    pId_map = {prob.id: prob.pId for prob in problems}
-    problem_title_map = {prob.id: prob.title for prob in problems}
-    logger.debug("Built pId map: %s", pId_map)
+    filters = [
+        Submission.userId == user_obj_id,
+        Submission.mode != "run",
+    ]
+    page_filters, skip = _page_filters(filters, page, limit, cursor)
+    pipeline = [
+        {"$match": query.and_(*page_filters)},
+        {"$sort": {"submittedAt": -1, "_id": -1}},
+        {"$skip": skip},
+        # one extra row tells whether there is a next page
+        {"$limit": limit + 1},
+        {"$project": {"userId": 1, "problemId": 1, "status": 1, "createdAt": 1, "submittedAt": 1}},
+        {"$lookup": {
+            "from": engine.get_collection(Problem).name,
+            "localField": "problemId",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"_id": 0, "pId": 1, "title": 1}}],
+            "as": "problem",
+        }},
+        {"$unwind": {"path": "$problem", "preserveNullAndEmptyArrays": True}},
+    ]
+    rows = await engine.get_collection(Submission).aggregate(pipeline).to_list(length=None)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["submittedAt"], rows[-1]["_id"])
 
-    # 3) Construct response DTOs
     response: List[SubmissionSummary] = []
-    for sub in submissions:
-        p_id = pId_map.get(sub.problemId)
+    for row in rows:
+        problem = row.get("problem") or {}
+        p_id = problem.get("pId")
         if p_id is None:
             logger.warning(
                 "No Problem found for submission.problemId=%s; defaulting pId=0",
-                sub.problemId,
+                row["problemId"],
             )
             p_id = 0
-
-        dto = SubmissionSummary(
-            id=sub.id,
-            userId=sub.userId,
-            problemId=sub.problemId,
+        response.append(SubmissionSummary(
+            id=row["_id"],
+            userId=row["userId"],
+            problemId=row["problemId"],
             pId=p_id,
-            status=sub.status,
-            createdAt=sub.createdAt,
-            title=problem_title_map.get(sub.problemId, "Unknown Problem"),
-        )
-        response.append(dto)
-        logger.debug("Appended SubmissionResponse for submission.id=%s", sub.id)
+            status=row["status"],
+            createdAt=row.get("createdAt"),
+            title=problem.get("title", "Unknown Problem"),
+        ))
+
+    total = None
+    if include_total:
+        total = await _count_submissions(engine, filters, redis, _count_key(user_obj_id))
 
     logger.info(
-        "EXIT get_user_submissions_response: returning %d DTOs", len(response)
+        "EXIT get_user_submissions_response: returning %d DTOs (skip=%d keyset=%s)",
+        len(response), skip, bool(cursor),
     )
-
-    response.sort(key=lambda x: x.createdAt, reverse=True)
-    return response
\ No newline at end of file
+    return Page(response, total, next_cursor)
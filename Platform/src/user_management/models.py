@@ -4,8 +4,9 @@ from typing import Optional, List, Dict, Any
 from pydantic import ConfigDict
 
 class User(Model):
-    username: str
-    email: str
+    # unique: concurrent sign-ups with the same name/email cannot both succeed
+    username: str = Field(unique=True)
+    email: str = Field(unique=True)
     password_hash: str
     salt: str
     firstName: str
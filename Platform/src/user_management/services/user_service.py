@@ -4,6 +4,7 @@ import jwt
 
 from odmantic import AIOEngine
 from odmantic.query import or_
+from odmantic.exceptions import DuplicateKeyError
 from Platform.src.user_management.models import User
 from Platform.src.user_management.exceptions import (
     UserExistsException,
@@ -41,7 +42,13 @@ async def create_user(user_data, engine: AIOEngine):
         socialLinks=user_data.socialLinks.dict() if user_data.socialLinks else {},
         preferences=user_data.preferences.dict() if user_data.preferences else {},
     )
-    await engine.save(new_user)
+    try:
+        await engine.save(new_user)
+    except DuplicateKeyError:
+        # a concurrent sign-up got past the check first; the unique indexes catch it
+        logger.warning("Duplicate username/email on insert: %s / %s",
+                       user_data.username, user_data.email)
+        raise UserExistsException()
     logger.info("Created new user: %s", new_user.username)
     return new_user
 
@@ -112,3 +112,34 @@ async def test_list_public_test_cases_not_found(async_client: AsyncClient, monke
     response = await async_client.get(f"/api/problems/{problem_id}/test-cases/public")
     assert response.status_code == 404
     assert response.json()["detail"] == "Problem does not exist"
+
+
+@pytest.mark.anyio
+async def test_list_test_cases_etag_and_not_modified(async_client: AsyncClient, monkeypatch):
+    problem_id = "abcdefabcdefabcdefabcdef"
+    fake_problem = type("P", (), {"id": problem_id, "testSetVersion": 3})()
+    calls = {"get_all": 0}
+
+    async def fake_ensure(pid, engine):
+        return fake_problem
+
+    async def fake_get_all(pid, include_hidden, engine):
+        calls["get_all"] += 1
+        return []
+
+    monkeypatch.setattr(tc_router, "ensure_problem_exists", fake_ensure)
+    monkeypatch.setattr(tc_router, "get_all_test_cases", fake_get_all)
+
+    url = f"/api/v1/problems/{problem_id}/test-cases?includeHidden=true"
+    first = await async_client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = await async_client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert calls["get_all"] == 1
+
+    fake_problem.testSetVersion = 4
+    third = await async_client.get(url, headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["etag"] != etag
@@ -0,0 +1,193 @@
+import pytest
+from bson import ObjectId
+from odmantic import AIOEngine
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from Platform.src.core.indexes import INDEXED_MODELS, declared_indexes, ensure_indexes
+from Platform.src.user_management.models import User
+from Platform.src.user_management.exceptions import UserExistsException
+from Platform.src.user_management.schemas import UserCreate
+from Platform.src.user_management.services.user_service import create_user
+from Platform.src.problem_management.models import Asset
+from Platform.src.problem_management.services.scraping_service import ScrapingService
+from Platform.src.submission_management.models import Submission
+
+
+# Stub Motor collection / engine for the index registry
+class StubIndexCollection:
+    def __init__(self, name, existing=None, fail=(), duplicated=()):
+        self.name = name
+        self.indexes = {"_id_": {"key": [("_id", 1)]}, **(existing or {})}
+        self.fail = set(fail)  # each fails once
+        self.duplicated = set(duplicated)  # fields with duplicate values
+        self.created = []
+        self.dropped = []
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        group, = [stage["$group"] for stage in pipeline if "$group" in stage]
+        fields = {value.lstrip("$") for value in group["_id"].values()}
+        rows = [{"n": 2}] if fields <= self.duplicated else []
+        return StubCursor(rows)
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    async def create_indexes(self, indexes):
+        for index in indexes:
+            doc = index.document
+            if doc["name"] in self.fail:
+                self.fail.discard(doc["name"])
+                raise OperationFailure("E11000 duplicate key error", code=11000)
+            self.created.append(doc["name"])
+            self.indexes[doc["name"]] = {
+                "key": list(doc["key"].items()),
+                **{k: v for k, v in doc.items() if k not in ("key", "name")},
+            }
+
+    async def drop_index(self, name):
+        self.dropped.append(name)
+        del self.indexes[name]
+
+class StubCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length=None):
+        return self.rows[:length]
+
+class StubIndexEngine:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def get_collection(self, model):
+        return self.collections[model.__name__]
+
+
+@pytest.mark.anyio
+async def test_registry_declares_listing_and_unique_indexes():
+    assert {m.__name__ for m in INDEXED_MODELS} == {"User", "Problem", "TestCase", "Asset", "Submission"}
+    users = {i.document["name"]: i.document for i in declared_indexes(User)}
+    assert users["username_1"]["unique"] and users["email_1"]["unique"]
+    submissions = {i.document["name"]: i.document for i in declared_indexes(Submission)}
+    assert list(submissions["userId_submittedAt"]["key"].items()) == [
+        ("userId", 1), ("submittedAt", -1), ("_id", -1),
+    ]
+
+@pytest.mark.anyio
+async def test_ensure_indexes_is_idempotent_and_reports_extras():
+    users = StubIndexCollection("users", existing={"legacy_1": {"key": [("legacy", 1)]}})
+    engine = StubIndexEngine(User=users)
+
+    report = await ensure_indexes(engine, [User])
+    assert report.created == ["users.username_1", "users.email_1"]
+    assert report.extra == ["users.legacy_1"] and report.ok
+
+    again = await ensure_indexes(engine, [User])
+    assert again.created == [] and again.missing == []
+    assert users.created == ["username_1", "email_1"] and users.dropped == []
+
+@pytest.mark.anyio
+async def test_check_only_reports_and_changed_index_is_rebuilt():
+    # same name, but not unique yet
+    users = StubIndexCollection("users", existing={"email_1": {"key": [("email", 1)]}})
+    engine = StubIndexEngine(User=users)
+
+    report = await ensure_indexes(engine, [User], apply=False)
+    assert report.missing == ["users.username_1", "users.email_1"] and not report.ok
+    assert users.created == []
+
+    report = await ensure_indexes(engine, [User])
+    assert users.dropped == ["email_1"] and users.indexes["email_1"]["unique"]
+    assert report.ok
+
+@pytest.mark.anyio
+async def test_unique_index_over_duplicates_is_reported_as_failed():
+    users = StubIndexCollection("users", fail={"email_1"})
+    report = await ensure_indexes(StubIndexEngine(User=users), [User])
+    assert report.created == ["users.username_1"]
+    assert report.failed == ["users.email_1"] and not report.ok
+
+@pytest.mark.anyio
+async def test_rebuild_over_duplicates_keeps_the_old_index():
+    users = StubIndexCollection(
+        "users", existing={"email_1": {"key": [("email", 1)]}}, duplicated={"email"}
+    )
+    report = await ensure_indexes(StubIndexEngine(User=users), [User])
+    assert report.failed == ["users.email_1"] and not report.ok
+    assert users.dropped == [] and users.indexes["email_1"] == {"key": [("email", 1)]}
+
+@pytest.mark.anyio
+async def test_failed_rebuild_restores_the_old_index():
+    users = StubIndexCollection(
+        "users", existing={"email_1": {"key": [("email", 1)], "v": 2}}, fail={"email_1"}
+    )
+    report = await ensure_indexes(StubIndexEngine(User=users), [User])
+    assert report.failed == ["users.email_1"]
+    assert users.dropped == ["email_1"] and users.created == ["username_1", "email_1"]
+    assert not users.indexes["email_1"].get("unique")
+
+
+# Stub Motor client whose collections enforce unique keys the way Mongo does
+class StubUniqueCollection:
+    def __init__(self, unique):
+        self.unique = unique
+        self.docs = []
+
+    async def update_one(self, filter, update, upsert=False, session=None):
+        doc = {**filter, **update["$set"]}
+        for fields in self.unique:
+            if any(all(d.get(f) == doc.get(f) for f in fields) for d in self.docs):
+                raise DuplicateKeyError("E11000 duplicate key error", code=11000)
+        self.docs.append(doc)
+
+class StubSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class StubUniqueClient:
+    def __init__(self, **unique):
+        self.collections = {name: StubUniqueCollection(keys) for name, keys in unique.items()}
+
+    def __getitem__(self, name):
+        return self.collections if name == "test" else None
+
+    async def start_session(self):
+        return StubSession()
+
+class StubUniqueEngine(AIOEngine):
+    """Real ODMantic save path; find_one stands in for a racing check that saw nothing."""
+    async def find_one(self, model, *queries, **kwargs):
+        docs = self.get_collection(model).docs
+        return model.model_validate_doc(docs[0]) if self.found and docs else None
+
+    found = False
+
+
+@pytest.mark.anyio
+async def test_duplicate_sign_up_past_the_check_is_user_exists():
+    engine = StubUniqueEngine(StubUniqueClient(users=[("username",), ("email",)]))
+    payload = dict(email="a@example.com", firstName="A", lastName="B", password="secret")
+
+    await create_user(UserCreate(username="alice", **payload), engine)
+    with pytest.raises(UserExistsException):
+        await create_user(UserCreate(username="alice2", **payload), engine)
+
+@pytest.mark.anyio
+async def test_rescraped_asset_is_skipped_and_existing_id_returned():
+    engine = StubUniqueEngine(StubUniqueClient(assets=[("filePath", "pId", "purpose")]))
+    scraper = ScrapingService.__new__(ScrapingService)
+    scraper.engine = engine
+
+    def asset():
+        return Asset(
+            problemId=ObjectId(), filename="a.in", contentType="text/plain", size=1, isS3=False,
+            filePath="/data/a.in", s3Key=None, pId=1, purpose="test_input", isPublic=False,
+        )
+
+    first_id = await scraper.save_asset_once(asset())
+    engine.found = True
+    assert await scraper.save_asset_once(asset()) == first_id
+    assert len(engine.get_collection(Asset).docs) == 1
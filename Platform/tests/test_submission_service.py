@@ -1,15 +1,26 @@
+import asyncio
 import pytest
 import json
+from datetime import datetime, timezone
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 from fastapi import HTTPException, status
 
 from Platform.src.submission_management.service import (
     create_submission_service,
+    get_user_submissions,
+    get_user_submissions_response,
+    requeue_stranded_followers,
     subscribe_submission_events
 )
 from Platform.src.submission_management.requests import SubmissionCreate
+from Platform.src.submission_management.models import Submission, SubmissionResult
+from Platform.src.submission_management.fingerprint import submission_fingerprint
+from Platform.src.submission_management.event_hub import SubmissionEventHub
+from Platform.src.submission_management.event_log import events_key
+from Platform.src.submission_management.pagination import decode_cursor, encode_cursor
 from Platform.src.config.config import config
+from Platform.src.problem_management.models import CheckerConfig
 
 # Override the default engine_dep autouse fixture from conftest
 @pytest.fixture(autouse=True)
@@ -26,9 +37,11 @@ async def override_engine_dep(db_client):
 
 # Stub engine for create_submission_service tests
 class StubEngine:
-    def __init__(self, user_exists=True, problem_exists=True, problem_constraints=None):
+    def __init__(self, user_exists=True, problem_exists=True, problem_constraints=None, submissions=None):
         self.user_exists = user_exists
         self.problem_exists = problem_exists
+        # answers to successive Submission lookups (reuse / coalescing)
+        self.submissions = list(submissions or [])
         self.saved = None
         self._problem_constraints = problem_constraints or {"timeLimit_ms": 1000, "memoryLimit_mb": 64}
 
@@ -41,7 +54,13 @@ class StubEngine:
                 return None
             # Dummy problem object with constraints attribute
             Constraints = type('C', (), self._problem_constraints)
-            return type('ProblemObj', (), {'constraints': Constraints})()
+            sample = type('Sample', (), {'input': '1 2', 'expectedOutput': '3'})
+            return type('ProblemObj', (), {
+                'constraints': Constraints, 'checker': CheckerConfig(), 'sampleTestCases': [sample],
+                'testSetVersion': 1,
+            })()
+        if model.__name__ == 'Submission' and self.submissions:
+            return self.submissions.pop(0)
         return None
 
     async def save(self, submission):
@@ -49,13 +68,48 @@ class StubEngine:
         self.saved = submission
 
 # Stub Redis for queue push
+class StubPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def xadd(self, *args, **kwargs):
+        self.calls.append(self.redis.xadd(*args, **kwargs))
+
+    def expire(self, *args, **kwargs):
+        self.calls.append(self.redis.expire(*args, **kwargs))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [await call for call in self.calls]
+
 class StubRedisQueue:
     def __init__(self):
         self.queued = None
+        self.counts = {}
+        self.events = []
+        self.deleted = []
+        self.round_trips = 0  # event log pipelines
+
+    def pipeline(self, transaction=True):
+        return StubPipeline(self)
 
     async def lpush(self, key, value):
         self.queued = (key, value)
 
+    async def delete(self, *keys):
+        self.deleted.extend(keys)
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        assert self.queued is None, "logged after the job was queued"
+        self.events.append((key, json.loads(fields["data"])))
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def hincrby(self, key, field, amount):
+        self.counts[field] = self.counts.get(field, 0) + amount
+
 # Tests for create_submission_service
 @pytest.mark.anyio
 async def test_create_submission_invalid_problem_format():
@@ -119,6 +173,125 @@ async def test_create_submission_success():
     assert submission.status == "pending"
     assert submission.timeLimitMs == engine._problem_constraints['timeLimit_ms']
     assert submission.memoryLimitB == engine._problem_constraints['memoryLimit_mb'] * 1024 * 1024
+    job = json.loads(redis.queued[1])
+    assert (job["timeLimitMs"], job["memoryLimitB"]) == (submission.timeLimitMs, submission.memoryLimitB)
+    assert job["checker"]["type"] == "exact"
+    assert redis.events == [(events_key(str(submission.id)), {"status": "pending"})]
+    assert redis.round_trips == 1
+    # both listing totals of the user changed
+    assert redis.deleted == [
+        f"{config.SUBMISSION_COUNT_CACHE_PREFIX}{valid_user}",
+        f"{config.SUBMISSION_COUNT_CACHE_PREFIX}{valid_user}:{valid_problem}",
+    ]
+
+@pytest.mark.anyio
+async def test_create_submission_run_mode_uses_run_queue(monkeypatch):
+    monkeypatch.setattr(config, "SUBMISSION_RUN_QUEUE_KEY", "submission_queue:run")
+    payload = SubmissionCreate(
+        problemId=str(ObjectId()), language="python", sourceCode="print(1)",
+        stdin="5", mode="run", includeSamples=True,
+    )
+    redis = StubRedisQueue()
+    submission = await create_submission_service(payload, str(ObjectId()), StubEngine(), redis)
+    assert submission.mode == "run"
+    key, raw = redis.queued
+    assert key == "submission_queue:run"
+    job = json.loads(raw)
+    assert job["mode"] == "run"
+    assert job["stdin"] == "5"
+    assert job["sampleTestCases"] == [{"input": "1 2", "expectedOutput": "3"}]
+
+@pytest.mark.anyio
+async def test_identical_submission_reuses_finished_result():
+    source = Submission(
+        userId=ObjectId(), problemId=ObjectId(), language="python", sourceCode="print(1)",
+        status="failed", submittedAt=datetime.now(timezone.utc), createdAt=datetime.now(timezone.utc),
+        updatedAt=datetime.now(timezone.utc), timeLimitMs=1000, memoryLimitB=64 * 1024 * 1024,
+        result=SubmissionResult(total_tests=3, passed_tests=1, max_runtime_ms=5.0, max_memory_bytes=1, test_details=[]),
+        resultReusable=True,
+    )
+    engine = StubEngine(submissions=[source])
+    redis = StubRedisQueue()
+    payload = SubmissionCreate(problemId=str(ObjectId()), language="python", sourceCode="print(1)\r\n")
+    submission = await create_submission_service(payload, str(ObjectId()), engine, redis)
+    assert redis.queued is None
+    assert engine.saved is submission
+    assert (submission.status, submission.reusedFrom) == ("failed", source.id)
+    assert submission.result.passed_tests == 1
+    assert redis.counts == {"reused": 1}
+    assert redis.events == [(events_key(str(submission.id)), {"status": "failed"})]
+
+class StubCoalesceEngine(StubEngine):
+    def __init__(self, submissions):
+        super().__init__(submissions=submissions)
+        self.updates = []
+
+    def get_collection(self, model):
+        return self
+
+    async def update_one(self, filter, update):
+        self.updates.append((filter, update))
+        return type("Res", (), {"matched_count": 1})()
+
+@pytest.mark.anyio
+async def test_leader_finished_without_reusable_result_is_not_copied():
+    now = datetime.now(timezone.utc)
+    leader = Submission(
+        userId=ObjectId(), problemId=ObjectId(), language="python", sourceCode="print(1)",
+        status="running", submittedAt=now, createdAt=now, updatedAt=now,
+        timeLimitMs=1000, memoryLimitB=64 * 1024 * 1024,
+    )
+    # it ended in a fetch error just after `submission` was coalesced onto it
+    finished = leader.model_copy(update={
+        "status": "failed", "resultReusable": False,
+        "result": SubmissionResult(total_tests=0, passed_tests=0, max_runtime_ms=0.0, max_memory_bytes=0, test_details=[]),
+    })
+    engine = StubCoalesceEngine(submissions=[None, leader, finished])
+    redis = StubRedisQueue()
+    payload = SubmissionCreate(problemId=str(ObjectId()), language="python", sourceCode="print(1)")
+
+    submission = await create_submission_service(payload, str(ObjectId()), engine, redis)
+
+    assert (submission.status, submission.reusedFrom, submission.result) == ("pending", None, None)
+    assert json.loads(redis.queued[1])["submissionId"] == str(submission.id)
+    (filter, update), = engine.updates
+    assert filter["reusedFrom"] == leader.id and update["$set"]["reusedFrom"] is None
+
+@pytest.mark.anyio
+async def test_new_submission_is_fingerprinted_and_counted():
+    redis = StubRedisQueue()
+    payload = SubmissionCreate(problemId=str(ObjectId()), language="python", sourceCode="print(1)")
+    submission = await create_submission_service(payload, str(ObjectId()), StubEngine(), redis)
+    assert json.loads(redis.queued[1])["fingerprint"] == submission.fingerprint
+    assert redis.counts == {"judged": 1}
+
+@pytest.mark.anyio
+async def test_fingerprint_ignores_line_endings_but_not_limits():
+    problem = ObjectId()
+    base = submission_fingerprint(problem, 1, "python", "print(1)\n", 1000, 1 << 26)
+    assert submission_fingerprint(problem, 1, "python", "print(1)\r\n\n", 1000, 1 << 26) == base
+    assert submission_fingerprint(problem, 2, "python", "print(1)\n", 1000, 1 << 26) != base
+    assert submission_fingerprint(problem, 1, "python", "print(1)\n", 2000, 1 << 26) != base
+    assert submission_fingerprint(problem, 1, "python", "print( 1)\n", 1000, 1 << 26) != base
+
+class StubRedisStream:
+    def __init__(self):
+        self.added = None
+
+    async def xadd(self, key, fields):
+        self.added = (key, fields)
+        return b"1-0"
+
+@pytest.mark.anyio
+async def test_create_submission_enqueues_to_stream(monkeypatch):
+    monkeypatch.setattr(config, "SUBMISSION_QUEUE_BACKEND", "stream")
+    monkeypatch.setattr(config, "SUBMISSION_STREAM_KEY", None)
+    payload = SubmissionCreate(problemId=str(ObjectId()), language="python", sourceCode="print(1)")
+    redis = StubRedisStream()
+    submission = await create_submission_service(payload, str(ObjectId()), StubEngine(), redis)
+    key, fields = redis.added
+    assert key == f"{config.SUBMISSION_QUEUE_KEY}:stream"
+    assert json.loads(fields["job"])["sourceCode"] == submission.sourceCode
 
 # Stub for pubsub-based event subscription
 class FakePubSub:
@@ -146,6 +319,9 @@ class FakeRedisPubSub:
         self.last_pubsub = FakePubSub(self._messages)
         return self.last_pubsub
 
+    async def xrange(self, key, min="-", max="+"):
+        return []
+
 @pytest.mark.anyio
 async def test_subscribe_submission_events():
     config.TERMINAL = ['done']
@@ -160,3 +336,411 @@ async def test_subscribe_submission_events():
     assert received == [{"status": "running"}, {"status": "done"}]
     # Ensure unsubscribe was called on the actual pubsub instance
     assert fake_redis.last_pubsub is not None and fake_redis.last_pubsub.unsubscribed
+
+# Stub for the shared pub/sub connection behind SubmissionEventHub
+class FakeSharedPubSub:
+    def __init__(self):
+        self.channels = []
+        self.commands = []
+        self.incoming = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.commands.append(("subscribe", channel))
+        self.channels.append(channel)
+
+    async def unsubscribe(self, channel):
+        self.commands.append(("unsubscribe", channel))
+        self.channels.remove(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.incoming.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def publish(self, channel, data):
+        self.incoming.put_nowait({"type": "message", "channel": channel.encode(), "data": json.dumps(data)})
+
+    async def aclose(self):
+        pass
+
+class FakeRedisHub:
+    def __init__(self, logged=()):
+        self.pubsubs = []
+        # the submission's event log: (entry id, message)
+        self.logged = list(logged)
+        self.ranges = []
+
+    def pubsub(self):
+        self.pubsubs.append(FakeSharedPubSub())
+        return self.pubsubs[-1]
+
+    async def xrange(self, key, min="-", max="+"):
+        self.ranges.append((key, min))
+        after = min[1:] if min.startswith("(") else None
+        ids = [entry_id for entry_id, _ in self.logged]
+        start = ids.index(after) + 1 if after else 0
+        return [
+            (entry_id.encode(), {b"data": json.dumps(message).encode()})
+            for entry_id, message in self.logged[start:]
+        ]
+
+    async def xrevrange(self, key, max="+", min="-", count=None):
+        return [
+            (entry_id.encode(), {b"data": json.dumps(message).encode()})
+            for entry_id, message in reversed(self.logged)
+        ][:count]
+
+# Stub engine holding one stored submission status
+class StubStatusEngine:
+    def __init__(self, status):
+        self.status = status
+
+    def get_collection(self, model):
+        return self
+
+    async def find_one(self, filter, projection=None):
+        return {"_id": filter["_id"], "status": self.status}
+
+async def _collect(submission_id, redis, hub, out, **kwargs):
+    async for update in subscribe_submission_events(submission_id, redis, hub, **kwargs):
+        out.append(update)
+
+@pytest.mark.anyio
+async def test_hub_shares_one_pubsub_between_watchers(monkeypatch):
+    monkeypatch.setattr(config, "TERMINAL", ["success"])
+    redis = FakeRedisHub()
+    hub = SubmissionEventHub(redis, poll_sec=0.01)
+    a1, a2, b = [], [], []
+    tasks = [
+        asyncio.create_task(_collect("a", redis, hub, a1)),
+        asyncio.create_task(_collect("a", redis, hub, a2)),
+        asyncio.create_task(_collect("b", redis, hub, b)),
+    ]
+    while hub.watcher_count < 3:
+        await asyncio.sleep(0.01)
+    pubsub, = redis.pubsubs
+    assert pubsub.commands == [("subscribe", "a"), ("subscribe", "b")]
+
+    pubsub.publish("a", {"status": "running"})
+    pubsub.publish("a", {"status": "success"})
+    pubsub.publish("b", {"status": "success"})
+    await asyncio.wait_for(asyncio.gather(*tasks), 2)
+
+    assert a1 == a2 == [{"status": "running"}, {"status": "success"}]
+    assert b == [{"status": "success"}]
+    assert sorted(pubsub.commands[2:]) == [("unsubscribe", "a"), ("unsubscribe", "b")]
+    assert hub.channel_count == 0
+    await hub.close()
+
+@pytest.mark.anyio
+async def test_hub_drops_oldest_messages_for_slow_watchers():
+    redis = FakeRedisHub()
+    hub = SubmissionEventHub(redis, queue_size=2, poll_sec=0.01)
+    async with hub.subscribe("a") as queue:
+        pubsub, = redis.pubsubs
+        for completed in range(1, 5):
+            pubsub.publish("a", {"event": "tests", "completed": completed})
+        pubsub.publish("a", {"status": "success"})
+        while pubsub.incoming.qsize():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+        assert [queue.get_nowait(), queue.get_nowait()] == [
+            {"event": "tests", "completed": 4}, {"status": "success"},
+        ]
+    assert hub.dropped == 3
+    assert pubsub.channels == []
+    await hub.close()
+
+@pytest.mark.anyio
+async def test_terminal_submission_replays_its_log_and_ends(monkeypatch):
+    monkeypatch.setattr(config, "TERMINAL", ["success"])
+    redis = FakeRedisHub(logged=[("1-0", {"status": "pending"}), ("2-0", {"status": "success"})])
+    hub = SubmissionEventHub(redis, poll_sec=0.01)
+    received = []
+    await asyncio.wait_for(_collect("sub-id", redis, hub, received), 1)
+    assert received == [
+        {"status": "pending", "eventId": "1-0"}, {"status": "success", "eventId": "2-0"},
+    ]
+    assert hub.channel_count == 0
+    await hub.close()
+
+@pytest.mark.anyio
+async def test_reconnect_resumes_after_last_event_id(monkeypatch):
+    monkeypatch.setattr(config, "TERMINAL", ["success"])
+    redis = FakeRedisHub(logged=[("1-0", {"status": "pending"}), ("2-0", {"status": "running"})])
+    hub = SubmissionEventHub(redis, poll_sec=0.01)
+    received = []
+
+    async def collect():
+        async for update in subscribe_submission_events("sub-id", redis, hub, last_event_id="1-0"):
+            received.append(update)
+    task = asyncio.create_task(collect())
+    while not received:
+        await asyncio.sleep(0.01)
+    pubsub, = redis.pubsubs
+    # published while the log was read: already replayed, so skipped
+    pubsub.publish("sub-id", {"status": "running", "eventId": "2-0"})
+    pubsub.publish("sub-id", {"status": "success", "eventId": "3-0"})
+    await asyncio.wait_for(task, 1)
+
+    assert redis.ranges == [(events_key("sub-id"), "(1-0")]
+    assert received == [
+        {"status": "running", "eventId": "2-0"}, {"status": "success", "eventId": "3-0"},
+    ]
+    await hub.close()
+
+@pytest.mark.anyio
+async def test_reconnect_after_terminal_event_ends_at_once(monkeypatch):
+    monkeypatch.setattr(config, "TERMINAL", ["success"])
+    redis = FakeRedisHub(logged=[("1-0", {"status": "pending"}), ("2-0", {"status": "success"})])
+    hub = SubmissionEventHub(redis, poll_sec=0.01)
+    received = []
+    await asyncio.wait_for(_collect("sub-id", redis, hub, received, last_event_id="2-0"), 1)
+    assert received == [] and hub.channel_count == 0
+    await hub.close()
+
+@pytest.mark.anyio
+async def test_reconnect_after_log_expired_reads_stored_status(monkeypatch):
+    monkeypatch.setattr(config, "TERMINAL", ["success"])
+    redis = FakeRedisHub()
+    hub = SubmissionEventHub(redis, poll_sec=0.01)
+    received = []
+    await asyncio.wait_for(
+        _collect(str(ObjectId()), redis, hub, received,
+                 last_event_id="2-0", engine=StubStatusEngine("success")),
+        1,
+    )
+    assert received == [{"status": "success"}]
+    await hub.close()
+
+# Stub engine for streams that must never fall back to Mongo
+class StubUnreachableEngine:
+    def get_collection(self, model):
+        raise AssertionError("the event log is live, Mongo must not be read")
+
+@pytest.mark.anyio
+async def test_caught_up_reconnect_waits_for_live_events(monkeypatch):
+    monkeypatch.setattr(config, "TERMINAL", ["success"])
+    redis = FakeRedisHub(logged=[("1-0", {"status": "pending"}), ("2-0", {"status": "running"})])
+    hub = SubmissionEventHub(redis, poll_sec=0.01)
+    received = []
+    task = asyncio.create_task(_collect(
+        "sub-id", redis, hub, received, last_event_id="2-0", engine=StubUnreachableEngine()
+    ))
+    while hub.watcher_count < 1:
+        await asyncio.sleep(0.01)
+    pubsub, = redis.pubsubs
+    pubsub.publish("sub-id", {"status": "success", "eventId": "3-0"})
+    await asyncio.wait_for(task, 1)
+
+    assert received == [{"status": "success", "eventId": "3-0"}]
+    await hub.close()
+
+# Stub engine holding coalesced submissions whose leader never settled them
+class StubSweepEngine(StubEngine):
+    def __init__(self, stranded):
+        super().__init__()
+        self.stranded = stranded
+        self.detached = set()
+        self.queries = []
+
+    async def find(self, model, *filters, limit=None):
+        self.queries.append(filters)
+        return self.stranded
+
+    def get_collection(self, model):
+        return self
+
+    async def update_one(self, filter, update):
+        # only the first sweep to get to a submission detaches it
+        matched = filter["_id"] not in self.detached
+        self.detached.add(filter["_id"])
+        return type("Res", (), {"matched_count": int(matched)})()
+
+@pytest.mark.anyio
+async def test_stranded_followers_are_requeued_once():
+    now = datetime.now(timezone.utc)
+    follower = Submission(
+        userId=ObjectId(), problemId=ObjectId(), language="python", sourceCode="print(1)",
+        status="pending", submittedAt=now, createdAt=now, updatedAt=now,
+        timeLimitMs=1000, memoryLimitB=1 << 26, fingerprint="abc", reusedFrom=ObjectId(),
+    )
+    engine = StubSweepEngine([follower])
+    redis = StubRedisQueue()
+
+    assert await requeue_stranded_followers(engine, redis) == 1
+    assert await requeue_stranded_followers(engine, redis) == 0
+    key, raw = redis.queued
+    job = json.loads(raw)
+    assert job["submissionId"] == str(follower.id) and job["fingerprint"] == "abc"
+    assert job["problemId"] == str(follower.problemId)
+    assert "reusedFrom" in str(engine.queries[0]) and "submittedAt" in str(engine.queries[0])
+
+# Stub engine for the submission listings
+class StubListingEngine:
+    def __init__(self, submissions, total=0):
+        self.submissions = submissions
+        self.total = total
+        self.finds = []
+        self.counts = 0
+
+    async def find(self, model, *filters, sort=None, skip=0, limit=None):
+        self.finds.append({"filters": filters, "sort": sort, "skip": skip, "limit": limit})
+        return self.submissions[:limit]
+
+    async def count(self, model, *filters):
+        self.counts += 1
+        return self.total
+
+class StubRedisCache:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = str(value).encode()
+
+def _listed(n):
+    now = datetime.now(timezone.utc)
+    return [
+        Submission(
+            userId=ObjectId(), problemId=ObjectId(), language="python", sourceCode="print(1)",
+            status="success", submittedAt=now, createdAt=now, updatedAt=now,
+            timeLimitMs=1000, memoryLimitB=1 << 26,
+        )
+        for _ in range(n)
+    ]
+
+@pytest.mark.anyio
+async def test_cursor_round_trip():
+    sub, = _listed(1)
+    submitted_at, sub_id = decode_cursor(encode_cursor(sub.submittedAt, sub.id))
+    assert sub_id == sub.id
+    assert abs((submitted_at - sub.submittedAt).total_seconds()) < 0.001
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+@pytest.mark.anyio
+async def test_keyset_page_has_next_cursor_and_skips_count():
+    subs = _listed(4)
+    engine = StubListingEngine(subs)
+    cursor = encode_cursor(subs[0].submittedAt, subs[0].id)
+
+    items, total, next_cursor = await get_user_submissions(
+        str(ObjectId()), engine, page=7, limit=3, cursor=cursor, include_total=False
+    )
+
+    assert items == subs[:3] and total is None and engine.counts == 0
+    assert decode_cursor(next_cursor)[1] == subs[2].id
+    find, = engine.finds
+    # the page starts after the cursor instead of skipping; one extra row detects the end
+    assert (find["skip"], find["limit"]) == (0, 4)
+    assert "$or" in str(find["filters"][-1])
+
+@pytest.mark.anyio
+async def test_last_page_has_no_cursor_and_total_is_cached(monkeypatch):
+    monkeypatch.setattr(config, "SUBMISSION_COUNT_CACHE_TTL_SEC", 60)
+    engine = StubListingEngine(_listed(2), total=12)
+    redis = StubRedisCache()
+    user_id = str(ObjectId())
+
+    for _ in range(2):
+        items, total, next_cursor = await get_user_submissions(user_id, engine, page=4, limit=3, redis=redis)
+        assert (len(items), total, next_cursor) == (2, 12, None)
+    assert engine.counts == 1
+    assert engine.finds[0]["skip"] == 9
+
+@pytest.mark.anyio
+async def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        await get_user_submissions(str(ObjectId()), StubListingEngine([]), cursor="garbage")
+    assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+# Stub aggregation for the summary listing
+class StubAggregateCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length=None):
+        return self.rows
+
+class StubAggregateCollection:
+    def __init__(self, name, rows=()):
+        self.name = name
+        self.rows = list(rows)
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        limit = next(stage["$limit"] for stage in pipeline if "$limit" in stage)
+        return StubAggregateCursor(self.rows[:limit])
+
+class StubSummaryEngine(StubListingEngine):
+    def __init__(self, rows, total=0):
+        super().__init__([], total)
+        self.collections = {
+            "Submission": StubAggregateCollection("submissions", rows),
+            "Problem": StubAggregateCollection("problems"),
+        }
+
+    def get_collection(self, model):
+        return self.collections[model.__name__]
+
+@pytest.mark.anyio
+async def test_summaries_come_from_one_projected_aggregation():
+    user_id, problem_id = ObjectId(), ObjectId()
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"_id": ObjectId(), "userId": user_id, "problemId": problem_id, "status": "success",
+         "createdAt": now, "submittedAt": now, "problem": {"pId": 7, "title": "Two Sum"}},
+        {"_id": ObjectId(), "userId": user_id, "problemId": ObjectId(), "status": "failed",
+         "createdAt": now, "submittedAt": now},
+        {"_id": ObjectId(), "userId": user_id, "problemId": problem_id, "status": "success",
+         "createdAt": now, "submittedAt": now, "problem": {"pId": 7, "title": "Two Sum"}},
+    ]
+    engine = StubSummaryEngine(rows, total=5)
+
+    items, total, next_cursor = await get_user_submissions_response(
+        str(user_id), engine, limit=2, include_total=True
+    )
+
+    assert [(s.pId, s.title) for s in items] == [(7, "Two Sum"), (0, "Unknown Problem")]
+    assert items[0].id == str(rows[0]["_id"]) and total == 5 and engine.finds == []
+    assert decode_cursor(next_cursor)[1] == rows[1]["_id"]
+    pipeline, = engine.collections["Submission"].pipelines
+    stages = [next(iter(stage)) for stage in pipeline]
+    assert stages == ["$match", "$sort", "$skip", "$limit", "$project", "$lookup", "$unwind"]
+    # only summary fields are read; the problem join keeps just pId and title
+    assert "sourceCode" not in pipeline[4]["$project"] and "result" not in pipeline[4]["$project"]
+    assert pipeline[5]["$lookup"]["from"] == "problems"
+    assert pipeline[5]["$lookup"]["pipeline"] == [{"$project": {"_id": 0, "pId": 1, "title": 1}}]
+
+
+@pytest.mark.anyio
+async def test_submission_listing_carries_its_paging_in_the_body():
+    from types import SimpleNamespace
+    from Platform.src.submission_management.router import list_my_submissions
+
+    user_id = ObjectId()
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"_id": ObjectId(), "userId": user_id, "problemId": ObjectId(), "status": "success",
+         "createdAt": now, "submittedAt": now, "problem": {"pId": 7, "title": "Two Sum"}}
+        for _ in range(2)
+    ]
+    engine = StubSummaryEngine(rows, total=3)
+
+    body = await list_my_submissions(
+        page=1, limit=1, cursor=None, includeTotal=True,
+        current_user=SimpleNamespace(id=str(user_id)), engine=engine, redis=None,
+    )
+
+    dumped = body.model_dump()
+    assert set(dumped) == {"items", "nextCursor", "total"}
+    assert [item["title"] for item in dumped["items"]] == ["Two Sum"]
+    assert dumped["total"] == 3
+    assert decode_cursor(dumped["nextCursor"])[1] == rows[0]["_id"]
@@ -0,0 +1,739 @@
+"""
+Offline benchmark for the judge.
+
+Drives `run_in_sandbox` ("sandbox" mode) and the full `process_job`
+pipeline ("pipeline" mode) with a synthetic corpus per language: tiny
+(a + b), CPU-heavy, I/O-heavy and memory-heavy submissions. The pipeline
+runs against in-process stand-ins for Redis, Mongo and the Platform's
+test-case API, so only the judge itself is measured; everything else
+(sandbox settings, compile cache, warm pool, workspace pool) comes from
+the judge config, exactly as in a worker.
+
+    python -m judge_service.benchmark --mode all --jobs 20 --concurrency 4 \\
+        --output bench.json [--baseline previous.json]
+
+Reports throughput and p50/p95/p99 latency per stage (queue wait, fetch,
+compile, run, compare, persist, end to end). Per-job stage times are the
+sum over the job's test cases. The JSON written with --output can be
+passed back as --baseline to print the change against an earlier run.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+from bson import ObjectId
+
+from judge_service.config.config import config
+from judge_service import job_processor, sandbox
+from judge_service.checkers import ExactChecker
+from judge_service.core.dependencies import (
+    get_checker_programs, get_compile_cache, get_interpreter_pool, get_testcase_cache,
+    get_workspace_pool,
+)
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ("python", "javascript", "cpp", "java")
+KINDS = ("tiny", "cpu", "io", "memory")
+STAGES = ("queue_wait", "fetch", "compile", "run", "compare", "persist", "total")
+TERMINAL = ("success", "failed", "compile_error")
+
+_TOOLCHAIN = {"python": "python3", "javascript": "node", "cpp": "g++", "java": "javac"}
+_MOD = 1_000_000_007
+
+
+# ─── corpus ──────────────────────────────────────────────────────────────────
+
+_SOURCES = {
+    "tiny": {
+        "python": "a, b = map(int, input().split())\nprint(a + b)\n",
+        "javascript": (
+            "const [a, b] = require('fs').readFileSync(0, 'utf8').trim().split(/\\s+/).map(Number);\n"
+            "console.log(a + b);\n"
+        ),
+        "cpp": (
+            "#include <iostream>\n"
+            "int main() { long long a, b; std::cin >> a >> b; std::cout << a + b << '\\n'; }\n"
+        ),
+        "java": (
+            "import java.util.*;\n"
+            "public class Main { public static void main(String[] args) {\n"
+            "  Scanner in = new Scanner(System.in);\n"
+            "  System.out.println(in.nextLong() + in.nextLong());\n"
+            "} }\n"
+        ),
+    },
+    # sum of i*i mod 1e9+7 for i < n
+    "cpu": {
+        "python": (
+            "n = int(input())\ns = 0\n"
+            "for i in range(n):\n    s = (s + i * i) % 1000000007\nprint(s)\n"
+        ),
+        "javascript": (
+            "const n = Number(require('fs').readFileSync(0, 'utf8'));\n"
+            "let s = 0;\n"
+            "for (let i = 0; i < n; i++) s = (s + (i * i) % 1000000007) % 1000000007;\n"
+            "console.log(s);\n"
+        ),
+        "cpp": (
+            "#include <cstdio>\n"
+            "int main() { long long n, s = 0; scanf(\"%lld\", &n);\n"
+            "  for (long long i = 0; i < n; i++) s = (s + i * i) % 1000000007;\n"
+            "  printf(\"%lld\\n\", s); }\n"
+        ),
+        "java": (
+            "import java.util.*;\n"
+            "public class Main { public static void main(String[] args) {\n"
+            "  long n = new Scanner(System.in).nextLong(), s = 0;\n"
+            "  for (long i = 0; i < n; i++) s = (s + i * i) % 1000000007L;\n"
+            "  System.out.println(s);\n"
+            "} }\n"
+        ),
+    },
+    # one integer per line in, each doubled out
+    "io": {
+        "python": "import sys\nsys.stdout.write(''.join(f'{int(l) * 2}\\n' for l in sys.stdin))\n",
+        "javascript": (
+            "const lines = require('fs').readFileSync(0, 'utf8').split('\\n').filter(Boolean);\n"
+            "process.stdout.write(lines.map(l => String(Number(l) * 2)).join('\\n') + '\\n');\n"
+        ),
+        "cpp": (
+            "#include <cstdio>\n"
+            "int main() { long long x; while (scanf(\"%lld\", &x) == 1) printf(\"%lld\\n\", x * 2); }\n"
+        ),
+        "java": (
+            "import java.io.*;\n"
+            "public class Main { public static void main(String[] args) throws IOException {\n"
+            "  BufferedReader in = new BufferedReader(new InputStreamReader(System.in));\n"
+            "  StringBuilder out = new StringBuilder();\n"
+            "  for (String l; (l = in.readLine()) != null; ) if (!l.isEmpty())\n"
+            "    out.append(Long.parseLong(l) * 2).append('\\n');\n"
+            "  System.out.print(out);\n"
+            "} }\n"
+        ),
+    },
+    # fill n bytes with i % 256, print the sum of every 4093rd byte
+    "memory": {
+        "python": (
+            "n = int(input())\na = bytes(range(256)) * (n // 256)\n"
+            "print(sum(a[::4093]))\n"
+        ),
+        "javascript": (
+            "const n = Number(require('fs').readFileSync(0, 'utf8'));\n"
+            "const a = new Uint8Array(n);\n"
+            "for (let i = 0; i < n; i++) a[i] = i & 255;\n"
+            "let s = 0;\n"
+            "for (let i = 0; i < n; i += 4093) s += a[i];\n"
+            "console.log(s);\n"
+        ),
+        "cpp": (
+            "#include <cstdio>\n#include <vector>\n"
+            "int main() { long long n, s = 0; scanf(\"%lld\", &n);\n"
+            "  std::vector<unsigned char> a(n);\n"
+            "  for (long long i = 0; i < n; i++) a[i] = i & 255;\n"
+            "  for (long long i = 0; i < n; i += 4093) s += a[i];\n"
+            "  printf(\"%lld\\n\", s); }\n"
+        ),
+        "java": (
+            "import java.util.*;\n"
+            "public class Main { public static void main(String[] args) {\n"
+            "  int n = new Scanner(System.in).nextInt();\n"
+            "  byte[] a = new byte[n];\n"
+            "  for (int i = 0; i < n; i++) a[i] = (byte) i;\n"
+            "  long s = 0;\n"
+            "  for (int i = 0; i < n; i += 4093) s += a[i] & 255;\n"
+            "  System.out.println(s);\n"
+            "} }\n"
+        ),
+    },
+}
+
+# loop length per language for the CPU-heavy kind (~0.2-0.5s each)
+_CPU_N = {"python": 1_000_000, "javascript": 10_000_000, "cpp": 50_000_000, "java": 50_000_000}
+_IO_LINES = 200_000
+_MEMORY_BYTES = 64 * 1024 * 1024
+
+# Node and the JVM reserve far more address space than they use, and
+# RLIMIT_AS applies whenever no cgroup is configured
+_MIN_MEMORY_MB = {"javascript": 1024, "java": 1024}
+
+
+class Scenario(NamedTuple):
+    language: str
+    kind: str
+    source: str
+    tests: List[Dict[str, Any]]  # in the Platform's test-case API format
+    time_limit_ms: int
+    memory_limit_b: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.language}/{self.kind}"
+
+
+def _testcase(inp: str, expected: str) -> Dict[str, Any]:
+    return {"caseId": str(ObjectId()), "isRemote": False, "input": inp, "expectedOutput": expected}
+
+
+def _squares_mod(n: int) -> int:
+    return (n - 1) * n * (2 * n - 1) // 6 % _MOD
+
+
+def build_corpus(languages=LANGUAGES, kinds=KINDS) -> List[Scenario]:
+    """One scenario per available language and kind."""
+    scenarios = []
+    for language in languages:
+        if shutil.which(_TOOLCHAIN[language]) is None:
+            logger.warning("Skipping %s: %s not found", language, _TOOLCHAIN[language])
+            continue
+        for kind in kinds:
+            time_limit_ms, memory_mb = 2000, 256
+            if kind == "tiny":
+                tests = [_testcase(f"{a} {b}\n", f"{a + b}\n") for a, b in ((1, 2), (40, 2), (10**9, 10**9))]
+            elif kind == "cpu":
+                n = _CPU_N[language]
+                tests = [_testcase(f"{n}\n", f"{_squares_mod(n)}\n")]
+                time_limit_ms = 5000
+            elif kind == "io":
+                numbers = range(_IO_LINES)
+                tests = [_testcase(
+                    "".join(f"{i}\n" for i in numbers), "".join(f"{i * 2}\n" for i in numbers)
+                )]
+            elif kind == "memory":
+                n = _MEMORY_BYTES
+                tests = [_testcase(f"{n}\n", f"{sum(i % 256 for i in range(0, n, 4093))}\n")]
+                memory_mb = 512
+            else:
+                raise ValueError(f"Unknown kind {kind!r}")
+            memory_mb = max(memory_mb, _MIN_MEMORY_MB.get(language, 0))
+            scenarios.append(Scenario(
+                language, kind, _SOURCES[kind][language], tests,
+                time_limit_ms, memory_mb * 1024 * 1024,
+            ))
+    return scenarios
+
+
+# ─── stand-ins ───────────────────────────────────────────────────────────────
+
+class LocalRedis:
+    """The slice of redis.asyncio.Redis the judge uses: a list queue, publish and event logs."""
+
+    def __init__(self):
+        self._lists: Dict[str, List[bytes]] = defaultdict(list)
+        self._streams: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._stream_seq = 0
+        self._pushed = asyncio.Condition()
+        self.on_publish: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
+    async def lpush(self, key: str, value) -> int:
+        async with self._pushed:
+            self._lists[key].insert(0, value.encode() if isinstance(value, str) else value)
+            self._pushed.notify()
+            return len(self._lists[key])
+
+    async def brpop(self, key: str, timeout: float = 0):
+        async with self._pushed:
+            try:
+                await asyncio.wait_for(
+                    self._pushed.wait_for(lambda: self._lists[key]), timeout or None
+                )
+            except asyncio.TimeoutError:
+                return None
+            return key.encode(), self._lists[key].pop()
+
+    async def llen(self, key: str) -> int:
+        return len(self._lists[key])
+
+    async def publish(self, channel: str, message: str) -> int:
+        if self.on_publish is not None:
+            self.on_publish(channel, json.loads(message))
+        return 0
+
+    async def xadd(self, key: str, fields: Dict[str, Any], maxlen: Optional[int] = None,
+                   approximate: bool = True) -> bytes:
+        self._stream_seq += 1
+        entries = self._streams[key]
+        entries.append(fields)
+        if maxlen is not None:
+            del entries[:-maxlen]
+        return f"{self._stream_seq}-0".encode()
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        return key in self._streams
+
+    def pipeline(self, transaction: bool = True) -> "_LocalPipeline":
+        return _LocalPipeline(self)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _LocalPipeline:
+    """Queues LocalRedis calls and runs them in order on execute()."""
+
+    def __init__(self, redis: LocalRedis):
+        self._redis = redis
+        self._calls: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        calls, self._calls = self._calls, []
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class _UpdateResult(NamedTuple):
+    matched_count: int
+    modified_count: int
+
+
+class _LocalCollection:
+    """Enough of a Motor collection for the judge's reads and conditional updates."""
+
+    def __init__(self, latency_sec: float):
+        self.docs: Dict[ObjectId, Dict[str, Any]] = {}
+        self.latency_sec = latency_sec
+
+    async def find_one(self, query: Dict[str, Any], projection=None) -> Optional[Dict[str, Any]]:
+        await self._round_trip()
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc is not None and self._matches(doc, query) else None
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any]) -> _UpdateResult:
+        await self._round_trip()
+        doc = self.docs.get(query["_id"])
+        if doc is None or not self._matches(doc, query):
+            return _UpdateResult(0, 0)
+        doc.update(update.get("$set", {}))
+        return _UpdateResult(1, 1)
+
+    @staticmethod
+    def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+        for field, wanted in query.items():
+            if isinstance(wanted, dict) and "$in" in wanted:
+                if doc.get(field) not in wanted["$in"]:
+                    return False
+            elif doc.get(field) != wanted:
+                return False
+        return True
+
+    async def _round_trip(self) -> None:
+        await asyncio.sleep(self.latency_sec)
+
+
+class LocalMongo:
+    """AIOEngine stand-in: one in-memory collection for submissions."""
+
+    def __init__(self, latency_sec: float = 0.0):
+        self.submissions = _LocalCollection(latency_sec)
+
+    def get_collection(self, model) -> _LocalCollection:
+        return self.submissions
+
+
+def testcase_api(scenarios: Dict[str, Scenario]) -> httpx.AsyncClient:
+    """HTTP client answering the Platform's test-case API from the corpus, with ETags."""
+    by_url = {
+        str(httpx.URL(config.TESTCASE_API_FORMAT.format(problemId=problem_id))): scenario
+        for problem_id, scenario in scenarios.items()
+    }
+    bodies = {url: json.dumps({"testCases": s.tests}).encode() for url, s in by_url.items()}
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        url = str(request.url.copy_with(query=None))
+        if url not in bodies:
+            return httpx.Response(404)
+        etag = f'"{hash(bodies[url]) & 0xffffffff:x}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(
+            200, content=bodies[url], headers={"etag": etag, "content-type": "application/json"}
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+
+# ─── statistics ──────────────────────────────────────────────────────────────
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (0 <= q <= 100) of a sorted list."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    values = sorted(samples_ms)
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(values[-1], 3) if values else 0.0,
+    }
+
+
+# ─── pipeline mode ───────────────────────────────────────────────────────────
+
+class _JobRecord:
+    def __init__(self, scenario: Scenario, enqueued_at: float):
+        self.scenario = scenario
+        self.enqueued_at = enqueued_at
+        self.finished_at: Optional[float] = None
+        self.status: Optional[str] = None
+        self.stages: Dict[str, float] = defaultdict(float)
+
+
+async def bench_pipeline(
+    scenarios: List[Scenario],
+    jobs: int,
+    concurrency: int,
+    rate: float = 0.0,
+    unique_sources: bool = False,
+    persist_latency_ms: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Push `jobs` submissions of every scenario through `process_job` with
+    `concurrency` concurrent workers and measure where the time goes. Jobs
+    of all scenarios are interleaved; `rate` > 0 spaces arrivals at that
+    many jobs per second, otherwise the whole batch is queued up front.
+    """
+    redis = LocalRedis()
+    mongo = LocalMongo(persist_latency_ms / 1000)
+    problems = {f"bench-{s.language}-{s.kind}": s for s in scenarios}
+    records: Dict[str, _JobRecord] = {}
+    all_done = asyncio.Event()
+    total = jobs * len(scenarios)
+    errors = 0
+
+    def on_publish(channel: str, message: Dict[str, Any]) -> None:
+        record = records.get(channel)
+        if record is not None and message.get("status") in TERMINAL and record.status is None:
+            record.status = message["status"]
+            record.finished_at = time.perf_counter()
+            _check_done()
+
+    def on_stage(stage: str, seconds: float, submission_id: str, language: str) -> None:
+        record = records.get(submission_id)
+        if record is not None:
+            record.stages[stage] += seconds * 1000
+
+    def _check_done() -> None:
+        if sum(1 for r in records.values() if r.status) + errors >= total:
+            all_done.set()
+
+    redis.on_publish = on_publish
+    job_processor.STAGE_OBSERVERS.append(on_stage)
+    http_client = testcase_api(problems)
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            try:
+                await job_processor.process_job(mongo, redis, http_client)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Benchmark job failed")
+                errors += 1
+                _check_done()
+
+    async def producer() -> None:
+        order = [(i, s) for i in range(jobs) for s in scenarios]
+        for n, (i, scenario) in enumerate(order):
+            source = scenario.source
+            if unique_sources:
+                # a distinct build per job: defeats the compile cache
+                comment = "#" if scenario.language == "python" else "//"
+                source += f"{comment} {uuid.uuid4().hex}\n"
+            obj_id = ObjectId()
+            mongo.submissions.docs[obj_id] = {"_id": obj_id, "status": "pending"}
+            records[str(obj_id)] = _JobRecord(scenario, time.perf_counter())
+            await redis.lpush(config.QUEUE_KEY, json.dumps({
+                "submissionId": str(obj_id),
+                "problemId": f"bench-{scenario.language}-{scenario.kind}",
+                "language": scenario.language,
+                "sourceCode": source,
+                "timeLimitMs": scenario.time_limit_ms,
+                "memoryLimitB": scenario.memory_limit_b,
+                "enqueuedAt": time.time(),
+            }))
+            if rate > 0 and n + 1 < len(order):
+                await asyncio.sleep(1 / rate)
+
+    started = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        await producer()
+        await all_done.wait()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        job_processor.STAGE_OBSERVERS.remove(on_stage)
+        await http_client.aclose()
+    wall_sec = time.perf_counter() - started
+
+    for record in records.values():
+        if record.finished_at is not None:
+            record.stages["total"] = (record.finished_at - record.enqueued_at) * 1000
+
+    report = {
+        "wall_sec": round(wall_sec, 3),
+        "jobs": total,
+        "errors": errors,
+        "throughput_jobs_per_sec": round(total / wall_sec, 3) if wall_sec else 0.0,
+        "latency_ms": _stage_summary(records.values()),
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        mine = [r for r in records.values() if r.scenario is scenario]
+        report["scenarios"][scenario.name] = {
+            "jobs": len(mine),
+            "statuses": dict(Counter(r.status or "error" for r in mine)),
+            "latency_ms": _stage_summary(mine),
+        }
+    return report
+
+
+def _stage_summary(records) -> Dict[str, Dict[str, float]]:
+    records = list(records)
+    return {
+        stage: summarize([r.stages[stage] for r in records if stage in r.stages])
+        for stage in STAGES
+    }
+
+
+# ─── sandbox mode ────────────────────────────────────────────────────────────
+
+async def bench_sandbox(scenarios: List[Scenario], repeat: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Call `run_in_sandbox` (compile, one run, teardown) `repeat` times per
+    scenario test case, `concurrency` at a time, one scenario after another.
+    """
+    report = {"scenarios": {}}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    for scenario in scenarios:
+        samples: Dict[str, List[float]] = defaultdict(list)
+        verdicts: Counter = Counter()
+
+        async def one(tc: Dict[str, Any]) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                res = await sandbox.run_in_sandbox(
+                    scenario.language, scenario.source, stdin=tc["input"],
+                    timeout_sec=scenario.time_limit_ms / 1000,
+                    memory_bytes=scenario.memory_limit_b,
+                    workspaces=get_workspace_pool(),
+                    checker=ExactChecker(tc["expectedOutput"]),
+                )
+                samples["total"].append((time.perf_counter() - start) * 1000)
+            verdicts[res["verdict"]] += 1
+            for key, name in (("runtime_ms", "cpu"), ("wall_time_ms", "wall"),
+                              ("setup_ms", "setup"), ("teardown_ms", "teardown")):
+                if res.get(key) is not None:
+                    samples[name].append(res[key])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(tc) for _ in range(repeat) for tc in scenario.tests))
+        wall_sec = time.perf_counter() - started
+        runs = repeat * len(scenario.tests)
+        report["scenarios"][scenario.name] = {
+            "runs": runs,
+            "verdicts": dict(verdicts),
+            "throughput_runs_per_sec": round(runs / wall_sec, 3) if wall_sec else 0.0,
+            "latency_ms": {name: summarize(values) for name, values in samples.items()},
+        }
+    return report
+
+
+# ─── reporting ───────────────────────────────────────────────────────────────
+
+def _print_pipeline(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    base = (baseline or {}).get("pipeline") or {}
+    print(
+        f"\npipeline: {report['jobs']} jobs in {report['wall_sec']}s, "
+        f"{report['throughput_jobs_per_sec']} jobs/s{_delta(report, base, 'throughput_jobs_per_sec')}"
+    )
+    print(f"  {'scenario':<20} {'stage':<11} {'p50':>10} {'p95':>10} {'p99':>10}")
+    rows = [("all", report["latency_ms"], base.get("latency_ms", {}))] + [
+        (name, s["latency_ms"], base.get("scenarios", {}).get(name, {}).get("latency_ms", {}))
+        for name, s in report["scenarios"].items()
+    ]
+    for name, latency, base_latency in rows:
+        for stage in STAGES:
+            stats = latency.get(stage)
+            if not stats or not stats["count"]:
+                continue
+            print(
+                f"  {name:<20} {stage:<11} {stats['p50']:>10.1f} {stats['p95']:>10.1f} "
+                f"{stats['p99']:>10.1f}{_delta(stats, base_latency.get(stage, {}), 'p50')}"
+            )
+
+
+def _print_sandbox(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    base = ((baseline or {}).get("sandbox") or {}).get("scenarios", {})
+    print(f"\nsandbox: {'scenario':<20} {'runs/s':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}  verdicts")
+    for name, s in report["scenarios"].items():
+        total = s["latency_ms"]["total"]
+        print(
+            f"         {name:<20} {s['throughput_runs_per_sec']:>8.2f} {total['p50']:>10.1f} "
+            f"{total['p95']:>10.1f} {total['p99']:>10.1f}  {s['verdicts']}"
+            f"{_delta(total, base.get(name, {}).get('latency_ms', {}).get('total', {}), 'p50')}"
+        )
+
+
+def _delta(current: Dict[str, Any], base: Dict[str, Any], key: str) -> str:
+    if not base.get(key) or key not in current:
+        return ""
+    change = (current[key] - base[key]) / base[key] * 100
+    return f"  ({change:+.1f}% {key} vs baseline)"
+
+
+def _host_info() -> Dict[str, Any]:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count()
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": cpus,
+    }
+
+
+@contextlib.asynccontextmanager
+async def _judge_runtime():
+    """Configure the sandbox and shared pools the way main.py does."""
+    sandbox.configure(
+        wall_time_factor=config.WALL_TIME_FACTOR,
+        wall_time_extra_sec=config.WALL_TIME_EXTRA_SEC,
+        cgroup_root=config.CGROUP_ROOT,
+        output_limit_bytes=config.OUTPUT_LIMIT_BYTES,
+        stdout_keep_bytes=config.STDOUT_KEEP_BYTES,
+        stderr_keep_bytes=config.STDERR_LIMIT_BYTES,
+    )
+    pool = get_interpreter_pool()
+    if pool:
+        pool.start()
+    get_workspace_pool()
+    try:
+        yield
+    finally:
+        if pool:
+            await pool.close()
+        get_checker_programs().close()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    scenarios = build_corpus(args.languages, args.kinds)
+    if not scenarios:
+        raise SystemExit("No scenario to run: none of the selected toolchains is installed")
+
+    report: Dict[str, Any] = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "host": _host_info(),
+        "settings": {
+            key: value for key, value in vars(args).items() if key not in ("output", "baseline")
+        },
+        "judge": {
+            "warm_pool_size": config.WARM_POOL_SIZE,
+            "workspace_pool_dir": config.WORKSPACE_POOL_DIR,
+            "compile_cache_dir": config.COMPILE_CACHE_DIR,
+            "cgroup_root": config.CGROUP_ROOT,
+        },
+    }
+    async with _judge_runtime():
+        if args.mode in ("sandbox", "all"):
+            report["sandbox"] = await bench_sandbox(scenarios, args.repeat, args.concurrency)
+        if args.mode in ("pipeline", "all"):
+            report["pipeline"] = await bench_pipeline(
+                scenarios, args.jobs, args.concurrency, rate=args.rate,
+                unique_sources=args.unique_sources, persist_latency_ms=args.persist_latency_ms,
+            )
+        cache = get_compile_cache()
+        tc_cache = get_testcase_cache()
+        pool = get_interpreter_pool()
+        report["caches"] = {
+            "compile": cache.stats() if cache else None,
+            "testcases": tc_cache.stats() if tc_cache else None,
+            "warm_pool": pool.stats() if pool else None,
+        }
+    return report
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m judge_service.benchmark", description=__doc__.split("\n\n")[0].strip()
+    )
+    parser.add_argument("--mode", choices=("sandbox", "pipeline", "all"), default="all")
+    parser.add_argument("--languages", nargs="+", choices=LANGUAGES, default=list(LANGUAGES))
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--jobs", type=int, default=10, help="pipeline jobs per scenario")
+    parser.add_argument("--repeat", type=int, default=5, help="sandbox runs per test case")
+    parser.add_argument("--concurrency", type=int, default=max(1, config.WORKER_CONCURRENCY),
+                        help="concurrent jobs (pipeline) or runs (sandbox)")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="pipeline arrivals per second; 0 queues everything up front")
+    parser.add_argument("--unique-sources", action="store_true",
+                        help="make every pipeline source distinct so nothing hits the compile cache")
+    parser.add_argument("--persist-latency-ms", type=float, default=0.0,
+                        help="simulated Mongo round trip for the in-memory stand-in")
+    parser.add_argument("--output", help="write the JSON report here ('-' for stdout)")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = _parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(), stream=sys.stderr,
+        format="[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s",
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = asyncio.run(run(args))
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        if "sandbox" in report:
+            _print_sandbox(report["sandbox"], baseline)
+        if "pipeline" in report:
+            _print_pipeline(report["pipeline"], baseline)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nreport written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import math
+import shutil
+import logging
+from typing import Dict, List, NamedTuple, Optional
+
+from judge_service.sandbox import compile_submission, run_compiled
+
+logger = logging.getLogger(__name__)
+
+
+class Benchmark(NamedTuple):
+    name: str
+    language: str
+    source: str
+    # best-of-N CPU time on the reference node that problem limits are set for
+    reference_ms: float
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("python-int-dict", "python", """
+def main():
+    total = 0
+    table = {}
+    for i in range(1500000):
+        total = (total + i * i) % 1000003
+        table[i & 1023] = total
+    print(total, len(table))
+main()
+""", 300.0),
+    Benchmark("cpp-sieve", "cpp", r"""
+#include <cstdio>
+#include <vector>
+int main() {
+    std::vector<unsigned> sieve(4000000, 0);
+    unsigned long long acc = 0;
+    for (unsigned i = 2; i < sieve.size(); ++i) {
+        if (sieve[i]) continue;
+        acc += i;
+        for (unsigned long long j = 1ULL * i * i; j < sieve.size(); j += i) sieve[j] = 1;
+    }
+    for (int r = 0; r < 10; ++r)
+        for (unsigned i = 0; i < sieve.size(); ++i) acc = acc * 31 + sieve[i];
+    std::printf("%llu\\n", acc);
+}
+""", 350.0),
+]
+
+# toolchain each benchmark language needs; benchmarks without one are skipped
+_TOOLCHAINS = {"python": "python3", "cpp": "g++"}
+
+# a factor outside these bounds means the measurement went wrong
+MIN_SPEED_FACTOR = 0.25
+MAX_SPEED_FACTOR = 4.0
+
+
+async def measure_speed_factor(
+    benchmarks: Optional[List[Benchmark]] = None, runs: int = 3
+) -> Optional[float]:
+    """
+    Run the fixed benchmark set and return this node's speed factor: the
+    geometric mean of measured / reference CPU time (above 1 = slower than
+    the reference node, so limits are raised). Each benchmark counts with
+    its best of `runs` runs. Returns None when no benchmark could run.
+    """
+    ratios: Dict[str, float] = {}
+    for bench in benchmarks if benchmarks is not None else BENCHMARKS:
+        if not shutil.which(_TOOLCHAINS.get(bench.language, bench.language)):
+            logger.info("Calibration: skipping %s, no %s toolchain", bench.name, bench.language)
+            continue
+        best = await _best_cpu_ms(bench, runs)
+        if best is None:
+            continue
+        ratios[bench.name] = best / bench.reference_ms
+        logger.info(
+            "Calibration: %s took %.1fms (reference %.1fms, ratio %.2f)",
+            bench.name, best, bench.reference_ms, ratios[bench.name]
+        )
+
+    if not ratios:
+        logger.warning("Calibration: no benchmark could run, keeping the configured speed factor")
+        return None
+    factor = math.exp(sum(math.log(r) for r in ratios.values()) / len(ratios))
+    clamped = min(MAX_SPEED_FACTOR, max(MIN_SPEED_FACTOR, factor))
+    if clamped != factor:
+        logger.warning("Calibration: speed factor %.2f out of bounds, using %.2f", factor, clamped)
+    logger.info("Calibration: node speed factor %.2f", clamped)
+    return clamped
+
+
+async def _best_cpu_ms(bench: Benchmark, runs: int) -> Optional[float]:
+    artifact = await compile_submission(bench.language, bench.source)
+    try:
+        if not artifact.ok:
+            logger.error("Calibration: %s did not compile: %s", bench.name, artifact.compiler_msg)
+            return None
+        times = []
+        for _ in range(runs):
+            # generous limits: the benchmark must never be cut short
+            result = await run_compiled(
+                artifact, timeout_sec=30, memory_bytes=512 * 1024 * 1024,
+                adjust_limits=False,
+            )
+            if result["verdict"] != "OK":
+                logger.error("Calibration: %s failed with %s", bench.name, result["verdict"])
+                return None
+            times.append(result["runtime_ms"])
+        return min(times)
+    finally:
+        artifact.cleanup()
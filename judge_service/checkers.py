@@ -0,0 +1,306 @@
+import io
+import math
+import re
+import logging
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _as_stream(expected: Union[BinaryIO, bytes, str]) -> BinaryIO:
+    if isinstance(expected, str):
+        expected = expected.encode()
+    if isinstance(expected, (bytes, bytearray)):
+        expected = io.BytesIO(expected)
+    return expected
+
+
+def _common_prefix_len(a: bytes, b: bytes) -> int:
+    """Length of the common prefix of two equally long byte strings."""
+    if a == b:
+        return len(a)
+    lo, hi = 0, len(a)
+    # invariant: a[:lo] == b[:lo] and a[:hi] != b[:hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+class ExactChecker:
+    """
+    Streaming version of the judge's original comparison,
+    `stdout.strip() == expected.strip()`: output must match the expected file
+    byte for byte except for leading and trailing whitespace.
+
+    Output is passed in with `feed(chunk)` as the program writes it and
+    expected bytes are read from `expected` only as far as needed, so memory
+    stays at a couple of chunks whatever the test size. `feed` returns False
+    as soon as the output can no longer be accepted, so the run can be
+    killed early; `finish()` gives the verdict at end of output.
+    After a mismatch, `diff_line`/`diff_column` (1-based, column in bytes)
+    locate the first differing byte of the program's output.
+    """
+
+    message: Optional[str] = None
+
+    def __init__(self, expected: Union[BinaryIO, bytes, str]):
+        self._expected = _as_stream(expected)
+        self._exp_buf = b""
+        self._exp_started = False  # leading whitespace of expected skipped
+        self._started = False      # leading whitespace of output skipped
+        self._in_tail = False      # streams diverged; only whitespace may follow
+        self.failed = False
+        self.diff_line: Optional[int] = None
+        self.diff_column: Optional[int] = None
+        # position of the next output byte
+        self._line = 1
+        self._column = 1
+        self._divergence = None  # (line, column) where the streams parted
+
+    @property
+    def passed(self) -> bool:
+        return not self.failed
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.failed or not chunk:
+            return not self.failed
+
+        if not self._started:
+            stripped = chunk.lstrip()
+            self._advance(chunk[:len(chunk) - len(stripped)])
+            chunk = stripped
+            if not chunk:
+                return True
+            self._started = True
+
+        while chunk and not self._in_tail:
+            exp = self._expected_bytes()
+            if not exp:
+                # expected output ended: the rest may only be whitespace
+                self._diverge()
+                break
+            n = min(len(chunk), len(exp))
+            k = _common_prefix_len(chunk[:n], exp[:n])
+            self._advance(chunk[:k])
+            self._exp_buf = exp[k:]
+            chunk = chunk[k:]
+            if k < n:
+                self._diverge()
+                if not self._expected_rest_is_blank():
+                    return self._fail()
+
+        if self._in_tail and chunk and not chunk.isspace():
+            return self._fail()
+        return True
+
+    def finish(self) -> bool:
+        """Call at end of output; True if the output is accepted."""
+        if not self.failed and not self._in_tail:
+            self._diverge()
+            if not self._expected_rest_is_blank():
+                self._fail()
+        return self.passed
+
+    # ─── internals ─────────────────────────────────────────────────────────────
+
+    def _expected_bytes(self) -> bytes:
+        if not self._exp_buf:
+            self._exp_buf = self._expected.read(CHUNK_SIZE)
+        if not self._exp_started:
+            while self._exp_buf:
+                self._exp_buf = self._exp_buf.lstrip()
+                if self._exp_buf:
+                    break
+                self._exp_buf = self._expected.read(CHUNK_SIZE)
+            self._exp_started = True
+        return self._exp_buf
+
+    def _expected_rest_is_blank(self) -> bool:
+        rest = self._exp_buf or self._expected.read(CHUNK_SIZE)
+        while rest:
+            if not rest.isspace():
+                return False
+            rest = self._expected.read(CHUNK_SIZE)
+        self._exp_buf = b""
+        return True
+
+    def _diverge(self) -> None:
+        self._in_tail = True
+        self._divergence = (self._line, self._column)
+
+    def _fail(self) -> bool:
+        if not self.failed:
+            self.failed = True
+            self.diff_line, self.diff_column = self._divergence or (self._line, self._column)
+            logger.info("Output differs at line %d, column %d", self.diff_line, self.diff_column)
+        return False
+
+    def _advance(self, data: bytes) -> None:
+        newlines = data.count(b"\n")
+        if newlines:
+            self._line += newlines
+            self._column = len(data) - data.rfind(b"\n")
+        else:
+            self._column += len(data)
+
+
+_TOKEN = re.compile(rb"\S+")
+_NUMBER = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+
+
+class _TokenReader:
+    """Pulls whitespace-separated tokens from a binary stream."""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._buf = b""
+        self._pos = 0
+
+    def next(self) -> Optional[bytes]:
+        while True:
+            m = _TOKEN.search(self._buf, self._pos)
+            if m is None:
+                self._buf, self._pos = self._stream.read(CHUNK_SIZE), 0
+                if not self._buf:
+                    return None
+                continue
+            if m.end() == len(self._buf):
+                # the token may continue in the next chunk
+                more = self._stream.read(CHUNK_SIZE)
+                if more:
+                    self._buf, self._pos = self._buf[m.start():] + more, 0
+                    continue
+            self._pos = m.end()
+            return m.group()
+
+
+class TokenChecker:
+    """
+    Whitespace-insensitive comparison: the output must consist of the same
+    whitespace-separated tokens as the expected file, however they are
+    spaced or split over lines. Both sides are tokenised as they stream in;
+    only the current token of each is held in memory. `diff_line` /
+    `diff_column` point at the start of the first wrong output token (or the
+    end of output when tokens are missing).
+    """
+
+    message: Optional[str] = None
+
+    def __init__(self, expected: Union[BinaryIO, bytes, str]):
+        self._expected = _TokenReader(_as_stream(expected))
+        self._partial = b""  # output token cut by the end of the last chunk
+        self._line = 1       # position of the start of `_partial`/next data
+        self._column = 1
+        self.failed = False
+        self.diff_line: Optional[int] = None
+        self.diff_column: Optional[int] = None
+
+    @property
+    def passed(self) -> bool:
+        return not self.failed
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.failed or not chunk:
+            return not self.failed
+        data = self._partial + chunk
+        last = 0
+        for m in _TOKEN.finditer(data):
+            if m.end() == len(data):
+                break  # may continue in the next chunk
+            self._advance(data[last:m.start()])
+            last = m.start()
+            if not self._check(m.group()):
+                return False
+        else:
+            self._advance(data[last:])
+            self._partial = b""
+            return True
+        self._advance(data[last:m.start()])
+        self._partial = data[m.start():]
+        return True
+
+    def finish(self) -> bool:
+        if self.failed:
+            return False
+        if self._partial and not self._check(self._partial):
+            return False
+        self._advance(self._partial)
+        self._partial = b""
+        if self._expected.next() is not None:
+            self._fail("output ended before all expected tokens")
+        return self.passed
+
+    def _check(self, token: bytes) -> bool:
+        expected = self._expected.next()
+        if expected is None:
+            return self._fail("unexpected extra output")
+        if not self.tokens_match(token, expected):
+            return self._fail(f"expected {expected[:64]!r}, got {token[:64]!r}")
+        return True
+
+    def tokens_match(self, actual: bytes, expected: bytes) -> bool:
+        return actual == expected
+
+    def _fail(self, message: str) -> bool:
+        self.failed = True
+        self.diff_line, self.diff_column = self._line, self._column
+        self.message = message
+        logger.info("Output differs at line %d, column %d: %s", self._line, self._column, message)
+        return False
+
+    def _advance(self, data: bytes) -> None:
+        newlines = data.count(b"\n")
+        if newlines:
+            self._line += newlines
+            self._column = len(data) - data.rfind(b"\n")
+        else:
+            self._column += len(data)
+
+
+class FloatChecker(TokenChecker):
+    """
+    Token comparison where numeric tokens are accepted within an absolute or
+    relative tolerance: |actual - expected| <= max(abs_tol, rel_tol * |expected|).
+    Non-numeric tokens must match exactly.
+    """
+
+    def __init__(self, expected: Union[BinaryIO, bytes, str],
+                 abs_tol: float = 1e-6, rel_tol: float = 1e-6):
+        super().__init__(expected)
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+
+    def tokens_match(self, actual: bytes, expected: bytes) -> bool:
+        if actual == expected:
+            return True
+        if not (_NUMBER.fullmatch(actual) and _NUMBER.fullmatch(expected)):
+            return False
+        a, e = float(actual), float(expected)
+        if not (math.isfinite(a) and math.isfinite(e)):
+            return False
+        return abs(a - e) <= max(self.abs_tol, self.rel_tol * abs(e))
+
+
+BUILTIN_CHECKERS = ("exact", "tokens", "float")
+
+
+def builtin_checker(spec: Optional[Dict[str, Any]], expected: Union[BinaryIO, bytes, str]):
+    """Checker for a problem's checker config (a Problem.checker dict; None = exact)."""
+    kind = (spec or {}).get("type", "exact")
+    if kind == "exact":
+        return ExactChecker(expected)
+    if kind == "tokens":
+        return TokenChecker(expected)
+    if kind == "float":
+        return FloatChecker(
+            expected,
+            abs_tol=float(spec.get("absTolerance", 1e-6)),
+            rel_tol=float(spec.get("relTolerance", 1e-6)),
+        )
+    raise ValueError(f"Not a built-in checker: {kind!r}")
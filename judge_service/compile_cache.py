@@ -0,0 +1,252 @@
+import asyncio
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_META_FILE = "meta.json"
+
+
+class CacheEntry(NamedTuple):
+    ok: bool
+    compiler_msg: str
+
+
+class CompileCache:
+    """
+    On-disk, content-addressed cache of compilation outcomes.
+
+    Entries are keyed by sha256(language, toolchain version, compile command,
+    source). A successful entry holds the files the compiler produced (binary,
+    class files); a failed entry only remembers the compiler message so broken
+    sources are not recompiled either.
+
+    Several worker processes on one host can share `root`:
+      - entries are staged in `tmp/` and published with an atomic rename, so
+        readers never see half-written entries;
+      - eviction takes an exclusive flock and moves victims to `trash/` before
+        deleting them; a reader racing with eviction just sees a miss.
+    LRU order is the mtime of each entry's meta file, bumped on every hit.
+
+    Each process keeps an index of the entries it knows of and their total
+    size: built from the meta files at start-up, updated by its own stores
+    and by hits and misses on entries other processes stored. The meta files
+    are only scanned again when that total exceeds `max_bytes`; eviction
+    then works from the scan and replaces the index.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = os.path.expanduser(root)
+        self.max_bytes = max_bytes
+        self._entries = os.path.join(self.root, "entries")
+        self._tmp = os.path.join(self.root, "tmp")
+        self._trash = os.path.join(self.root, "trash")
+        self._lock_path = os.path.join(self.root, ".lock")
+        for d in (self._entries, self._tmp, self._trash):
+            os.makedirs(d, exist_ok=True)
+
+        self._toolchains: Dict[str, str] = {}
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._index: Dict[str, int] = {}  # entry key -> size in bytes
+        self._bytes = 0
+        self._reindex({name: size for _, size, name in self._scan()})
+
+    # ─── public API used by the sandbox ────────────────────────────────────────
+
+    async def restore(
+        self,
+        language: str,
+        compile_cmd: List[str],
+        source_code: str,
+        workdir: str,
+    ) -> Optional[CacheEntry]:
+        """Copy a cached build into `workdir`; None on a miss."""
+        key = await self.key(language, compile_cmd, source_code)
+        found = await asyncio.to_thread(self._restore, key, workdir)
+        entry = None
+        if found is None:
+            self._untrack(key)  # evicted by another process, or never stored
+        else:
+            entry, size = found
+            self._track(key, size)
+        self._stats["hits" if entry else "misses"] += 1
+        logger.debug(
+            "Compile cache %s for %s key=%s", "hit" if entry else "miss", language, key[:12]
+        )
+        return entry
+
+    async def store(
+        self,
+        language: str,
+        compile_cmd: List[str],
+        source_code: str,
+        workdir: str,
+        ok: bool,
+        compiler_msg: str = "",
+        exclude: Iterable[str] = (),
+    ) -> None:
+        """Publish the outcome of a compilation that just ran in `workdir`."""
+        key = await self.key(language, compile_cmd, source_code)
+        try:
+            size = await asyncio.to_thread(
+                self._store, key, workdir, ok, compiler_msg, set(exclude)
+            )
+        except OSError as e:
+            logger.warning("Compile cache store failed for key=%s: %s", key[:12], e)
+            return
+        if size is not None:
+            self._stats["stores"] += 1
+            self._track(key, size)
+        if self._bytes > self.max_bytes:
+            evicted, index = await asyncio.to_thread(self._evict)
+            self._reindex(index)
+            self._stats["evictions"] += evicted
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/store/eviction counts of this process plus the size it knows of."""
+        return {**self._stats, "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    async def key(self, language: str, compile_cmd: List[str], source_code: str) -> str:
+        toolchain = await self._toolchain_version(compile_cmd[0])
+        h = hashlib.sha256()
+        for part in (language, toolchain, "\0".join(compile_cmd), source_code):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    # ─── internals ─────────────────────────────────────────────────────────────
+
+    async def _toolchain_version(self, binary: str) -> str:
+        if binary not in self._toolchains:
+            version = binary
+            try:
+                flag = "-version" if binary == "javac" else "--version"
+                proc = await asyncio.create_subprocess_exec(
+                    binary, flag,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+                out, _ = await proc.communicate()
+                version = out.decode(errors="ignore").strip().splitlines()[0]
+            except (OSError, IndexError) as e:
+                logger.warning("Could not determine %s version: %s", binary, e)
+            self._toolchains[binary] = version
+            logger.info("Toolchain for compile cache: %s -> %s", binary, version)
+        return self._toolchains[binary]
+
+    def _track(self, key: str, size: int) -> None:
+        if key not in self._index:
+            self._index[key] = size
+            self._bytes += size
+
+    def _untrack(self, key: str) -> None:
+        self._bytes -= self._index.pop(key, 0)
+
+    def _reindex(self, index: Dict[str, int]) -> None:
+        self._index = index
+        self._bytes = sum(index.values())
+
+    @contextlib.contextmanager
+    def _locked(self, mode: int):
+        with open(self._lock_path, "a") as fh:
+            fcntl.flock(fh, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _restore(self, key: str, workdir: str) -> Optional[Tuple[CacheEntry, int]]:
+        entry_dir = os.path.join(self._entries, key)
+        try:
+            with open(os.path.join(entry_dir, _META_FILE)) as fh:
+                meta = json.load(fh)
+            if meta["ok"]:
+                for name in meta["files"]:
+                    shutil.copy2(os.path.join(entry_dir, name), os.path.join(workdir, name))
+            os.utime(os.path.join(entry_dir, _META_FILE))
+        except (OSError, ValueError, KeyError):
+            return None
+        return CacheEntry(meta["ok"], meta.get("compiler_msg", "")), int(meta.get("size", 0))
+
+    def _store(
+        self, key: str, workdir: str, ok: bool, compiler_msg: str, exclude: set
+    ) -> Optional[int]:
+        """Size of the entry published for `key`; None when one already existed."""
+        entry_dir = os.path.join(self._entries, key)
+        if os.path.exists(entry_dir):
+            return None
+
+        stage = os.path.join(self._tmp, f"{key}.{uuid.uuid4().hex}")
+        os.makedirs(stage)
+        try:
+            files, size = [], 0
+            if ok:
+                for name in os.listdir(workdir):
+                    path = os.path.join(workdir, name)
+                    if name in exclude or not os.path.isfile(path):
+                        continue
+                    shutil.copy2(path, os.path.join(stage, name))
+                    files.append(name)
+                    size += os.path.getsize(path)
+            meta = {
+                "ok": ok,
+                "compiler_msg": compiler_msg,
+                "files": files,
+                "size": size + len(compiler_msg),
+                "created": time.time(),
+            }
+            with open(os.path.join(stage, _META_FILE), "w") as fh:
+                json.dump(meta, fh)
+            with self._locked(fcntl.LOCK_SH):
+                os.rename(stage, entry_dir)
+            return meta["size"]
+        except OSError:
+            # another process published the same key first
+            shutil.rmtree(stage, ignore_errors=True)
+            if os.path.exists(entry_dir):
+                return None
+            raise
+
+    def _scan(self):
+        entries = []
+        for d in os.scandir(self._entries):
+            meta_path = os.path.join(d.path, _META_FILE)
+            try:
+                with open(meta_path) as fh:
+                    size = json.load(fh)["size"]
+                entries.append((os.stat(meta_path).st_mtime, size, d.name))
+            except (OSError, ValueError, KeyError):
+                continue
+        return entries
+
+    def _evict(self) -> Tuple[int, Dict[str, int]]:
+        """Evict LRU entries down to `max_bytes`; the count and the remaining index."""
+        with self._locked(fcntl.LOCK_EX):
+            entries = self._scan()
+            index = {name: size for _, size, name in entries}
+            total = sum(index.values())
+            if total <= self.max_bytes:
+                return 0, index
+            evicted = 0
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                victim = os.path.join(self._trash, f"{name}.{uuid.uuid4().hex}")
+                try:
+                    os.rename(os.path.join(self._entries, name), victim)
+                except OSError:
+                    continue
+                shutil.rmtree(victim, ignore_errors=True)
+                del index[name]
+                total -= size
+                evicted += 1
+        logger.info("Compile cache evicted %d entries, now %d/%d bytes", evicted, total, self.max_bytes)
+        return evicted, index
@@ -2,7 +2,7 @@
 
 from pathlib import Path
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import AnyHttpUrl, field_validator
 
@@ -30,10 +30,104 @@ class GlobalConfig(BaseConfig):
     REDIS_URL: str
     QUEUE_KEY: str
 
+    # Queue backend: "list" (LPUSH/BRPOP) or "stream" (consumer group)
+    QUEUE_BACKEND: str = "list"
+    STREAM_KEY: Optional[str] = None  # defaults to "<QUEUE_KEY>:stream"
+    STREAM_GROUP: str = "judges"
+    CONSUMER_NAME: Optional[str] = None  # defaults to "<hostname>-<pid>"
+    STREAM_MAX_IN_FLIGHT: int = 0  # per queue (submit and run lanes); 0 = the lane's slots
+    STREAM_CLAIM_IDLE_MS: int = 60000
+    STREAM_MAX_DELIVERIES: int = 5
+
     # Execution & test-case services
     DOCKER_EXEC_URL: AnyHttpUrl
     TESTCASE_API_FORMAT: str
 
+    # Worker concurrency: 1 keeps the sequential loop, 0 sizes the pool from
+    # CPU count and free memory, N > 1 runs up to N jobs at once.
+    WORKER_CONCURRENCY: int = 1
+    SLOT_MEMORY_MB: int = 512
+    QUEUE_POLL_TIMEOUT_SEC: float = 1.0
+    SHUTDOWN_GRACE_SEC: float = 30.0
+    # Test cases of one submission run at once: 1 = sequential, 0 = CPUs / slots
+    TEST_PARALLELISM: int = 1
+    # "Run" requests (custom input, samples) come on their own priority queue,
+    # served by RUN_WORKER_CONCURRENCY extra slots (0: this worker ignores it)
+    RUN_QUEUE_KEY: Optional[str] = None  # defaults to "<QUEUE_KEY>:run"
+    RUN_WORKER_CONCURRENCY: int = 2
+
+    # Shared on-disk compile cache (disabled when no directory is set)
+    COMPILE_CACHE_DIR: Optional[str] = None
+    COMPILE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # In-memory test-case cache (0 bytes disables it)
+    TESTCASE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    TESTCASE_CACHE_TTL_SEC: float = 300.0
+
+    # Run accounting: the time limit applies to CPU time; the wall-clock cap
+    # (limit * factor + extra) only stops programs that sleep or block.
+    # CGROUP_ROOT is a delegated cgroup v2 directory for per-run cgroups
+    # (exact tree-wide CPU/peak memory); unset = wait4 rusage only.
+    WALL_TIME_FACTOR: float = 2.0
+    WALL_TIME_EXTRA_SEC: float = 1.0
+    CGROUP_ROOT: Optional[str] = None
+    # Each run/compilation gets its own process group, killed as a whole.
+    # RUN_MAX_PROCESSES is RLIMIT_NPROC, which counts all processes and
+    # threads of the judge's user (0 = unset).
+    COMPILE_TIMEOUT_SEC: float = 30.0
+    RUN_MAX_PROCESSES: int = 0
+    # Output is bounded while it is read: a run printing more than
+    # OUTPUT_LIMIT_BYTES to stdout is killed (OutputLimitExceeded, 0 = no
+    # limit); stdout beyond STDOUT_KEEP_BYTES and stderr beyond
+    # STDERR_LIMIT_BYTES are counted and dropped. Stored results keep an
+    # OUTPUT_PREVIEW_BYTES preview plus byte counts.
+    OUTPUT_LIMIT_BYTES: int = 64 * 1024 * 1024
+    STDOUT_KEEP_BYTES: int = 64 * 1024
+    STDERR_LIMIT_BYTES: int = 64 * 1024
+    OUTPUT_PREVIEW_BYTES: int = 4096
+
+    # Effective limits: time = limit * node speed factor * TIME_MULTIPLIERS
+    # [language]; memory = limit + MEMORY_OVERHEAD_MB[language] (JSON in .env).
+    # TIME_CALIBRATION measures the speed factor at startup with a fixed
+    # benchmark set; otherwise TIME_SPEED_FACTOR is used as is.
+    TIME_CALIBRATION: bool = False
+    TIME_SPEED_FACTOR: float = 1.0
+    TIME_MULTIPLIERS: Dict[str, float] = {}
+    MEMORY_OVERHEAD_MB: Dict[str, int] = {}
+
+    # Warm python/node interpreters kept per language (0 disables the pool)
+    WARM_POOL_SIZE: int = 0
+
+    # Reusable workspaces on a tmpfs mount (unset = mkdtemp per submission);
+    # falls back to disk when all are taken or the mount is short on space
+    WORKSPACE_POOL_DIR: Optional[str] = None
+    WORKSPACE_POOL_SIZE: int = 16
+    WORKSPACE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Custom checker programs (Problem.checker.type == "custom")
+    CHECKER_TIME_LIMIT_SEC: float = 10.0
+    CHECKER_MEMORY_MB: int = 512
+    CHECKER_CACHE_SIZE: int = 32
+
+    # Per-test progress messages on the submission channel, coalesced to at
+    # most one per interval
+    PROGRESS_EVENTS: bool = True
+    PROGRESS_INTERVAL_MS: int = 250
+    # Every status/progress message is also appended to a per-submission
+    # Redis stream (prefix + submission id) so SSE clients can catch up;
+    # must match the Platform's SUBMISSION_EVENTS_* (TTL 0 = no log)
+    EVENT_LOG_KEY_PREFIX: str = "submission_events:"
+    EVENT_LOG_MAXLEN: int = 1000
+    EVENT_LOG_TTL_SEC: int = 3600
+
+    # Redis hash where the Platform counts judged/reused/coalesced submissions
+    # (its SUBMISSION_REUSE_STATS_KEY); exported as metrics
+    REUSE_STATS_KEY: str = "submission_reuse:stats"
+
+    # Prometheus text-format endpoint at http://<host>:<port>/metrics (0 disables it)
+    METRICS_PORT: int = 0
+    METRICS_HOST: str = "0.0.0.0"
+
     # Terminal statuses (comma-separated in .env)
     TERMINAL_STATUSES: List[str]
     LOG_FILE_PATH: Optional[str]
@@ -2,9 +2,19 @@ from redis.asyncio import Redis
 from motor.motor_asyncio import AsyncIOMotorClient
 from odmantic import AIOEngine
 from judge_service.config.config import config
+from judge_service.compile_cache import CompileCache
+from judge_service.testcase_client import TestcaseCache
+from judge_service.interpreter_pool import InterpreterPool
+from judge_service.workspace_pool import WorkspacePool
+from judge_service.custom_checker import CheckerPrograms
 
 
 _engine: AIOEngine | None = None
+_compile_cache: CompileCache | None = None
+_testcase_cache: TestcaseCache | None = None
+_interpreter_pool: InterpreterPool | None = None
+_workspace_pool: WorkspacePool | None = None
+_checker_programs: CheckerPrograms | None = None
 
 def get_engine() -> AIOEngine:
     global _engine
@@ -15,3 +25,40 @@ def get_engine() -> AIOEngine:
 
 async def get_redis() -> Redis:
     return await Redis.from_url(config.REDIS_URL)
+
+
+def get_compile_cache() -> CompileCache | None:
+    global _compile_cache
+    if _compile_cache is None and config.COMPILE_CACHE_DIR:
+        _compile_cache = CompileCache(config.COMPILE_CACHE_DIR, config.COMPILE_CACHE_MAX_BYTES)
+    return _compile_cache
+
+
+def get_testcase_cache() -> TestcaseCache | None:
+    global _testcase_cache
+    if _testcase_cache is None and config.TESTCASE_CACHE_MAX_BYTES > 0:
+        _testcase_cache = TestcaseCache(config.TESTCASE_CACHE_MAX_BYTES, config.TESTCASE_CACHE_TTL_SEC)
+    return _testcase_cache
+
+
+def get_interpreter_pool() -> InterpreterPool | None:
+    global _interpreter_pool
+    if _interpreter_pool is None and config.WARM_POOL_SIZE > 0:
+        _interpreter_pool = InterpreterPool(config.WARM_POOL_SIZE)
+    return _interpreter_pool
+
+
+def get_workspace_pool() -> WorkspacePool | None:
+    global _workspace_pool
+    if _workspace_pool is None and config.WORKSPACE_POOL_DIR:
+        _workspace_pool = WorkspacePool(
+            config.WORKSPACE_POOL_DIR, config.WORKSPACE_POOL_SIZE, config.WORKSPACE_MAX_BYTES
+        )
+    return _workspace_pool
+
+
+def get_checker_programs() -> CheckerPrograms:
+    global _checker_programs
+    if _checker_programs is None:
+        _checker_programs = CheckerPrograms(config.CHECKER_CACHE_SIZE, get_compile_cache())
+    return _checker_programs
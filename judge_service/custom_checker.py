@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+from judge_service.sandbox import CompiledArtifact, compile_submission, run_compiled
+
+logger = logging.getLogger(__name__)
+
+# testlib exit codes: 0 accepted, 1 wrong answer, 2 presentation error
+_REJECT_CODES = (1, 2)
+
+
+class CheckerFailure(Exception):
+    """The checker program itself failed (did not compile, crashed, timed out)."""
+
+
+class CustomChecker:
+    """
+    Runs a problem's own checker program, testlib style:
+    `checker <input file> <expected file> <output file>`; exit code 0
+    accepts, 1/2 reject (its stderr becomes `message`), anything else
+    raises CheckerFailure. The program's output is spooled to a temporary
+    file as it streams in; a checker cannot reject early.
+    """
+
+    diff_line: Optional[int] = None
+    diff_column: Optional[int] = None
+
+    def __init__(self, program: CompiledArtifact, input_path: str, expected_path: str,
+                 timeout_sec: float, memory_bytes: int):
+        self.program = program
+        self.input_path = input_path
+        self.expected_path = expected_path
+        self.timeout_sec = timeout_sec
+        self.memory_bytes = memory_bytes
+        self.failed = False
+        self.message: Optional[str] = None
+        fd, self._output_path = tempfile.mkstemp(prefix="checker_out_")
+        self._output = os.fdopen(fd, "wb")
+
+    @property
+    def passed(self) -> bool:
+        return not self.failed
+
+    def feed(self, chunk: bytes) -> bool:
+        self._output.write(chunk)
+        return True
+
+    async def finish(self) -> bool:
+        self._output.close()
+        result = await run_compiled(
+            self.program,
+            timeout_sec=self.timeout_sec,
+            memory_bytes=self.memory_bytes,
+            args=[self.input_path, self.expected_path, self._output_path],
+            adjust_limits=False,  # judge-side limits, not the problem's
+        )
+        verdict = result["verdict"]
+        if verdict == "OK":
+            return True
+        if verdict == "RuntimeError" and result.get("exit_code") in _REJECT_CODES:
+            self.failed = True
+            self.message = (result.get("stderr") or "").strip()[:1024] or None
+            return False
+        raise CheckerFailure(f"checker program failed: {verdict}: {result.get('stderr', '')[:1024]}")
+
+    def close(self) -> None:
+        if not self._output.closed:
+            self._output.close()
+        try:
+            os.unlink(self._output_path)
+        except FileNotFoundError:
+            pass
+
+
+class CheckerPrograms:
+    """
+    Compiled custom checkers, one per (problem, language, source), compiled
+    once per worker and kept until `max_entries` is exceeded (LRU). The
+    build itself goes through the shared compile cache when one is given,
+    so other workers on the host reuse it too. Concurrent requests for the
+    same checker share one compilation.
+
+    Every `get` must be paired with a `release` once the job is done with
+    the program: an entry evicted while a job still holds it is cleaned up
+    by the last release instead of under the running checker.
+    """
+
+    def __init__(self, max_entries: int = 32, compile_cache=None):
+        self.max_entries = max_entries
+        self.compile_cache = compile_cache
+        self._entries: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self._users: Dict[int, int] = {}  # id(artifact) -> jobs holding it
+
+    async def get(self, problem_id: str, spec: Dict[str, Any]) -> CompiledArtifact:
+        language = spec.get("language")
+        source = spec.get("sourceCode")
+        if not language or not source:
+            raise CheckerFailure("custom checker needs a language and sourceCode")
+        digest = hashlib.sha256(f"{language}\0{source}".encode()).hexdigest()
+        key = f"{problem_id}:{digest}"
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = asyncio.ensure_future(self._compile(problem_id, language, source))
+            self._entries[key] = entry
+            self._evict()
+        else:
+            self._entries.move_to_end(key)
+
+        try:
+            artifact = await asyncio.shield(entry)
+        except Exception:
+            self._entries.pop(key, None)
+            raise
+        self._users[id(artifact)] = self._users.get(id(artifact), 0) + 1
+        return artifact
+
+    def release(self, artifact: CompiledArtifact) -> None:
+        """Drop one job's hold on a program returned by `get`."""
+        users = self._users.get(id(artifact), 0) - 1
+        if users > 0:
+            self._users[id(artifact)] = users
+            return
+        self._users.pop(id(artifact), None)
+        if not any(_result(entry) is artifact for entry in self._entries.values()):
+            artifact.cleanup()  # evicted while in use
+
+    def close(self) -> None:
+        for entry in self._entries.values():
+            artifact = _result(entry)
+            if artifact is not None:
+                artifact.cleanup()
+        self._entries.clear()
+        self._users.clear()
+
+    async def _compile(self, problem_id: str, language: str, source: str) -> CompiledArtifact:
+        logger.info("Compiling %s checker for problem %s", language, problem_id)
+        artifact = await compile_submission(language, source, cache=self.compile_cache)
+        if not artifact.ok:
+            raise CheckerFailure(
+                f"checker for problem {problem_id} did not compile: "
+                f"{artifact.verdict}: {artifact.compiler_msg[:1024]}"
+            )
+        return artifact
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            artifact = _result(entry)
+            if artifact is not None and id(artifact) not in self._users:
+                artifact.cleanup()
+
+
+def _result(entry: asyncio.Future) -> Optional[CompiledArtifact]:
+    """The compiled program of a finished, successful entry, else None."""
+    if entry.done() and not entry.cancelled() and entry.exception() is None:
+        return entry.result()
+    return None
+
+
+def spool(data: Union[str, bytes], prefix: str) -> str:
+    """Write an inline input/expected output to a temp file for a checker program."""
+    fd, path = tempfile.mkstemp(prefix=prefix)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data.encode() if isinstance(data, str) else data)
+    return path
@@ -0,0 +1,247 @@
+import asyncio
+import contextlib
+import os
+import signal
+import subprocess
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bootstrap run by every warm interpreter: pay for interpreter start-up and
+# common imports up front, report ready on fd `ready`, then block on fd `ctl`
+# until the judge sends the path of the script to execute.
+_PY_BOOTSTRAP = r"""
+import os, sys, runpy
+import bisect, collections, functools, heapq, itertools, math, re, string
+ctl, ready = int(sys.argv[1]), int(sys.argv[2])
+os.write(ready, b"R")
+os.close(ready)
+data = b""
+while not data.endswith(b"\n"):
+    chunk = os.read(ctl, 4096)
+    if not chunk:
+        sys.exit(0)
+    data += chunk
+os.close(ctl)
+path = data.decode().strip()
+os.chdir(os.path.dirname(path))
+sys.argv = [path]
+sys.path[0] = os.path.dirname(path)
+del ctl, ready, data, chunk
+runpy.run_path(path, run_name="__main__")
+"""
+
+_JS_BOOTSTRAP = r"""
+const fs = require('fs');
+const path = require('path');
+const Module = require('module');
+const ctl = Number(process.argv[1]), ready = Number(process.argv[2]);
+fs.writeSync(ready, 'R');
+fs.closeSync(ready);
+let data = '';
+const buf = Buffer.alloc(4096);
+while (!data.endsWith('\n')) {
+  const n = fs.readSync(ctl, buf, 0, buf.length, null);
+  if (n === 0) process.exit(0);
+  data += buf.toString('utf8', 0, n);
+}
+fs.closeSync(ctl);
+const file = data.trim();
+process.chdir(path.dirname(file));
+process.argv = [process.argv[0], file];
+Module.runMain();
+"""
+
+_BOOTSTRAP_CMD = {
+    "python": lambda ctl, ready: ["python3", "-c", _PY_BOOTSTRAP, str(ctl), str(ready)],
+    "javascript": lambda ctl, ready: ["node", "-e", _JS_BOOTSTRAP, str(ctl), str(ready)],
+}
+
+
+class WarmProcess:
+    """
+    A started, initialised interpreter waiting for a script. Its stdio pipes
+    belong to the run that acquires it; it executes exactly one script.
+    """
+
+    def __init__(self, proc: subprocess.Popen, ctl_fd: int, ready_fd: int, spawned_at: float):
+        self.proc = proc
+        self.ctl_fd = ctl_fd
+        self.ready_fd = ready_fd
+        self.spawned_at = spawned_at
+        self.startup_ms: Optional[float] = None  # set once the bootstrap reported ready
+        self.startup_saved_ms = 0.0
+
+    def start(self, script_path: str) -> None:
+        """Hand the script over; the interpreter runs it immediately."""
+        try:
+            os.write(self.ctl_fd, script_path.encode() + b"\n")
+        finally:
+            os.close(self.ctl_fd)
+            self.ctl_fd = -1
+
+    def discard(self) -> None:
+        """
+        Kill the interpreter and its group. Never blocks the event loop: on
+        the loop the killed process is reaped in the default executor.
+        """
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        with contextlib.suppress(ProcessLookupError):
+            self.proc.kill()
+        if self.proc.poll() is None:
+            try:
+                asyncio.get_running_loop().run_in_executor(None, _reap, self.proc)
+            except RuntimeError:  # no loop in this thread (e.g. pool shutdown)
+                _reap(self.proc)
+        for stream in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            with contextlib.suppress(Exception):
+                stream.close()
+        if self.ctl_fd >= 0:
+            os.close(self.ctl_fd)
+            self.ctl_fd = -1
+
+
+def _reap(proc: subprocess.Popen) -> None:
+    with contextlib.suppress(Exception):
+        proc.wait(timeout=1)
+
+
+class InterpreterPool:
+    """
+    Keeps `size` warm interpreters per language (python, javascript) so a
+    test run skips interpreter start-up. Interpreters are one-shot: each
+    acquire hands out a process and a replacement is spawned in the
+    background. Resource limits are applied by the caller after the hand-out
+    (prlimit), so idle interpreters are not constrained by any one run.
+
+    `acquire` returns None when no warm process is available; the sandbox
+    then spawns a cold one as usual. Saved start-up time is the bootstrap
+    time that had already elapsed when the process was handed out.
+    """
+
+    def __init__(self, size: int, languages=tuple(_BOOTSTRAP_CMD)):
+        self.size = size
+        self.languages = [lang for lang in languages if lang in _BOOTSTRAP_CMD]
+        self._idle: Dict[str, List[WarmProcess]] = {lang: [] for lang in self.languages}
+        self._startup_ms: Dict[str, float] = {}
+        self._refill_pending: Dict[str, int] = {lang: 0 for lang in self.languages}
+        self._closed = False
+        self._stats = {"hits": 0, "misses": 0, "spawned": 0, "saved_ms": 0.0}
+
+    def start(self) -> None:
+        """Fill the pool; must be called from the running event loop."""
+        for lang in self.languages:
+            while len(self._idle[lang]) < self.size:
+                self._spawn(lang)
+
+    def acquire(self, language: str) -> Optional[WarmProcess]:
+        if language not in self._idle or self._closed:
+            return None
+        idle = self._idle[language]
+        warm = None
+        while idle:
+            candidate = idle.pop(0)
+            if candidate.proc.poll() is None:
+                warm = candidate
+                break
+            logger.warning("Warm %s interpreter %d died while idle", language, candidate.proc.pid)
+            candidate.discard()
+        self._schedule_refill(language)
+        if warm is None:
+            self._stats["misses"] += 1
+            return None
+
+        elapsed = (time.perf_counter() - warm.spawned_at) * 1000
+        startup = warm.startup_ms or self._startup_ms.get(language, elapsed)
+        warm.startup_saved_ms = min(startup, elapsed)
+        self._stats["hits"] += 1
+        self._stats["saved_ms"] += warm.startup_saved_ms
+        # a process still starting keeps its ready pipe watched until it reports
+        return warm
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "idle": {lang: len(procs) for lang, procs in self._idle.items()},
+            "startup_ms": dict(self._startup_ms),
+        }
+
+    async def close(self) -> None:
+        self._closed = True
+        for procs in self._idle.values():
+            for warm in procs:
+                self._stop_watching(warm)
+                await asyncio.to_thread(warm.discard)
+            procs.clear()
+
+    # ─── internals ─────────────────────────────────────────────────────────────
+
+    def _schedule_refill(self, language: str) -> None:
+        missing = self.size - len(self._idle[language]) - self._refill_pending[language]
+        if missing <= 0:
+            return
+        self._refill_pending[language] += missing
+        asyncio.get_running_loop().call_soon(self._refill, language, missing)
+
+    def _refill(self, language: str, count: int) -> None:
+        self._refill_pending[language] -= count
+        for _ in range(count):
+            if self._closed or len(self._idle[language]) >= self.size:
+                return
+            try:
+                self._spawn(language)
+            except OSError as e:
+                logger.error("Could not start warm %s interpreter: %s", language, e)
+                return
+
+    def _spawn(self, language: str) -> None:
+        ctl_r, ctl_w = os.pipe()
+        ready_r, ready_w = os.pipe()
+        try:
+            spawned_at = time.perf_counter()
+            proc = subprocess.Popen(
+                _BOOTSTRAP_CMD[language](ctl_r, ready_w),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=(ctl_r, ready_w),
+                # own process group, killed as a whole after a run
+                start_new_session=True,
+            )
+        except BaseException:
+            for fd in (ctl_w, ready_r):
+                os.close(fd)
+            raise
+        finally:
+            os.close(ctl_r)
+            os.close(ready_w)
+
+        warm = WarmProcess(proc, ctl_w, ready_r, spawned_at)
+        asyncio.get_running_loop().add_reader(ready_r, self._on_ready, language, warm)
+        self._idle[language].append(warm)
+        self._stats["spawned"] += 1
+
+    def _on_ready(self, language: str, warm: WarmProcess) -> None:
+        try:
+            ready = os.read(warm.ready_fd, 1) == b"R"
+        except OSError:
+            ready = False
+        self._stop_watching(warm)
+        if not ready:
+            return  # died during start-up
+        warm.startup_ms = (time.perf_counter() - warm.spawned_at) * 1000
+        previous = self._startup_ms.get(language)
+        # moving average of how long a cold start takes on this node
+        self._startup_ms[language] = (
+            warm.startup_ms if previous is None else 0.8 * previous + 0.2 * warm.startup_ms
+        )
+
+    @staticmethod
+    def _stop_watching(warm: WarmProcess) -> None:
+        if warm.ready_fd >= 0:
+            asyncio.get_running_loop().remove_reader(warm.ready_fd)
+            os.close(warm.ready_fd)
+            warm.ready_fd = -1
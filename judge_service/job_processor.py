@@ -1,188 +1,255 @@
+import asyncio
+import contextlib
+import inspect
 import json
+import os
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 import httpx
 from bson import ObjectId
 from odmantic import AIOEngine
-from fastapi import HTTPException, status
 
 from judge_service.config.config import config
+from judge_service.core.dependencies import (
+    get_checker_programs, get_compile_cache, get_interpreter_pool, get_testcase_cache,
+    get_workspace_pool,
+)
 from judge_service.testcase_client import fetch_testcases
-from judge_service.sandbox import run_in_sandbox
+from judge_service.checkers import BUILTIN_CHECKERS, builtin_checker
+from judge_service.custom_checker import CheckerFailure, CustomChecker, spool
+from judge_service.progress import EventLog, ProgressPublisher, publish_event
+from judge_service.sandbox import CompiledArtifact, compile_submission, run_compiled
 from redis.asyncio import Redis
 from Platform.src.submission_management.models import Submission, TestDetail, SubmissionResult
 
 import logging
 logger = logging.getLogger(__name__)
 
-async def process_job(
-    engine: AIOEngine,
+# Called as `observer(stage, seconds, submission_id, language)` whenever a
+# stage of a job completes: queue_wait (when the job carries `enqueuedAt`),
+# fetch, compile, run and compare (once per test case), persist.
+STAGE_OBSERVERS: List[Callable[[str, float, str, str], None]] = []
+# Called as `observer(final_status, language, test_verdicts)` once a job's
+# result is written.
+JOB_OBSERVERS: List[Callable[[str, str, List[str]], None]] = []
+
+async def dequeue_job(
     redis: Redis,
-    http_client: httpx.AsyncClient
-) -> None:
+    timeout: float = 0,
+    key: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Block on the submission queue (or list `key`) and return the next decoded job.
+    Returns None when `timeout` seconds elapse without a job (0 waits forever).
+    """
     # Stage 1: Wait for next job
     logger.info("Stage 1: Waiting for next job")
-    _, raw = await redis.brpop(config.QUEUE_KEY)
+    popped = await redis.brpop(key or config.QUEUE_KEY, timeout=timeout)
+    if popped is None:
+        logger.debug("Stage 1: No job received within %.1fs", timeout)
+        return None
+    _, raw = popped
     job: Dict[str, Any] = json.loads(raw)
     logger.info("Stage 1: Received job: %s", job)
+    return job
+
+
+async def enqueue_job(redis: Redis, job: Dict[str, Any]) -> None:
+    """Put a job (back) on the submission queue of the configured backend."""
+    if config.QUEUE_BACKEND == "stream":
+        stream = config.STREAM_KEY or f"{config.QUEUE_KEY}:stream"
+        await redis.xadd(stream, {"job": json.dumps(job)})
+    else:
+        await redis.lpush(config.QUEUE_KEY, json.dumps(job))
+    logger.info("Enqueued job for submission %s", job["submissionId"])
+
+
+async def process_job(
+    engine: AIOEngine,
+    redis: Redis,
+    http_client: httpx.AsyncClient
+) -> None:
+    job = await dequeue_job(redis)
+    await judge_job(job, engine, redis, http_client)
 
+
+async def judge_job(
+    job: Dict[str, Any],
+    engine: AIOEngine,
+    redis: Redis,
+    http_client: httpx.AsyncClient,
+    test_parallelism: int = 1,
+) -> None:
+    """
+    Run stages 2-6 for an already dequeued job. Safe to run concurrently:
+    all state lives on the stack, the engine/redis/http clients are shared.
+    With `test_parallelism` > 1 up to that many test cases run at once.
+    Submissions coalesced onto this one are settled however it ends.
+    """
     submission_id = job["submissionId"]
-    problem_id = job["problemId"]
-    source = job.get("sourceCode")
     language = job.get("language")
-    stdin_data = job.get("stdin", "")
 
     obj_id = ObjectId(submission_id)
     now = datetime.now(timezone.utc)
+    if "enqueuedAt" in job:
+        _observe(
+            "queue_wait", max(0.0, time.time() - float(job["enqueuedAt"])), submission_id, language
+        )
 
     # Stage 2: Mark running in Mongo and notify
     logger.info("Stage 2: Marking submission %s as running", submission_id)
-    submission = await engine.find_one(Submission, Submission.id == obj_id)
-    if submission:
-        submission.status = "running"
-        submission.updatedAt = now
-        await engine.save(submission)
-        logger.debug("Stage 2: Mongo status set to 'running' for %s", submission_id)
-    await redis.publish(submission_id, json.dumps({"status": "running"}))
-    logger.debug("Stage 2: Published 'running' to Redis channel %s", submission_id)
-
-    # Stage 3: Fetch test cases
-    logger.info("Stage 3: Fetching test cases for problem %s", problem_id)
+    if not await _mark_running(engine, obj_id, now):
+        logger.warning(
+            "Stage 2: Submission %s is missing or already finished, skipping job", submission_id
+        )
+        return
+    settled: Optional[Tuple[str, SubmissionResult]] = None
     try:
-        testcases = await fetch_testcases(http_client, problem_id)
+        spec = await _job_spec(engine, job, obj_id)
+        if spec is None:
+            logger.warning("Stage 2: Submission %s was deleted, skipping job", submission_id)
+            return
+        logger.debug("Stage 2: Mongo status set to 'running' for %s, spec=%s", submission_id, spec)
+        await _publish(redis, submission_id, {"status": "running"})
+        logger.debug("Stage 2: Published 'running' to Redis channel %s", submission_id)
+        settled = await _judge_stages(job, engine, redis, http_client, spec, test_parallelism)
+    finally:
+        # even when judging failed or was interrupted, nobody else settles them
+        if job.get("fingerprint"):
+            await _settle_followers(engine, redis, job, obj_id, settled)
+
+
+async def _judge_stages(
+    job: Dict[str, Any],
+    engine: AIOEngine,
+    redis: Redis,
+    http_client: httpx.AsyncClient,
+    spec: "JobSpec",
+    test_parallelism: int,
+) -> Optional[Tuple[str, SubmissionResult]]:
+    """
+    Stages 3-6 of a job marked running. Returns the final status and result
+    when a reusable one was written, for the submissions coalesced onto it.
+    """
+    submission_id = job["submissionId"]
+    problem_id = job["problemId"]
+    source = job.get("sourceCode")
+    language = job.get("language")
+    stdin_data = job.get("stdin", "")
+    run_mode = job.get("mode") == "run"
+    obj_id = ObjectId(submission_id)
+
+    # Stage 3: Fetch test cases; run requests bring their own inputs
+    logger.info("Stage 3: Fetching test cases for problem %s (mode=%s)", problem_id, job.get("mode", "submit"))
+    try:
+        if run_mode:
+            testcases = _run_testcases(stdin_data, job.get("sampleTestCases") or [])
+        else:
+            with _timed("fetch", submission_id, language):
+                testcases = await fetch_testcases(http_client, problem_id, cache=get_testcase_cache())
         logger.info("Stage 3: Retrieved %d test cases", len(testcases))
         logger.info("Stage 3: Test cases: %s", testcases)
     except Exception as error:
         logger.error("Stage 3: Failed to fetch test cases for problem %s: %s", problem_id, error, exc_info=True)
-        # Mark failed in Mongo and notify
-        submission = await engine.find_one(Submission, Submission.id == obj_id)
-
-        now2 = datetime.now(timezone.utc)
-        if submission:
-            # wrap the fetch error in a single TestDetail
-            err_detail = TestDetail(
-                test_case_id="fetch_error",
-                verdict="error",
-                status="failed",
-                stdout="",
-                runtime_ms=0.0,
-                memory_bytes=0,
-                error_message=f"Could not fetch test cases: {error}"
-            )
-            result_model = SubmissionResult(
-                total_tests=0,
-                passed_tests=0,
-                max_runtime_ms=0.0,
-                max_memory_bytes=0,
-                test_details=[err_detail],
-            )
-
-            submission.status = "failed"
-            submission.result = result_model
-            submission.completedAt = now2
-            submission.updatedAt = now2
-            await engine.save(submission)
-            logger.debug("Stage 3: Saved fetch-error result for %s", submission_id)
+        # Mark failed in Mongo and notify; wrap the fetch error in a single TestDetail
+        err_detail = TestDetail(
+            test_case_id="fetch_error",
+            verdict="error",
+            status="failed",
+            stdout="",
+            runtime_ms=0.0,
+            memory_bytes=0,
+            error_message=f"Could not fetch test cases: {error}"
+        )
+        result_model = SubmissionResult(
+            total_tests=0,
+            passed_tests=0,
+            max_runtime_ms=0.0,
+            max_memory_bytes=0,
+            test_details=[err_detail],
+        )
+        await _write_result(engine, obj_id, "failed", result_model)
+        logger.debug("Stage 3: Saved fetch-error result for %s", submission_id)
+        _observe_job("failed", language, [err_detail])
 
         # notify frontend that we're in a terminal failed state
-        await redis.publish(submission_id, json.dumps({"status": "failed"}))
+        await _publish(redis, submission_id, {"status": "failed"})
         logger.debug("Stage 3: Published 'failed' to Redis channel %s", submission_id)
-        return
+        return None
 
-    # Stage 4: Execute test cases
-    logger.info("Stage 4: Executing %d test cases in sandbox", len(testcases))
+    # Stage 4: Compile once, then execute every test case against the artifact
+    progress = _progress_publisher(redis, submission_id, len(testcases))
+    logger.info("Stage 4: Compiling %s submission %s", language, submission_id)
+    if progress:
+        await progress.compile_started()
+    compile_started = time.perf_counter()
+    with _timed("compile", submission_id, language):
+        artifact = await compile_submission(
+            language, source, cache=get_compile_cache(), workspaces=get_workspace_pool()
+        )
+    if progress:
+        await progress.compile_finished(artifact.verdict, (time.perf_counter() - compile_started) * 1000)
     all_passed = True
     details: List[TestDetail] = []
-    for idx, tc in enumerate(testcases, start=1):
-        case_id = ObjectId(tc["caseId"])
-        logger.debug("Stage 4: Running test %d/%d (caseId=%s)", idx, len(testcases), case_id)
-
-
-        if not tc.get("isRemote", False):
-            inp = tc.get("input", "")
-            exp = tc.get("expectedOutput", "")
-        else:
-            input_path = tc.get("inputPath", "")
-            expected_path = tc.get("outputPath", "")
-
-            try:
-                with open(input_path, 'r') as f:
-                    inp = f.read()
-                logger.debug("Loaded input from %s", input_path)
-            except Exception as e:
-                logger.error("Failed to read input file %s: %s", input_path, e)
-                inp = ""
-
-            try:
-                with open(expected_path, 'r') as f:
-                    exp = f.read()
-                logger.debug("Loaded expected output from %s", expected_path)
-            except Exception as e:
-                logger.error("Failed to read expected output file %s: %s", expected_path, e)
-                exp = ""
-        logger.debug("Stage 4: Input: %s", inp)
-        logger.debug("Stage 4: Expected Output: %s", exp)
-        try:
-            result = await run_in_sandbox(
-                language=language,
-                source_code=source,
-                stdin=inp,
-                timeout_sec=submission.timeLimitMs / 1000,
-                memory_bytes=submission.memoryLimitB,
-            )
-
-            logger.info("Stage 4: Test %d/%d executed, result=%s", idx, len(testcases), result)
-
-            # post-process memory-limit verdict...
-            verdict = result.get("verdict")
-            passed = (
-                    verdict == "OK"
-                    and result.get("stdout", "").strip() == exp.strip()
-            )
-            logger.info("Stage 4: Test %d verdict=%s passed=%s", idx, verdict, passed)
-
-            details.append(
-                TestDetail(
-                    test_case_id=str(case_id),
-                    verdict=verdict or "",
-                    status="passed" if passed else "failed",
-                    stdout=result.get("stdout", ""),
-                    runtime_ms=result.get("runtime_ms", 0.0),
-                    memory_bytes=result.get("memory_bytes", 0),
-                    error_message=result.get("stderr", None),
-                )
-            )
-            logger.info("Stage 4: Test %d details: %s", idx, details)
-        except Exception as error:
-            passed = False
-            result = {
-                "exitCode": -1,
-                "stdout": "",
-                "stderr": str(error),
-                "runtime_ms": 0,
-                "memory_bytes": 0
-            }
-            logger.error("Stage 4: Error executing test %d for submission %s: %s", idx, submission_id, error, exc_info=True)
-
-            # build a TestDetail model (uses your aliases under the hood)
+    checker_error = None
+    try:
+        if artifact.ok:
+            spec, checker_error = await _prepare_checker(spec, problem_id)
+        if not artifact.ok:
+            logger.info("Stage 4: %s for %s, skipping test execution", artifact.verdict, submission_id)
+            all_passed = False
             details.append(
                 TestDetail(
-                    test_case_id=str(case_id),
-                    verdict=verdict or "",
-                    status="passed" if passed else "failed",
-                    stdout=result.get("stdout", ""),
-                    runtime_ms=result.get("runtime_ms", 0.0),
-                    memory_bytes=result.get("memory_bytes", 0),
-                    error_message=result.get("stderr", None),
+                    test_case_id="compile",
+                    verdict=artifact.verdict,
+                    status="failed",
+                    stdout="",
+                    runtime_ms=0.0,
+                    memory_bytes=0,
+                    error_message=artifact.compiler_msg or None,
                 )
             )
-
-        if not passed:
+        elif checker_error is not None:
             all_passed = False
-            break
+            details.append(checker_error)
+        else:
+            logger.info(
+                "Stage 4: Executing %d test cases in sandbox (parallelism=%d, checker=%s)",
+                len(testcases), test_parallelism, (spec.checker or {}).get("type", "exact")
+            )
+            if test_parallelism > 1 and not run_mode:
+                details, all_passed = await _run_tests_parallel(
+                    artifact, testcases, spec, submission_id, test_parallelism, progress
+                )
+            else:
+                for idx, tc in enumerate(testcases, start=1):
+                    detail, passed = await _run_test_case(
+                        artifact, tc, idx, len(testcases), spec, submission_id
+                    )
+                    details.append(detail)
+                    if progress:
+                        await _report_test(progress, idx, detail)
+                    if not passed:
+                        all_passed = False
+                        if not run_mode:  # a run reports every input
+                            break
+    finally:
+        artifact.cleanup()
+        if spec.checker_program is not None:
+            get_checker_programs().release(spec.checker_program)
+        if progress:
+            await progress.close()
+        logger.info(
+            "Stage 4: Workspace setup %.2fms, teardown %.2fms",
+            artifact.setup_ms, artifact.teardown_ms
+        )
 
     # Stage 5: Aggregate and write final result
-    final_status = "success" if all_passed else "failed"
+    if artifact.verdict == "CompilationError":
+        final_status = "compile_error"
+    else:
+        final_status = "success" if all_passed else "failed"
     logger.info("Stage 5: Aggregating results, final status=%s", final_status)
     logger.info("Stage 5: Test details: %s", details)
 
@@ -194,25 +261,525 @@ async def process_job(
         test_details=details,
     )
 
-    now2 = datetime.now(timezone.utc)
-    submission = await engine.find_one(Submission, Submission.id == obj_id)
-    if not submission:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Submission not found when writing result"
+    reusable = bool(job.get("fingerprint")) and _result_reusable(final_status, details)
+    with _timed("persist", submission_id, language):
+        written = await _write_result(engine, obj_id, final_status, result_model, reusable)
+    if not written:
+        logger.warning(
+            "Stage 5: Submission %s is no longer running, result discarded", submission_id
         )
-
-    submission.status = final_status
-    submission.result = result_model  # <— typed, validated model
-    submission.completedAt = now2
-    submission.updatedAt = now2
-    await engine.save(submission)
+        return None
     logger.debug("Stage 5: Saved final result for submission %s", submission_id)
+    _observe_job(final_status, language, details)
 
     # Stage 6: Notify terminal state
     logger.info(
         "Stage 6: Publishing final status '%s' to Redis channel %s",
         final_status, submission_id
     )
-    await redis.publish(submission_id, json.dumps({"status": final_status}))
+    await _publish(redis, submission_id, {"status": final_status})
     logger.info("Stage 6: Completed processing job %s", submission_id)
+    return (final_status, result_model) if reusable else None
+
+
+def _progress_publisher(redis: Redis, submission_id: str, total: int) -> Optional[ProgressPublisher]:
+    if not config.PROGRESS_EVENTS:
+        return None
+    return ProgressPublisher(
+        redis, submission_id, total, config.PROGRESS_INTERVAL_MS / 1000, _event_log()
+    )
+
+
+def _event_log() -> Optional[EventLog]:
+    if config.EVENT_LOG_TTL_SEC <= 0:
+        return None
+    return EventLog(config.EVENT_LOG_KEY_PREFIX, config.EVENT_LOG_MAXLEN, config.EVENT_LOG_TTL_SEC)
+
+
+async def _publish(redis: Redis, submission_id: str, message: Dict[str, Any]) -> None:
+    """Status message on the submission's channel, appended to its event log first."""
+    await publish_event(redis, submission_id, message, _event_log())
+
+
+async def _report_test(progress: ProgressPublisher, idx: int, detail: TestDetail) -> None:
+    await progress.test_finished(idx, detail.verdict, detail.runtime_ms, detail.memory_bytes)
+
+
+def _observe(stage: str, seconds: float, submission_id: str, language: str) -> None:
+    for observer in STAGE_OBSERVERS:
+        try:
+            observer(stage, seconds, submission_id, language)
+        except Exception:
+            logger.exception("Stage observer failed for stage %s", stage)
+
+
+def _observe_job(final_status: str, language: str, details: List[TestDetail]) -> None:
+    for observer in JOB_OBSERVERS:
+        try:
+            observer(final_status, language, [d.verdict for d in details])
+        except Exception:
+            logger.exception("Job observer failed")
+
+
+@contextlib.contextmanager
+def _timed(stage: str, submission_id: str, language: str):
+    if not STAGE_OBSERVERS:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe(stage, time.perf_counter() - start, submission_id, language)
+
+
+class _TimedChecker:
+    """Checker proxy adding up the time spent comparing output, for observers."""
+
+    def __init__(self, checker):
+        self._checker = checker
+        self.elapsed = 0.0
+
+    def feed(self, chunk: bytes) -> bool:
+        start = time.perf_counter()
+        try:
+            return self._checker.feed(chunk)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    async def finish(self) -> bool:
+        start = time.perf_counter()
+        try:
+            accepted = self._checker.finish()
+            if inspect.isawaitable(accepted):
+                accepted = await accepted
+            return accepted
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def __getattr__(self, name):
+        return getattr(self._checker, name)
+
+
+class JobSpec(NamedTuple):
+    """What every test run of a job needs besides the artifact."""
+    time_limit_ms: int
+    memory_limit_b: int
+    checker: Optional[Dict[str, Any]] = None  # Problem.checker config, None = exact
+    checker_program: Optional[CompiledArtifact] = None  # compiled custom checker
+    preview_bytes: Optional[int] = None  # output kept per test, None = the sandbox's preview
+
+
+async def _mark_running(engine: AIOEngine, obj_id: ObjectId, now: datetime) -> bool:
+    """
+    pending -> running in a single conditional update. A job redelivered by
+    the stream queue finds its submission already running and carries on;
+    one that was already judged (or never existed) matches nothing.
+    """
+    res = await engine.get_collection(Submission).update_one(
+        {"_id": obj_id, "status": {"$in": ["pending", "running"]}},
+        {"$set": {"status": "running", "updatedAt": now}},
+    )
+    return res.matched_count == 1
+
+
+async def _job_spec(engine: AIOEngine, job: Dict[str, Any], obj_id: ObjectId) -> Optional[JobSpec]:
+    """
+    Limits and checker from the job payload; jobs enqueued by older
+    Platforms lack limits and read them from the submission (None when it
+    was deleted meanwhile). Runs show the user their whole (sandbox-bounded)
+    output, judged submissions only store a preview of it.
+    """
+    checker = job.get("checker")
+    preview = None if job.get("mode") == "run" else config.OUTPUT_PREVIEW_BYTES or None
+    if "timeLimitMs" in job and "memoryLimitB" in job:
+        return JobSpec(int(job["timeLimitMs"]), int(job["memoryLimitB"]), checker, preview_bytes=preview)
+    doc = await engine.get_collection(Submission).find_one(
+        {"_id": obj_id}, {"timeLimitMs": 1, "memoryLimitB": 1}
+    )
+    if doc is None:
+        return None
+    return JobSpec(int(doc["timeLimitMs"]), int(doc["memoryLimitB"]), checker, preview_bytes=preview)
+
+
+async def _write_result(
+    engine: AIOEngine,
+    obj_id: ObjectId,
+    final_status: str,
+    result_model: SubmissionResult,
+    reusable: bool = False,
+) -> bool:
+    """Write the terminal status and the whole result in one update, only while running."""
+    now = datetime.now(timezone.utc)
+    res = await engine.get_collection(Submission).update_one(
+        {"_id": obj_id, "status": "running"},
+        {"$set": {
+            "status": final_status,
+            # embedded models are stored by field name, not alias
+            "result": result_model.model_dump(),
+            "resultReusable": reusable,
+            "completedAt": now,
+            "updatedAt": now,
+        }},
+    )
+    return res.matched_count == 1
+
+
+async def fail_abandoned_job(
+    engine: AIOEngine, redis: Redis, job: Dict[str, Any], deliveries: int
+) -> None:
+    """
+    Settle a job the stream queue gave up on after `deliveries` attempts
+    (every judge that took it died or failed): mark the submission failed,
+    only while it is still pending or running, and notify its listeners.
+    """
+    submission_id = job["submissionId"]
+    obj_id = ObjectId(submission_id)
+    detail = TestDetail(
+        test_case_id="judge",
+        verdict="error",
+        status="failed",
+        stdout="",
+        runtime_ms=0.0,
+        memory_bytes=0,
+        error_message=f"Judging was abandoned after {deliveries} attempts",
+    )
+    result_model = SubmissionResult(
+        total_tests=0,
+        passed_tests=0,
+        max_runtime_ms=0.0,
+        max_memory_bytes=0,
+        test_details=[detail],
+    )
+    now = datetime.now(timezone.utc)
+    res = await engine.get_collection(Submission).update_one(
+        {"_id": obj_id, "status": {"$in": ["pending", "running"]}},
+        {"$set": {
+            "status": "failed",
+            "result": result_model.model_dump(),
+            "resultReusable": False,
+            "completedAt": now,
+            "updatedAt": now,
+        }},
+    )
+    if res.matched_count == 1:
+        logger.error("Submission %s failed: judging abandoned after %d attempts", submission_id, deliveries)
+        _observe_job("failed", job.get("language"), [detail])
+        await _publish(redis, submission_id, {"status": "failed"})
+    if job.get("fingerprint"):
+        await _settle_followers(engine, redis, job, obj_id, None)
+
+
+# verdicts that may differ on a rejudge (timing, judge-side failures)
+_UNSTABLE_VERDICTS = ("", "error", "CheckerError", "TimeLimitExceeded")
+
+
+def _result_reusable(final_status: str, details: List[TestDetail]) -> bool:
+    """Whether identical later submissions may be given this result as is."""
+    if final_status not in ("success", "failed", "compile_error"):
+        return False
+    return not any(d.verdict in _UNSTABLE_VERDICTS for d in details)
+
+
+async def _settle_followers(
+    engine: AIOEngine,
+    redis: Redis,
+    job: Dict[str, Any],
+    obj_id: ObjectId,
+    settled: Optional[Tuple[str, SubmissionResult]],
+) -> None:
+    """
+    Settle the identical submissions coalesced onto this one (pending,
+    `reusedFrom` this submission). A reusable result is copied to them and
+    they are notified; without one (fetch error, unstable verdicts, a lost
+    write, a failed run) each goes back on the queue as a job of its own.
+    """
+    collection = engine.get_collection(Submission)
+    try:
+        followers = [
+            doc["_id"]
+            async for doc in collection.find(
+                {"reusedFrom": obj_id, "status": "pending"}, {"_id": 1}
+            )
+        ]
+        if not followers:
+            return
+        now = datetime.now(timezone.utc)
+        if settled is None:
+            requeued = 0
+            for follower_id in followers:
+                res = await collection.update_one(
+                    {"_id": follower_id, "status": "pending", "reusedFrom": obj_id},
+                    {"$set": {"reusedFrom": None, "updatedAt": now}},
+                )
+                if res.matched_count:
+                    requeued += 1
+                    await enqueue_job(redis, {
+                        **job,
+                        "submissionId": str(follower_id),
+                        "mongoId": str(follower_id),
+                        "enqueuedAt": time.time(),
+                    })
+            logger.info(
+                "Stage 6: No reusable result for %s, requeued %d identical submission(s)",
+                obj_id, requeued,
+            )
+            return
+
+        final_status, result_model = settled
+        result = result_model.model_dump()
+        copied = 0
+        for follower_id in followers:
+            res = await collection.update_one(
+                {"_id": follower_id, "status": "pending"},
+                {"$set": {"status": final_status, "result": result, "completedAt": now, "updatedAt": now}},
+            )
+            if res.matched_count:
+                copied += 1
+                await _publish(redis, str(follower_id), {"status": final_status})
+        logger.info("Stage 6: Copied result of %s to %d identical submission(s)", obj_id, copied)
+    except Exception:
+        # the Platform requeues followers left pending for too long
+        logger.exception("Stage 6: Could not settle submissions waiting for %s", obj_id)
+
+
+async def _prepare_checker(
+    spec: JobSpec, problem_id: str
+) -> Tuple[JobSpec, Optional[TestDetail]]:
+    """
+    Compile (or fetch from the per-worker cache) a problem's custom checker
+    before any test runs. Returns the spec carrying the checker program, or
+    a CheckerError detail when the checker cannot be used.
+    """
+    if not spec.checker or spec.checker.get("type", "exact") in BUILTIN_CHECKERS:
+        return spec, None
+    try:
+        if spec.checker.get("type") != "custom":
+            raise CheckerFailure(f"unknown checker type {spec.checker.get('type')!r}")
+        program = await get_checker_programs().get(problem_id, spec.checker)
+    except CheckerFailure as error:
+        logger.error("Stage 4: Checker unavailable for problem %s: %s", problem_id, error)
+        return spec, TestDetail(
+            test_case_id="checker",
+            verdict="CheckerError",
+            status="failed",
+            stdout="",
+            runtime_ms=0.0,
+            memory_bytes=0,
+            error_message=str(error),
+        )
+    return spec._replace(checker_program=program), None
+
+
+def _run_testcases(stdin: str, samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Inputs of a "run" request: the user's stdin, executed without an
+    expected output, followed by the problem's sample test cases if sent.
+    """
+    testcases = []
+    if stdin or not samples:
+        testcases.append({"caseId": "stdin", "isRemote": False, "input": stdin, "expectedOutput": None})
+    for i, sample in enumerate(samples, start=1):
+        testcases.append({
+            "caseId": f"sample-{i}",
+            "isRemote": False,
+            "input": sample.get("input", ""),
+            "expectedOutput": sample.get("expectedOutput", ""),
+        })
+    return testcases
+
+
+def _open_test_io(tc: Dict[str, Any], stack: contextlib.ExitStack, spec: JobSpec):
+    """
+    Return (stdin, stdin_path, checker) for a test case. Remote test files are
+    never loaded into memory: the program reads the input file directly and
+    the checker streams the expected file while comparing. Custom checker
+    programs get files for inline test cases too. Inputs without an
+    expected output (custom input of a run) get no checker.
+    """
+    if not tc.get("isRemote", False):
+        inp, expected = tc.get("input", ""), tc.get("expectedOutput", "")
+        if expected is None:
+            return inp, None, None
+        if spec.checker_program is None:
+            return inp, None, builtin_checker(spec.checker, expected)
+        input_path, expected_path = spool(inp, "tc_in_"), spool(expected, "tc_out_")
+        stack.callback(os.unlink, input_path)
+        stack.callback(os.unlink, expected_path)
+        return inp, None, _custom_checker(stack, spec, input_path, expected_path)
+
+    input_path = tc.get("inputPath", "")
+    expected_path = tc.get("outputPath", "")
+
+    stdin_path = None
+    if os.path.isfile(input_path):
+        stdin_path = input_path
+    else:
+        logger.error("Input file %s not found", input_path)
+
+    if spec.checker_program is not None:
+        return "", stdin_path, _custom_checker(stack, spec, input_path, expected_path)
+
+    try:
+        expected = stack.enter_context(open(expected_path, "rb"))
+        logger.debug("Streaming expected output from %s", expected_path)
+    except Exception as e:
+        logger.error("Failed to open expected output file %s: %s", expected_path, e)
+        expected = b""
+    return "", stdin_path, builtin_checker(spec.checker, expected)
+
+
+def _custom_checker(stack: contextlib.ExitStack, spec: JobSpec, input_path: str, expected_path: str):
+    checker = CustomChecker(
+        spec.checker_program, input_path, expected_path,
+        timeout_sec=config.CHECKER_TIME_LIMIT_SEC,
+        memory_bytes=config.CHECKER_MEMORY_MB * 1024 * 1024,
+    )
+    stack.callback(checker.close)
+    return checker
+
+
+async def _run_test_case(
+    artifact: CompiledArtifact,
+    tc: Dict[str, Any],
+    idx: int,
+    total: int,
+    spec: JobSpec,
+    submission_id: str,
+) -> Tuple[TestDetail, bool]:
+    """Execute one test case against the compiled artifact."""
+    case_id = tc["caseId"]
+    logger.debug("Stage 4: Running test %d/%d (caseId=%s)", idx, total, case_id)
+
+    verdict = None
+    try:
+        with contextlib.ExitStack() as stack:
+            inp, stdin_path, checker = _open_test_io(tc, stack, spec)
+            if STAGE_OBSERVERS and checker is not None:
+                checker = _TimedChecker(checker)
+            logger.debug("Stage 4: Input: %s", stdin_path or inp)
+            started = time.perf_counter()
+            result = await run_compiled(
+                artifact,
+                stdin=inp,
+                timeout_sec=spec.time_limit_ms / 1000,
+                memory_bytes=spec.memory_limit_b,
+                pool=get_interpreter_pool(),
+                stdin_path=stdin_path,
+                checker=checker,
+            )
+            if STAGE_OBSERVERS:
+                # output is compared while the program runs; split the two
+                compare_sec = checker.elapsed if checker is not None else 0.0
+                run_sec = time.perf_counter() - started - compare_sec
+                _observe("run", run_sec, submission_id, artifact.language)
+                _observe("compare", compare_sec, submission_id, artifact.language)
+
+        logger.info("Stage 4: Test %d/%d executed, result=%s", idx, total, result)
+
+        # the checker already compared the output: OK means accepted
+        verdict = result.get("verdict")
+        passed = verdict == "OK"
+        logger.info("Stage 4: Test %d verdict=%s passed=%s", idx, verdict, passed)
+    except CheckerFailure as error:
+        passed = False
+        verdict = "CheckerError"
+        result = {"stderr": str(error)}
+        logger.error("Stage 4: Checker failed on test %d for submission %s: %s", idx, submission_id, error)
+    except Exception as error:
+        passed = False
+        result = {
+            "exitCode": -1,
+            "stdout": "",
+            "stderr": str(error),
+            "runtime_ms": 0,
+            "memory_bytes": 0
+        }
+        logger.error("Stage 4: Error executing test %d for submission %s: %s", idx, submission_id, error, exc_info=True)
+
+    detail = TestDetail(
+        test_case_id=str(case_id),
+        verdict=verdict or "",
+        status="passed" if passed else "failed",
+        stdout=_preview(result.get("stdout", ""), spec.preview_bytes),
+        runtime_ms=result.get("runtime_ms", 0.0),
+        memory_bytes=result.get("memory_bytes", 0),
+        wall_time_ms=result.get("wall_time_ms"),
+        first_diff_line=result.get("first_diff_line"),
+        first_diff_column=result.get("first_diff_column"),
+        error_message=_preview(result.get("stderr"), spec.preview_bytes) or result.get("checker_message"),
+        stdout_bytes=result.get("stdout_bytes"),
+        stderr_bytes=result.get("stderr_bytes"),
+        effective_time_limit_ms=result.get("time_limit_ms"),
+        effective_memory_limit_bytes=result.get("memory_limit_bytes"),
+    )
+    logger.info("Stage 4: Test %d details: %s", idx, detail)
+    return detail, passed
+
+
+def _preview(text: Optional[str], limit: Optional[int]) -> Optional[str]:
+    """The first `limit` bytes of `text`, cut on a character boundary."""
+    if not text or limit is None or len(text) <= limit // 4:
+        return text
+    data = text.encode("utf-8", "replace")
+    if len(data) <= limit:
+        return text
+    return data[:limit].decode("utf-8", "ignore")
+
+
+async def _run_tests_parallel(
+    artifact: CompiledArtifact,
+    testcases: List[Dict[str, Any]],
+    spec: JobSpec,
+    submission_id: str,
+    parallelism: int,
+    progress: Optional[ProgressPublisher] = None,
+) -> Tuple[List[TestDetail], bool]:
+    """
+    Run test cases concurrently, at most `parallelism` at a time, in index
+    order. When a test fails every run with a higher index is cancelled (and
+    its process killed), but lower-index runs are left to finish: one of
+    them may fail too, and the verdict must name the same first failing
+    test as the sequential loop would.
+    """
+    total = len(testcases)
+    semaphore = asyncio.Semaphore(parallelism)
+    results: Dict[int, Tuple[TestDetail, bool]] = {}
+    tasks: Dict[int, asyncio.Task] = {}
+    first_failure = total + 1
+
+    async def run_one(idx: int, tc: Dict[str, Any]) -> None:
+        nonlocal first_failure
+        async with semaphore:
+            detail, passed = await _run_test_case(
+                artifact, tc, idx, total, spec, submission_id
+            )
+        results[idx] = (detail, passed)
+        if not passed and idx < first_failure:
+            first_failure = idx
+            for later_idx, task in tasks.items():
+                if later_idx > idx:
+                    task.cancel()
+        if progress and idx <= first_failure:
+            await _report_test(progress, idx, detail)
+
+    # Semaphore waiters are served FIFO, so tests start in index order
+    for idx, tc in enumerate(testcases, start=1):
+        tasks[idx] = asyncio.create_task(run_one(idx, tc))
+    try:
+        outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+
+    cancelled = sum(1 for idx in tasks if idx > first_failure and idx not in results)
+    if cancelled:
+        logger.info("Stage 4: Cancelled %d test run(s) after test %d failed", cancelled, first_failure)
+
+    last = min(first_failure, total)
+    details = [results[idx][0] for idx in range(1, last + 1)]
+    return details, first_failure > total
@@ -1,11 +1,19 @@
 import asyncio
+import functools
+import signal
 
 # 1) configure logging exactly once, at startup
 from judge_service.config.logging_config import configure_logging
 configure_logging()
 
-from judge_service.core.dependencies import get_engine, get_redis
-from judge_service.job_processor import process_job
+from judge_service.core.dependencies import (
+    get_engine, get_redis, get_compile_cache, get_testcase_cache, get_interpreter_pool,
+    get_workspace_pool, get_checker_programs,
+)
+from judge_service.config.config import config
+from judge_service import calibration, job_processor, metrics, sandbox
+from judge_service.queue_backends import get_queue, run_queue_key
+from judge_service.worker import JudgeWorker, resolve_concurrency, resolve_test_parallelism
 import httpx
 import logging
 
@@ -26,22 +34,115 @@ async def main():
     http_client = httpx.AsyncClient()
     logger.info("HTTP client initialized")
 
-    logger.info("Judge Worker started, waiting for jobs...")
+    sandbox.configure(
+        wall_time_factor=config.WALL_TIME_FACTOR,
+        wall_time_extra_sec=config.WALL_TIME_EXTRA_SEC,
+        cgroup_root=config.CGROUP_ROOT,
+        compile_timeout_sec=config.COMPILE_TIMEOUT_SEC,
+        max_processes=config.RUN_MAX_PROCESSES or None,
+        output_limit_bytes=config.OUTPUT_LIMIT_BYTES,
+        stdout_keep_bytes=config.STDOUT_KEEP_BYTES,
+        stderr_keep_bytes=config.STDERR_LIMIT_BYTES,
+    )
+    speed_factor = config.TIME_SPEED_FACTOR
+    if config.TIME_CALIBRATION:
+        logger.info("Calibrating time limits for this node")
+        speed_factor = await calibration.measure_speed_factor() or speed_factor
+    sandbox.configure(
+        speed_factor=speed_factor,
+        time_multipliers=config.TIME_MULTIPLIERS,
+        memory_overhead_bytes={
+            language: mb * 1024 * 1024 for language, mb in config.MEMORY_OVERHEAD_MB.items()
+        },
+    )
+    logger.info(
+        "Time limits x%.2f (node) x %s (language), memory overhead %s MB",
+        speed_factor, config.TIME_MULTIPLIERS or "1.0", config.MEMORY_OVERHEAD_MB or 0
+    )
+
+    pool = get_interpreter_pool()
+    if pool:
+        pool.start()
+        logger.info("Warm interpreter pool started (%d per language)", pool.size)
+    get_workspace_pool()  # create the workspaces up front
+
+    concurrency = resolve_concurrency(
+        config.WORKER_CONCURRENCY, config.SLOT_MEMORY_MB * 1024 * 1024
+    )
+    test_parallelism = resolve_test_parallelism(config.TEST_PARALLELISM, concurrency)
+    # jobs the stream queue gives up on are failed, not left running
+    dead_letter = functools.partial(job_processor.fail_abandoned_job, engine, redis)
+    queue = get_queue(redis, concurrency, on_dead_letter=dead_letter)
+    logger.info("Using %s queue backend", config.QUEUE_BACKEND)
+    worker = JudgeWorker(
+        engine, redis, http_client, queue,
+        concurrency=concurrency,
+        test_parallelism=test_parallelism,
+        name="submit",
+    )
+
+    workers = [worker]
+    if config.RUN_WORKER_CONCURRENCY > 0:
+        # fast lane for "run" requests: own queue, own slots
+        run_queue = get_queue(
+            redis, config.RUN_WORKER_CONCURRENCY, key=run_queue_key(), on_dead_letter=dead_letter
+        )
+        workers.append(JudgeWorker(
+            engine, redis, http_client, run_queue,
+            concurrency=config.RUN_WORKER_CONCURRENCY,
+            name="run",
+        ))
+        logger.info(
+            "Run queue %s served by %d slot(s)", run_queue_key(), config.RUN_WORKER_CONCURRENCY
+        )
+
+    metrics_server = None
+    if config.METRICS_PORT:
+        judge_metrics = metrics.JudgeMetrics(workers, redis, config.REUSE_STATS_KEY)
+        job_processor.STAGE_OBSERVERS.append(judge_metrics.observe_stage)
+        job_processor.JOB_OBSERVERS.append(judge_metrics.observe_job)
+        metrics_server = await metrics.serve(
+            judge_metrics.registry, config.METRICS_HOST, config.METRICS_PORT
+        )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda: [w.stop() for w in workers])
+        except NotImplementedError:
+            logger.debug("Signal handlers not supported on this platform")
+
+    logger.info(
+        "Judge Worker started with %d slot(s) (%s), waiting for jobs...",
+        sum(w.concurrency for w in workers),
+        ", ".join(f"{w.name}: {w.concurrency}" for w in workers),
+    )
     try:
-        while True:
-            logger.debug("Polling for next job from Redis queue")
-            try:
-                await process_job(engine, redis, http_client)
-                logger.info("Job processed successfully")
-            except Exception as job_err:
-                logger.exception("Error processing job: %s", job_err)
+        await asyncio.gather(*(w.run() for w in workers))
     except asyncio.CancelledError:
         logger.warning("Judge Worker cancelled, shutting down...")
     except Exception as fatal_err:
         logger.exception("Unexpected error in main loop: %s", fatal_err)
     finally:
         logger.info("Cleaning up resources and shutting down HTTP client")
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
         await http_client.aclose()
+        await redis.aclose()
+        if pool:
+            await pool.close()
+            logger.info("Warm interpreter pool stats: %s", pool.stats())
+        cache = get_compile_cache()
+        if cache:
+            logger.info("Compile cache stats: %s", cache.stats())
+        get_checker_programs().close()
+        workspaces = get_workspace_pool()
+        if workspaces:
+            logger.info("Workspace pool stats: %s", workspaces.stats())
+        tc_cache = get_testcase_cache()
+        if tc_cache:
+            logger.info("Test-case cache stats: %s", tc_cache.stats())
         logger.info("Judge Worker shutdown complete")
 
 if __name__ == "__main__":
@@ -0,0 +1,357 @@
+import asyncio
+import bisect
+import inspect
+import math
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from judge_service import sandbox
+from judge_service.core.dependencies import (
+    get_compile_cache, get_interpreter_pool, get_testcase_cache, get_workspace_pool,
+)
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds; stages range from sub-millisecond (persist) to minutes (queue wait)
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    async def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    async def samples(self) -> List[Sample]:
+        return [(f"{self.name}_total", self._labels(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set, Prometheus style."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: counts per bucket (+Inf last), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    async def samples(self) -> List[Sample]:
+        out: List[Sample] = []
+        for key, (counts, (total,)) in self._values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                out.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            out.append((f"{self.name}_count", labels, cumulative))
+            out.append((f"{self.name}_sum", labels, total))
+        return out
+
+
+GaugeCallback = Callable[[], Union[Dict[LabelValues, float], Awaitable[Dict[LabelValues, float]]]]
+
+
+class Gauge(_Metric):
+    """
+    Point-in-time value read at scrape time from `callback`, which returns
+    (or awaits to) a mapping of label values to numbers. With no labels the
+    mapping has the single key `()`.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[GaugeCallback] = None, kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind  # "counter" for totals kept elsewhere (cache stats)
+
+    async def samples(self) -> List[Sample]:
+        if self.callback is None:
+            return []
+        values = self.callback()
+        if inspect.isawaitable(values):
+            values = await values
+        suffix = "_total" if self.kind == "counter" else ""
+        return [(f"{self.name}{suffix}", self._labels(key), value) for key, value in values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    async def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = await metric.samples()
+            except Exception:
+                logger.exception("Collecting metric %s failed", metric.name)
+                continue
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(_format_sample(*sample) for sample in samples)
+        return "\n".join(lines) + "\n"
+
+
+async def serve(registry: Registry, host: str, port: int) -> asyncio.AbstractServer:
+    """
+    Minimal HTTP/1.0 endpoint: `GET /metrics` returns the registry, anything
+    else a 404. Every response closes the connection.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # drain headers; the request has no body
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                body = (await registry.render()).encode()
+                status, content_type = "200 OK", CONTENT_TYPE
+            else:
+                body, status, content_type = b"not found\n", "404 Not Found", "text/plain"
+            writer.write(
+                f"HTTP/1.0 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception:
+            logger.exception("Metrics request failed")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("Metrics endpoint listening on http://%s:%d/metrics", host, port)
+    return server
+
+
+# ─── judge instruments ───────────────────────────────────────────────────────
+
+# (hit events, miss events) in each cache's stats()
+_CACHE_EVENTS = {
+    "compile": (("hits",), ("misses",)),
+    "testcases": (("hits", "revalidated", "stale_served"), ("misses",)),
+    "warm_pool": (("hits",), ("misses",)),
+    "workspaces": (("acquired",), ("fallbacks",)),
+}
+
+
+class JudgeMetrics:
+    """
+    The judge worker's metrics. `observe_stage` and `observe_job` are
+    registered as job_processor observers; queue, worker, cache and
+    sandbox figures are read when scraped.
+    """
+
+    def __init__(self, workers: Sequence = (), redis=None, reuse_stats_key: Optional[str] = None):
+        self.workers = list(workers)  # JudgeWorkers, each with its own queue
+        self.redis = redis
+        self.reuse_stats_key = reuse_stats_key
+        self.registry = Registry()
+        r = self.registry.register
+
+        self.stage_seconds = r(Histogram(
+            "judge_stage_duration_seconds",
+            "Time per job stage; run and compare are observed per test case", ["stage"],
+        ))
+        self.compile_seconds = r(Histogram(
+            "judge_compile_duration_seconds", "Compile phase per submission", ["language"],
+        ))
+        self.run_seconds = r(Histogram(
+            "judge_run_duration_seconds", "Program execution per test case", ["language"],
+        ))
+        self.jobs = r(Counter("judge_jobs", "Judged submissions by final status", ["language", "status"]))
+        self.verdicts = r(Counter("judge_test_verdicts", "Verdicts of executed test cases", ["language", "verdict"]))
+        r(Gauge("judge_queue_depth", "Jobs waiting in the queue, not yet delivered", ["worker", "backend"],
+                callback=self._queue_depth))
+        r(Gauge("judge_queue_pending", "Jobs delivered to a consumer but not acked (stream backend)",
+                ["worker"], callback=self._queue_pending))
+        r(Gauge("judge_jobs_in_flight", "Jobs being judged by this worker", ["worker"],
+                callback=self._in_flight))
+        r(Gauge("judge_worker_slots", "Job slots of this worker", ["worker"], callback=self._slots))
+        r(Gauge("judge_cache_events", "Cache lookups by outcome", ["cache", "event"],
+                callback=self._cache_events, kind="counter"))
+        r(Gauge("judge_cache_hit_ratio", "Share of cache lookups served without rebuilding", ["cache"],
+                callback=self._cache_hit_ratio))
+        r(Gauge("judge_sandbox_processes", "Sandboxed processes alive on this worker", ["state"],
+                callback=self._sandbox_processes))
+        r(Gauge("judge_sandbox_runs", "Sandboxed runs by outcome", ["outcome"],
+                callback=self._sandbox_runs, kind="counter"))
+        r(Gauge("judge_submission_reuse", "Submissions judged, given an earlier identical result, "
+                "or coalesced onto an identical pending one", ["outcome"],
+                callback=self._submission_reuse, kind="counter"))
+        r(Gauge("judge_submission_reuse_ratio", "Share of submissions settled without being judged",
+                callback=self._submission_reuse_ratio))
+
+    # job_processor observers
+    def observe_stage(self, stage: str, seconds: float, submission_id: str, language: str) -> None:
+        self.stage_seconds.observe(seconds, stage=stage)
+        if stage == "compile":
+            self.compile_seconds.observe(seconds, language=language)
+        elif stage == "run":
+            self.run_seconds.observe(seconds, language=language)
+
+    def observe_job(self, status: str, language: str, verdicts: List[str]) -> None:
+        self.jobs.inc(language=language, status=status)
+        for verdict in verdicts:
+            self.verdicts.inc(language=language, verdict=verdict or "error")
+
+    # scrape-time callbacks
+    async def _queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Stats of each worker's queue, by worker name."""
+        return {w.name: await w.queue.stats() for w in self.workers if w.queue is not None}
+
+    async def _queue_depth(self):
+        return {
+            (name, stats["backend"]): stats["length"] - stats.get("pending", 0)
+            for name, stats in (await self._queue_stats()).items()
+        }
+
+    async def _queue_pending(self):
+        return {
+            (name,): stats["pending"]
+            for name, stats in (await self._queue_stats()).items() if "pending" in stats
+        }
+
+    def _in_flight(self):
+        return {(w.name,): w.in_flight for w in self.workers}
+
+    def _slots(self):
+        return {(w.name,): w.concurrency for w in self.workers}
+
+    @staticmethod
+    def _cache_stats() -> Dict[str, Dict[str, Any]]:
+        sources = {
+            "compile": get_compile_cache(),
+            "testcases": get_testcase_cache(),
+            "warm_pool": get_interpreter_pool(),
+            "workspaces": get_workspace_pool(),
+        }
+        return {name: source.stats() for name, source in sources.items() if source is not None}
+
+    def _cache_events(self):
+        return {
+            (name, event): stats[event]
+            for name, stats in self._cache_stats().items()
+            for event in sum(_CACHE_EVENTS[name], ())
+        }
+
+    def _cache_hit_ratio(self):
+        ratios = {}
+        for name, stats in self._cache_stats().items():
+            hit_events, miss_events = _CACHE_EVENTS[name]
+            hits = sum(stats[e] for e in hit_events)
+            lookups = hits + sum(stats[e] for e in miss_events)
+            if lookups:
+                ratios[(name,)] = hits / lookups
+        return ratios
+
+    @staticmethod
+    def _sandbox_processes():
+        stats = sandbox.process_stats()
+        counts = {("compiling",): stats["compiling"], ("running",): stats["running"]}
+        pool = get_interpreter_pool()
+        if pool is not None:
+            counts[("warm_idle",)] = sum(pool.stats()["idle"].values())
+        return counts
+
+    async def _reuse_stats(self) -> Dict[str, float]:
+        if self.redis is None or not self.reuse_stats_key:
+            return {}
+        raw = await self.redis.hgetall(self.reuse_stats_key)
+        return {_decode(k): float(v) for k, v in raw.items()}
+
+    async def _submission_reuse(self):
+        return {(outcome,): count for outcome, count in (await self._reuse_stats()).items()}
+
+    async def _submission_reuse_ratio(self):
+        stats = await self._reuse_stats()
+        total = sum(stats.values())
+        if not total:
+            return {}
+        return {(): (stats.get("reused", 0) + stats.get("coalesced", 0)) / total}
+
+    @staticmethod
+    def _sandbox_runs():
+        stats = sandbox.process_stats()
+        return {("started",): stats["started"], ("killed",): stats["killed"]}
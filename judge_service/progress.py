@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLog(NamedTuple):
+    """Where a submission's events are kept for late and reconnecting SSE clients."""
+    key_prefix: str  # stream key = prefix + submission id
+    maxlen: int  # entries kept per submission (approximate trim)
+    ttl_sec: int  # the stream expires this long after its last event
+
+
+async def publish_event(
+    redis, channel: str, message: Dict[str, Any], log: Optional[EventLog] = None
+) -> None:
+    """
+    PUBLISH `message` on the submission's channel. With a log, the message
+    is first appended to the submission's stream, and the published copy
+    carries the entry id as "eventId" so subscribers that replayed the
+    stream skip what they have already seen. The append and its TTL go out
+    in one pipeline, so an entry is never left without one; PUBLISH needs
+    the entry id and follows.
+    """
+    if log is not None:
+        key = log.key_prefix + channel
+        pipe = redis.pipeline(transaction=False)
+        pipe.xadd(key, {"data": json.dumps(message)}, maxlen=log.maxlen, approximate=True)
+        pipe.expire(key, log.ttl_sec)
+        entry_id, _ = await pipe.execute()
+        if isinstance(entry_id, bytes):
+            entry_id = entry_id.decode()
+        message = {**message, "eventId": entry_id}
+    await redis.publish(channel, json.dumps(message))
+
+
+class ProgressPublisher:
+    """
+    Publishes a job's progress to the submission's Redis channel, next to
+    the `running`/terminal status messages:
+
+      {"event": "compile", "phase": "started"}
+      {"event": "compile", "phase": "finished", "verdict": null, "durationMs": 812.4}
+      {"event": "tests", "total": 40, "completed": 7,
+       "tests": [{"index": 7, "verdict": "OK", "runtimeMs": 12.0, "memoryBytes": 9437184}]}
+
+    Test results are coalesced: at most one "tests" message goes out per
+    `interval_sec`, carrying every test finished since the previous one,
+    so channel traffic stays bounded however fast the tests run. `close()`
+    flushes what is left; call it before publishing the terminal status.
+    Publishing errors are logged and never fail the job.
+    """
+
+    def __init__(
+        self, redis, channel: str, total: int, interval_sec: float = 0.25,
+        event_log: Optional[EventLog] = None,
+    ):
+        self.redis = redis
+        self.channel = channel
+        self.event_log = event_log
+        self.total = total
+        self.interval_sec = interval_sec
+        self.completed = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._last_sent = float("-inf")
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()  # keeps "tests" messages in order
+        self._closed = False
+
+    async def compile_started(self) -> None:
+        await self._publish({"event": "compile", "phase": "started"})
+
+    async def compile_finished(self, verdict: Optional[str], duration_ms: float) -> None:
+        await self._publish({
+            "event": "compile", "phase": "finished",
+            "verdict": verdict, "durationMs": round(duration_ms, 2),
+        })
+
+    async def test_finished(self, index: int, verdict: str, runtime_ms: float, memory_bytes: int) -> None:
+        if self._closed:
+            return
+        self.completed += 1
+        self._pending.append({
+            "index": index, "verdict": verdict,
+            "runtimeMs": round(runtime_ms, 2), "memoryBytes": memory_bytes,
+        })
+        wait = self._last_sent + self.interval_sec - time.monotonic()
+        if wait <= 0:
+            await self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_after(wait))
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._timer is not None:
+            # still sleeping: a timer that is publishing has already unset itself
+            self._timer.cancel()
+            self._timer = None
+        await self._flush()
+
+    # ─── internals ─────────────────────────────────────────────────────────────
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            tests, self._pending = self._pending, []
+            self._last_sent = time.monotonic()
+            await self._publish({
+                "event": "tests", "total": self.total, "completed": self.completed, "tests": tests,
+            })
+
+    async def _publish(self, message: Dict[str, Any]) -> None:
+        try:
+            await publish_event(self.redis, self.channel, message, self.event_log)
+        except Exception as error:
+            logger.warning("Could not publish progress for %s: %s", self.channel, error)
@@ -0,0 +1,283 @@
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Set
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from judge_service.config.config import config
+from judge_service.job_processor import dequeue_job
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedJob(NamedTuple):
+    payload: Dict[str, Any]
+    receipt: Optional[str] = None  # stream entry id, None for the list queue
+
+
+class ListQueue:
+    """
+    The original queue: Platform LPUSHes, judges BRPOP. A job popped by a
+    worker that dies is lost, so ack/release are no-ops.
+    """
+
+    def __init__(self, redis: Redis, key: Optional[str] = None):
+        self.redis = redis
+        self.key = key or config.QUEUE_KEY
+
+    async def dequeue(self, timeout: float) -> Optional[QueuedJob]:
+        job = await dequeue_job(self.redis, timeout=timeout, key=self.key)
+        return QueuedJob(job) if job is not None else None
+
+    async def ack(self, job: QueuedJob) -> None:
+        pass
+
+    async def release(self, job: QueuedJob) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def stats(self) -> Dict[str, Any]:
+        return {"backend": "list", "length": await self.redis.llen(self.key)}
+
+
+class StreamQueue:
+    """
+    Redis Streams consumer-group queue.
+
+    - Each entry is delivered to exactly one consumer of the group and stays
+      in that consumer's pending list until acked (XACK + XDEL on success).
+    - A failed or interrupted job is simply not acked; once it has been idle
+      for `claim_idle_ms` any consumer reclaims it with XAUTOCLAIM. Entries
+      delivered `max_deliveries` times are moved to `<stream>:dead` and
+      handed to `on_dead_letter(job, deliveries)`, which settles the
+      submission so nobody waits on it forever.
+    - Live consumers refresh the idle time of their in-flight entries with a
+      heartbeat XCLAIM, so long-running jobs are never stolen and judged twice.
+    - At most `max_in_flight` entries are held by this consumer at a time.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        stream: str,
+        group: str,
+        consumer: str,
+        max_in_flight: int,
+        claim_idle_ms: int,
+        max_deliveries: int,
+        on_dead_letter: Optional[Callable[[Dict[str, Any], int], Awaitable[None]]] = None,
+    ):
+        self.redis = redis
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.max_in_flight = max_in_flight
+        self.on_dead_letter = on_dead_letter
+
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight: Set[str] = set()
+        self._group_ready = False
+        self._last_reclaim = 0.0
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def dequeue(self, timeout: float) -> Optional[QueuedJob]:
+        await self._ensure_group()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        try:
+            entry = await self._reclaim() or await self._read_new(timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+        if entry is None:
+            self._slots.release()
+            return None
+
+        entry_id, fields = entry
+        self._in_flight.add(entry_id)
+        raw = fields.get(b"job") or fields.get("job")
+        job: Dict[str, Any] = json.loads(raw)
+        logger.info("Stage 1: Received job %s from stream entry %s", job.get("submissionId"), entry_id)
+        return QueuedJob(job, entry_id)
+
+    async def ack(self, job: QueuedJob) -> None:
+        """Job is done (whatever the verdict): drop it from the stream."""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xack(self.stream, self.group, job.receipt)
+        pipe.xdel(self.stream, job.receipt)
+        await pipe.execute()
+        self._forget(job.receipt)
+
+    async def release(self, job: QueuedJob) -> None:
+        """Give the job up without acking; another consumer reclaims it later."""
+        self._forget(job.receipt)
+
+    async def close(self) -> None:
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._heartbeat_task
+
+    async def stats(self) -> Dict[str, Any]:
+        """Stream length plus pending (delivered, unacked) entries per consumer."""
+        summary = await self.redis.xpending(self.stream, self.group)
+        per_consumer = {
+            _decode(c["name"]): int(c["pending"]) for c in summary.get("consumers", [])
+        }
+        return {
+            "backend": "stream",
+            "length": await self.redis.xlen(self.stream),
+            "pending": int(summary.get("pending", 0)),
+            "pending_per_consumer": per_consumer,
+        }
+
+    # ─── internals ─────────────────────────────────────────────────────────────
+
+    def _forget(self, entry_id: str) -> None:
+        if entry_id in self._in_flight:
+            self._in_flight.discard(entry_id)
+            self._slots.release()
+
+    async def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+            logger.info("Created consumer group %s on stream %s", self.group, self.stream)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        logger.info("Consuming stream %s as %s/%s", self.stream, self.group, self.consumer)
+
+    async def _read_new(self, timeout: float):
+        resp = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=1, block=max(1, int(timeout * 1000)),
+        )
+        if not resp:
+            return None
+        _, entries = resp[0]
+        entry_id, fields = entries[0]
+        return _decode(entry_id), fields
+
+    async def _reclaim(self):
+        """Take over one entry abandoned by a dead consumer, if any is due."""
+        now = time.monotonic()
+        if now - self._last_reclaim < self.claim_idle_ms / 2000:
+            return None
+        self._last_reclaim = now
+
+        while True:
+            resp = await self.redis.xautoclaim(
+                self.stream, self.group, self.consumer,
+                min_idle_time=self.claim_idle_ms, start_id="0-0", count=1,
+            )
+            entries = resp[1] if len(resp) > 1 else []
+            if not entries:
+                return None
+            entry_id, fields = entries[0]
+            entry_id = _decode(entry_id)
+            if fields is None:
+                # entry was deleted while pending; just clear it
+                await self.redis.xack(self.stream, self.group, entry_id)
+                continue
+
+            info = await self.redis.xpending_range(
+                self.stream, self.group, min=entry_id, max=entry_id, count=1
+            )
+            deliveries = int(info[0]["times_delivered"]) if info else 1
+            if deliveries > self.max_deliveries:
+                logger.error(
+                    "Stream entry %s delivered %d times, moving to dead-letter stream",
+                    entry_id, deliveries
+                )
+                pipe = self.redis.pipeline(transaction=True)
+                pipe.xadd(f"{self.stream}:dead", fields)
+                pipe.xack(self.stream, self.group, entry_id)
+                pipe.xdel(self.stream, entry_id)
+                await pipe.execute()
+                await self._dead_letter(entry_id, fields, deliveries)
+                continue
+
+            logger.warning("Reclaimed stream entry %s (delivery %d)", entry_id, deliveries)
+            return entry_id, fields
+
+    async def _dead_letter(self, entry_id: str, fields, deliveries: int) -> None:
+        if self.on_dead_letter is None:
+            return
+        try:
+            job = json.loads(fields.get(b"job") or fields.get("job"))
+            await self.on_dead_letter(job, deliveries)
+        except Exception:
+            logger.exception("Could not settle dead-lettered stream entry %s", entry_id)
+
+    async def _heartbeat(self) -> None:
+        interval = max(self.claim_idle_ms / 3000, 0.5)
+        while True:
+            await asyncio.sleep(interval)
+            if not self._in_flight:
+                continue
+            try:
+                await self.redis.xclaim(
+                    self.stream, self.group, self.consumer,
+                    min_idle_time=0, message_ids=list(self._in_flight), justid=True,
+                )
+            except Exception as e:
+                logger.warning("Stream heartbeat failed: %s", e)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def run_queue_key() -> str:
+    return config.RUN_QUEUE_KEY or f"{config.QUEUE_KEY}:run"
+
+
+def get_queue(
+    redis: Redis,
+    concurrency: int,
+    key: Optional[str] = None,
+    on_dead_letter: Optional[Callable[[Dict[str, Any], int], Awaitable[None]]] = None,
+):
+    """
+    Build the queue backend selected by QUEUE_BACKEND, for the submission
+    queue or, with `key`, another queue (e.g. the run queue; its stream is
+    "<key>:stream"). Every stream queue holds at most STREAM_MAX_IN_FLIGHT
+    entries, or `concurrency` (its worker's slots) when that is 0.
+    `on_dead_letter` settles jobs the stream backend gives
+    up on; the list backend never gives up on a job.
+    """
+    if config.QUEUE_BACKEND == "stream":
+        if key is None:
+            stream = config.STREAM_KEY or f"{config.QUEUE_KEY}:stream"
+        else:
+            stream = f"{key}:stream"
+        return StreamQueue(
+            redis,
+            stream=stream,
+            group=config.STREAM_GROUP,
+            consumer=config.CONSUMER_NAME or f"{socket.gethostname()}-{os.getpid()}",
+            max_in_flight=config.STREAM_MAX_IN_FLIGHT or concurrency,
+            claim_idle_ms=config.STREAM_CLAIM_IDLE_MS,
+            max_deliveries=config.STREAM_MAX_DELIVERIES,
+            on_dead_letter=on_dead_letter,
+        )
+    if config.QUEUE_BACKEND != "list":
+        raise ValueError(f"Unknown QUEUE_BACKEND: {config.QUEUE_BACKEND!r}")
+    return ListQueue(redis, key)
@@ -1,13 +1,17 @@
 import contextlib
 import asyncio
+import inspect
+import math
 import tempfile
 import shutil
 import os
 import resource
 import signal
+import subprocess
 import sys
 import time
-from typing import Dict, Any
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 
 # Exit/status conventions
@@ -22,198 +26,932 @@ _SANDBOX_CFG = {
     "javascript": (None, ["node", "Main.js"]),
 }
 
+_EXT_MAP = {"cpp": ".cpp", "java": ".java", "python": ".py", "javascript": ".js"}
+
 GRACE_MEMORY_BYTES = 15 * 1024 * 1024  # 15MB
 
 logger = logging.getLogger(__name__)
 
-async def run_in_sandbox(
-    language: str,
-    source_code: str,
-    stdin: str = "",
-    timeout_sec: float = 2,
-    memory_bytes: int = 12 * 1024 * 1024
-) -> Dict[str, Any]:
-    response: Dict[str, Any] = {
+class CompiledArtifact:
+    """
+    Workspace holding a submission that is ready to run: the source file plus,
+    for compiled languages, the binary/class files. Produced once per
+    submission by `compile_submission` and reused for every test case until
+    `cleanup()` is called.
+    """
+
+    def __init__(self, language: str, workdir: Optional[str], run_cmd: List[str],
+                 verdict: Optional[str] = None, compiler_msg: str = ""):
+        self.language = language
+        self.workdir = workdir
+        self.run_cmd = run_cmd
+        self.verdict = verdict
+        self.compiler_msg = compiler_msg
+        # set when the workspace came from a workspace pool
+        self.workspace = None
+        self.workspaces = None
+        self.max_file_bytes: Optional[int] = None
+        self.setup_ms = 0.0
+        self.teardown_ms = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.verdict is None
+
+    def failure_response(self) -> Dict[str, Any]:
+        """Response dict for a submission that never got to run."""
+        response = _empty_response()
+        response.update({
+            "verdict": self.verdict,
+            "compiler_msg": self.compiler_msg,
+            "setup_ms": self.setup_ms,
+        })
+        return response
+
+    def cleanup(self) -> None:
+        if self.workdir:
+            start = time.perf_counter()
+            if self.workspace is not None:
+                self.workspaces.release(self.workspace)
+                self.workspace = None
+            else:
+                shutil.rmtree(self.workdir, ignore_errors=True)
+            self.teardown_ms = (time.perf_counter() - start) * 1000
+            logger.debug("Cleaned up workspace directory: %s (%.2fms)", self.workdir, self.teardown_ms)
+            self.workdir = None
+
+
+def _empty_response() -> Dict[str, Any]:
+    return {
         "verdict": None,
         "stdout": "",
         "stderr": "",
         "compiler_msg": "",
         "runtime_ms": 0.0,
         "memory_bytes": 0,
+        "setup_ms": 0.0,
+        "teardown_ms": 0.0,
     }
 
-    logger.info("Starting sandbox for language=%s, timeout=%.2fs, memory_limit=%d bytes", language, timeout_sec, memory_bytes)
 
-    memory_bytes += GRACE_MEMORY_BYTES
-    cfg = _SANDBOX_CFG.get(language.lower())
+async def compile_submission(
+    language: str, source_code: str, cache=None, workspaces=None
+) -> CompiledArtifact:
+    """
+    Compile phase: create a workspace, write the source and compile it if the
+    language needs it. On failure the workspace is removed and the returned
+    artifact carries the verdict (and compiler output) instead.
+
+    `cache` is an optional compile cache (see compile_cache.CompileCache);
+    on a hit the build output / compiler error is taken from it instead of
+    running the compiler.
+
+    `workspaces` is an optional workspace pool (see
+    workspace_pool.WorkspacePool) to take the directory from instead of
+    mkdtemp. `setup_ms` on the artifact is the time spent getting the
+    workspace ready (without compiling), `teardown_ms` is set by cleanup().
+    """
+    lang = language.lower()
+    cfg = _SANDBOX_CFG.get(lang)
     if not cfg:
         logger.error("Unsupported language requested: %s", language)
-        response["verdict"] = "UnsupportedLanguage"
-        return response
+        return CompiledArtifact(lang, None, [], verdict="UnsupportedLanguage")
 
     compile_cmd, default_run_cmd = cfg
-    workdir = tempfile.mkdtemp(prefix="sandbox_")
+    setup_start = time.perf_counter()
+    if workspaces is not None:
+        workspace = workspaces.acquire()
+        workdir = workspace.path
+    else:
+        workspace = None
+        workdir = tempfile.mkdtemp(prefix="sandbox_")
     logger.debug("Created workspace directory: %s", workdir)
+    artifact = CompiledArtifact(lang, workdir, list(default_run_cmd))
+    if workspace is not None:
+        artifact.workspace, artifact.workspaces = workspace, workspaces
+        if workspace.pooled:
+            artifact.max_file_bytes = workspaces.max_workspace_bytes
 
     try:
         # Write source file
-        ext_map = {"cpp": ".cpp", "java": ".java", "python": ".py", "javascript": ".js"}
-        ext = ext_map.get(language.lower(), "")
-        src_path = os.path.join(workdir, f"Main{ext}")
+        src_path = os.path.join(workdir, f"Main{_EXT_MAP[lang]}")
         with open(src_path, "w") as src_file:
             src_file.write(source_code)
-        logger.debug("Source code written to %s", src_path)
+        artifact.setup_ms = (time.perf_counter() - setup_start) * 1000
+        logger.debug("Source code written to %s (setup %.2fms)", src_path, artifact.setup_ms)
 
         # Compile if needed
         if compile_cmd:
-            logger.info("Compiling with command: %s", " ".join(compile_cmd))
-            proc = await asyncio.create_subprocess_exec(
-                *compile_cmd,
-                cwd=workdir,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            out, err = await proc.communicate()
-            if proc.returncode != 0:
-                compiler_msg = err.decode(errors="ignore")
-                logger.error("Compilation failed (exit_code=%d): %s", proc.returncode, compiler_msg)
-                response.update({
-                    "verdict": "CompilationError",
-                    "compiler_msg": compiler_msg,
-                })
-                return response
+            cached = await cache.restore(lang, compile_cmd, source_code, workdir) if cache else None
+            if cached is not None:
+                ok, compiler_msg = cached.ok, cached.compiler_msg
+                logger.info("Reusing cached compilation for %s (ok=%s)", language, ok)
+            else:
+                logger.info("Compiling with command: %s", " ".join(compile_cmd))
+                proc = await asyncio.create_subprocess_exec(
+                    *compile_cmd,
+                    cwd=workdir,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True,  # so the whole toolchain can be killed
+                )
+                _PROCESSES["compiling"] += 1
+                timed_out = False
+                try:
+                    out, err = await asyncio.wait_for(
+                        proc.communicate(), timeout=_SETTINGS["compile_timeout_sec"]
+                    )
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    _kill_group(proc.pid)
+                    await proc.wait()
+                    err = f"Compilation timed out after {_SETTINGS['compile_timeout_sec']:g}s".encode()
+                except asyncio.CancelledError:
+                    _kill_group(proc.pid)
+                    raise
+                finally:
+                    _PROCESSES["compiling"] -= 1
+                ok = proc.returncode == 0 and not timed_out
+                compiler_msg = "" if ok else err[:_SETTINGS["stderr_keep_bytes"]].decode(errors="ignore")
+                if cache and not timed_out:
+                    await cache.store(
+                        lang, compile_cmd, source_code, workdir, ok, compiler_msg,
+                        exclude=[os.path.basename(src_path)],
+                    )
+            if not ok:
+                logger.error("Compilation failed: %s", compiler_msg)
+                artifact.cleanup()
+                artifact.verdict = "CompilationError"
+                artifact.compiler_msg = compiler_msg
+                return artifact
             logger.info("Compilation succeeded for %s", language)
+    except BaseException:
+        artifact.cleanup()
+        raise
+
+    return artifact
 
-        # Prepare run command and resource limits
-        run_cmd = list(default_run_cmd)
-        preexec_fn = None
-        if language.lower() == "java":
-            mem_mb = memory_bytes // (1024 * 1024)
-            run_cmd = ["java", f"-Xmx{mem_mb}m", "-cp", ".", "Main"]
-            logger.debug("Java memory limit set to %dm", mem_mb)
+
+async def run_in_sandbox(
+    language: str,
+    source_code: str,
+    stdin: str = "",
+    timeout_sec: float = 2,
+    memory_bytes: int = 12 * 1024 * 1024,
+    workspaces=None,
+    checker=None,
+) -> Dict[str, Any]:
+    """
+    One-shot helper: compile, run once against `stdin` (compared by
+    `checker`, if given), tear down. Use `compile_submission` +
+    `run_compiled` to run many inputs.
+    """
+    logger.info("Starting sandbox for language=%s, timeout=%.2fs, memory_limit=%d bytes", language, timeout_sec, memory_bytes)
+    artifact = await compile_submission(language, source_code, workspaces=workspaces)
+    try:
+        if not artifact.ok:
+            response = artifact.failure_response()
         else:
-            if sys.platform.startswith("linux"):
-                def _limit_as():
-                    try:
-                        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
-                        logger.debug("Address space limit set to %d bytes", memory_bytes)
-                    except Exception as e:
-                        logger.warning("Failed to set AS limit: %s", e)
-                preexec_fn = _limit_as
-                logger.debug("AS limit enforcement enabled for Linux")
-            else:
-                logger.warning("Skipping AS limits on non-Linux platform: %s", sys.platform)
+            response = await run_compiled(artifact, stdin, timeout_sec, memory_bytes, checker=checker)
+    finally:
+        artifact.cleanup()
+    response["teardown_ms"] = artifact.teardown_ms
+    return response
+
+
+async def run_compiled(
+    artifact: CompiledArtifact,
+    stdin: str = "",
+    timeout_sec: float = 2,
+    memory_bytes: int = 12 * 1024 * 1024,
+    pool=None,
+    stdin_path: Optional[str] = None,
+    checker=None,
+    args: Optional[List[str]] = None,
+    adjust_limits: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run phase: execute an already compiled artifact against one input.
+    The workspace is left in place for the next test case.
+
+    `runtime_ms` is the CPU time (user + sys) of the whole process tree and is
+    what the time limit applies to; `wall_time_ms` is reported alongside and
+    only a generous wall-clock cap (see `configure`) kills sleeping programs.
+    `memory_bytes` is the peak resident memory: `ru_maxrss` from wait4, or
+    `memory.peak` of the run's cgroup when cgroup v2 accounting is enabled.
+
+    `pool` is an optional warm interpreter pool (see
+    interpreter_pool.InterpreterPool). For python/javascript a pre-started
+    interpreter is taken from it, limited with prlimit and handed the script,
+    and `startup_saved_ms` reports the start-up time that was skipped.
 
-        # Monitor memory usage
-        async def monitor_process(process, limit):
+    Large tests: `stdin_path` makes the program read its input straight from
+    that file instead of `stdin`, and `checker` (see checkers.ExactChecker)
+    compares stdout while it is produced. The run is killed as soon as the
+    checker rejects the output, and a rejected output gives the verdict
+    "WrongAnswer" with `first_diff_line`/`first_diff_column` (or
+    `checker_message`). `checker.finish()` may be a coroutine.
+
+    Output is bounded while it is read: only the first `stdout_keep_bytes` /
+    `stderr_keep_bytes` (see `configure`) are kept as `stdout`/`stderr`,
+    with the full sizes in `stdout_bytes`/`stderr_bytes`, and a run writing
+    more than `output_limit_bytes` to stdout is killed with the verdict
+    "OutputLimitExceeded".
+
+    `args` are extra command-line arguments (used to run checker programs);
+    runs with arguments never use the warm pool.
+
+    The limits are adjusted for this node and the language first (see
+    `effective_limits`; `adjust_limits=False` applies them as given) and
+    reported as `time_limit_ms`/`memory_limit_bytes`.
+    """
+    if not artifact.ok:
+        return artifact.failure_response()
+
+    response = _empty_response()
+    language = artifact.language
+    workdir = artifact.workdir
+    heap_bytes = memory_bytes + GRACE_MEMORY_BYTES
+    if adjust_limits:
+        timeout_sec, memory_bytes = effective_limits(language, timeout_sec, memory_bytes)
+    response["time_limit_ms"] = round(timeout_sec * 1000, 3)
+    response["memory_limit_bytes"] = memory_bytes
+    memory_bytes += GRACE_MEMORY_BYTES
+    is_linux = sys.platform.startswith("linux")
+
+    # Prepare run command and resource limits
+    run_cmd = list(artifact.run_cmd)
+    cgroup = _RunCgroup.create(memory_bytes) if is_linux else None
+    address_limit = None
+    if language == "java":
+        # the heap gets the problem's limit; the overhead is for the JVM itself
+        mem_mb = heap_bytes // (1024 * 1024)
+        run_cmd = ["java", f"-Xmx{mem_mb}m", "-cp", ".", "Main"]
+        logger.debug("Java memory limit set to %dm", mem_mb)
+    elif cgroup is None:
+        if is_linux:
+            address_limit = memory_bytes
+            logger.debug("AS limit enforcement enabled for Linux")
+        else:
+            logger.warning("Skipping AS limits on non-Linux platform: %s", sys.platform)
+
+    rlimits = []
+    if address_limit is not None:
+        rlimits.append((resource.RLIMIT_AS, (address_limit, address_limit)))
+    if is_linux:
+        # keep one run from filling the (RAM-backed) workspace mount
+        max_file_bytes = artifact.max_file_bytes or _SETTINGS["max_file_bytes"]
+        if max_file_bytes:
+            rlimits.append((resource.RLIMIT_FSIZE, (max_file_bytes, max_file_bytes)))
+        if _SETTINGS["max_processes"]:
+            nproc = _SETTINGS["max_processes"]
+            rlimits.append((resource.RLIMIT_NPROC, (nproc, nproc)))
+
+    cpu_limit = _cpu_rlimit(timeout_sec, 0.0)
+
+    def _preexec():
+        if cgroup is not None:
+            cgroup.enter()
+        for limit, value in rlimits + [(resource.RLIMIT_CPU, cpu_limit)]:
             try:
-                import psutil
-                peak = 0
-                proc_ps = psutil.Process(process.pid)
-                logger.debug("Started memory monitoring for PID %d", process.pid)
-                while process.returncode is None:
-                    usage = proc_ps.memory_info().rss
-                    peak = max(peak, usage)
-                    if usage > limit:
-                        process.kill()
-                        logger.warning("Memory limit exceeded: used=%d, limit=%d", usage, limit)
-                        return True, peak
-                    await asyncio.sleep(0.05)
-                return False, peak
-            except ImportError:
-                logger.warning("psutil not available, memory monitoring disabled")
-                return False, 0
+                resource.setrlimit(limit, value)
             except Exception as e:
-                logger.error("Error during memory monitoring: %s", e)
-                return False, peak
+                logger.warning("Failed to set rlimit %s: %s", limit, e)
+
+    run_cmd += args or []
 
-        # Execute the program
-        logger.info("Executing command: %s", " ".join(run_cmd))
+    # Execute the program
+    warm = pool.acquire(language) if pool is not None and is_linux and not args else None
+    cpu_offset_ms = 0.0
+    try:
         start = time.perf_counter()
-        proc = await asyncio.create_subprocess_exec(
-            *run_cmd,
-            cwd=workdir,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            preexec_fn=preexec_fn
+        if warm is not None:
+            proc = warm.proc
+            try:
+                if cgroup is not None:
+                    cgroup.attach(proc.pid)
+                else:
+                    # start-up CPU already spent by the warm interpreter
+                    cpu_offset_ms = _running_cpu_ms(proc.pid, None) or 0.0
+                for limit, value in rlimits:
+                    resource.prlimit(proc.pid, limit, value)
+                resource.prlimit(proc.pid, resource.RLIMIT_CPU, _cpu_rlimit(timeout_sec, cpu_offset_ms))
+                script = os.path.join(workdir, run_cmd[-1])
+                logger.info("Executing %s in warm interpreter %d", script, proc.pid)
+                warm.start(script)
+            except BaseException:
+                warm.discard()
+                raise
+        else:
+            logger.info("Executing command: %s", " ".join(run_cmd))
+            stdin_file = open(stdin_path, "rb") if stdin_path else None
+            try:
+                proc = subprocess.Popen(
+                    run_cmd,
+                    cwd=workdir,
+                    stdin=stdin_file or subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    preexec_fn=_preexec,
+                    # own session and process group: the whole tree is killed
+                    start_new_session=True,
+                )
+            finally:
+                if stdin_file:
+                    stdin_file.close()
+        usage = await _execute(
+            proc, start, stdin.encode(), timeout_sec, cgroup, cpu_offset_ms,
+            stdin_path=stdin_path, checker=checker,
         )
-        monitor_task = asyncio.create_task(monitor_process(proc, memory_bytes))
+    finally:
+        if cgroup is not None:
+            cgroup.remove()
+        logger.debug("Run finished in workspace %s", workdir)
 
-        try:
-            out, err = await asyncio.wait_for(
-                proc.communicate(stdin.encode()),
-                timeout=timeout_sec
-            )
-            duration = (time.perf_counter() - start) * 1000
-            mem_killed, peak_usage = await monitor_task
-
-            if mem_killed:
-                logger.error("Process killed due to memory limit")
-                response.update({
-                    "verdict": "MemoryLimitExceeded",
-                    "stderr": err.decode(errors="ignore"),
-                    "runtime_ms": duration,
-                    "memory_bytes": peak_usage,
-                })
-                return response
-        except asyncio.TimeoutError:
-            monitor_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await monitor_task
-            proc.kill()
-            duration = (time.perf_counter() - start) * 1000
-            logger.error("Process exceeded time limit of %.2fs", timeout_sec)
-            response.update({
-                "verdict": "TimeLimitExceeded",
-                "runtime_ms": duration,
-                "memory_bytes": 0,
-            })
-            return response
-
-        stderr_decoded = err.decode(errors="ignore")
-        _, peak_usage = await monitor_task
-
-        # Detect memory-related errors in stderr
-        memory_patterns = [
-            "MemoryError", "std::bad_alloc", "OutOfMemoryError",
-            "out of memory", "malloc failed", "mmap failed"
-        ]
-        if any(pat in stderr_decoded for pat in memory_patterns):
-            logger.error("Memory-related error detected in stderr: %s", stderr_decoded)
-            response.update({
-                "verdict": "MemoryLimitExceeded",
-                "stderr": stderr_decoded,
-                "runtime_ms": duration,
-                "memory_bytes": peak_usage,
-            })
-            return response
-
-        # Check exit code
-        if proc.returncode != 0:
-            logger.error("Runtime error (exit_code=%d): %s", proc.returncode, stderr_decoded)
-            response.update({
-                "verdict": "RuntimeError",
-                "stderr": stderr_decoded,
-                "runtime_ms": duration,
-                "memory_bytes": peak_usage,
-            })
-            return response
-
-        # Success
-        stdout_decoded = out.decode(errors="ignore").strip()
-        logger.info("Execution succeeded, output length=%d", len(stdout_decoded))
+    stats = {
+        "runtime_ms": usage.cpu_ms,
+        "cpu_time_ms": usage.cpu_ms,
+        "wall_time_ms": usage.wall_ms,
+        "exit_code": usage.returncode,
+        "startup_saved_ms": warm.startup_saved_ms if warm is not None else 0.0,
+        "setup_ms": artifact.setup_ms,
+        "stdout_bytes": usage.stdout_bytes,
+        "stderr_bytes": usage.stderr_bytes,
+    }
+
+    if usage.output_exceeded:
+        logger.error(
+            "Output limit exceeded (%d bytes written, limit %d)",
+            usage.stdout_bytes, _SETTINGS["output_limit_bytes"]
+        )
         response.update({
-            "verdict": "OK",
-            "stdout": stdout_decoded,
-            "runtime_ms": duration,
-            "memory_bytes": peak_usage,
+            "verdict": "OutputLimitExceeded",
+            "stdout": usage.stdout.decode(errors="ignore").strip(),
+            **stats,
+            "memory_bytes": usage.peak_bytes,
         })
         return response
 
+    if usage.timed_out or usage.cpu_ms > timeout_sec * 1000:
+        logger.error(
+            "Process exceeded time limit of %.2fs (cpu=%.1fms wall=%.1fms)",
+            timeout_sec, usage.cpu_ms, usage.wall_ms
+        )
+        response.update({"verdict": "TimeLimitExceeded", **stats, "memory_bytes": 0})
+        return response
+
+    stats["memory_bytes"] = usage.peak_bytes
+    stderr_decoded = usage.stderr.decode(errors="ignore")
+
+    if usage.diverged:
+        # killed on the first wrong byte; how it died says nothing
+        return _wrong_answer(response, checker, usage, stats)
+
+    # Detect memory-related errors: cgroup OOM kill, peak over the limit, or
+    # the runtime reporting a failed allocation
+    memory_patterns = [
+        "MemoryError", "std::bad_alloc", "OutOfMemoryError",
+        "out of memory", "malloc failed", "mmap failed"
+    ]
+    if (usage.oom_killed or usage.peak_bytes > memory_bytes
+            or any(pat in stderr_decoded for pat in memory_patterns)):
+        logger.error(
+            "Memory limit exceeded (peak=%d, limit=%d, oom_kill=%s): %s",
+            usage.peak_bytes, memory_bytes, usage.oom_killed, stderr_decoded
+        )
+        response.update({"verdict": "MemoryLimitExceeded", "stderr": stderr_decoded, **stats})
+        return response
+
+    # Check exit code
+    if usage.returncode != 0:
+        logger.error("Runtime error (exit_code=%d): %s", usage.returncode, stderr_decoded)
+        response.update({"verdict": "RuntimeError", "stderr": stderr_decoded, **stats})
+        return response
+
+    if checker is not None:
+        accepted = checker.finish()
+        if inspect.isawaitable(accepted):
+            accepted = await accepted
+        if not accepted:
+            return _wrong_answer(response, checker, usage, stats)
+
+    # Success
+    stdout_decoded = usage.stdout.decode(errors="ignore").strip()
+    logger.info(
+        "Execution succeeded, output length=%d, cpu=%.1fms, wall=%.1fms, peak=%d bytes",
+        len(stdout_decoded), usage.cpu_ms, usage.wall_ms, usage.peak_bytes
+    )
+    response.update({"verdict": "OK", "stdout": stdout_decoded, **stats})
+    return response
+
+
+def _wrong_answer(response: Dict[str, Any], checker, usage: "_RunUsage", stats: Dict[str, Any]) -> Dict[str, Any]:
+    logger.info(
+        "Wrong answer: output differs at line %s, column %s",
+        checker.diff_line, checker.diff_column
+    )
+    response.update({
+        "verdict": "WrongAnswer",
+        "stdout": usage.stdout.decode(errors="ignore").strip(),
+        "first_diff_line": checker.diff_line,
+        "first_diff_column": checker.diff_column,
+        "checker_message": checker.message,
+        **stats,
+    })
+    return response
+
+
+# ─── process execution and accounting ─────────────────────────────────────────
+
+_SETTINGS: Dict[str, Any] = {
+    # wall-clock cap = time limit * factor + extra; only catches programs that
+    # sleep or block, CPU-bound ones are stopped at the CPU time limit
+    "wall_time_factor": 2.0,
+    "wall_time_extra_sec": 1.0,
+    # delegated cgroup v2 directory to create one child cgroup per run in;
+    # None disables cgroup accounting and wait4 rusage is used instead
+    "cgroup_root": None,
+    # time limits are scaled by the node's speed factor (1.0 = the reference
+    # node, > 1 slower) and a per-language multiplier; memory limits get a
+    # per-language baseline overhead (runtime heap, JIT) added
+    "speed_factor": 1.0,
+    "time_multipliers": {},
+    "memory_overhead_bytes": {},
+    # compilations running longer are killed (with their process group)
+    "compile_timeout_sec": 30.0,
+    # RLIMIT_NPROC for runs; the kernel counts every process and thread of
+    # the judge's user against it, so leave room for the worker itself.
+    # None leaves it unset.
+    "max_processes": None,
+    # RLIMIT_FSIZE for runs whose workspace sets no cap of its own
+    "max_file_bytes": 64 * 1024 * 1024,
+    # stdout a run may write before it is killed (OutputLimitExceeded);
+    # 0 = unlimited
+    "output_limit_bytes": 64 * 1024 * 1024,
+    # leading bytes of stdout/stderr kept in memory and returned; the rest
+    # is read and counted, then dropped
+    "stdout_keep_bytes": 64 * 1024,
+    "stderr_keep_bytes": 64 * 1024,
+}
+
+
+# Sandboxed processes of this worker: compilers and runs currently alive,
+# and totals of runs started and killed (time limit, divergence, cancel)
+_PROCESSES: Dict[str, int] = {"compiling": 0, "running": 0, "started": 0, "killed": 0}
+
+
+def process_stats() -> Dict[str, int]:
+    return dict(_PROCESSES)
+
+
+def configure(**settings: Any) -> None:
+    """Set run-phase options (see `_SETTINGS`) once at process start."""
+    unknown = set(settings) - set(_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown sandbox settings: {sorted(unknown)}")
+    _SETTINGS.update(settings)
+
+
+def _cpu_rlimit(timeout_sec: float, cpu_offset_ms: float) -> Tuple[int, int]:
+    """
+    RLIMIT_CPU (soft, hard) for a run: a backstop a second past the limit
+    (SIGXCPU, then SIGKILL) in case the supervising timer never fires. It
+    counts per process, from the CPU time already spent (`cpu_offset_ms`).
+    """
+    soft = math.ceil(timeout_sec + cpu_offset_ms / 1000) + 1
+    return soft, soft + 1
+
+
+def _kill_group(pid: int) -> None:
+    """SIGKILL the process group led by `pid` (a run started in its own session)."""
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pid, signal.SIGKILL)
+
+
+def effective_limits(language: str, timeout_sec: float, memory_bytes: int) -> Tuple[float, int]:
+    """The (time, memory) limits a run of `language` actually gets on this node."""
+    factor = _SETTINGS["speed_factor"] * _SETTINGS["time_multipliers"].get(language, 1.0)
+    return timeout_sec * factor, memory_bytes + _SETTINGS["memory_overhead_bytes"].get(language, 0)
+
+
+class _RunUsage:
+    """Outcome and resource usage of one finished run."""
+
+    def __init__(self, returncode: int, stdout: bytes, stderr: bytes, cpu_ms: float,
+                 wall_ms: float, peak_bytes: int, timed_out: bool, oom_killed: bool,
+                 diverged: bool = False, stdout_bytes: int = 0, stderr_bytes: int = 0,
+                 output_exceeded: bool = False):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.cpu_ms = cpu_ms
+        self.wall_ms = wall_ms
+        self.peak_bytes = peak_bytes
+        self.timed_out = timed_out
+        self.oom_killed = oom_killed
+        self.diverged = diverged
+        self.stdout_bytes = stdout_bytes  # total written, `stdout` may be cut
+        self.stderr_bytes = stderr_bytes
+        self.output_exceeded = output_exceeded
+
+
+class _RunCgroup:
+    """
+    Per-run cgroup v2 leaf under `_SETTINGS["cgroup_root"]`. Gives exact CPU
+    time and peak memory for the whole process tree (including children that
+    were never waited for) and enforces the memory limit with `memory.max`.
+    The root must be a delegated v2 cgroup with the cpu and memory
+    controllers enabled in its cgroup.subtree_control.
+    """
+
+    _warned = False
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def create(cls, memory_limit: int) -> Optional["_RunCgroup"]:
+        root = _SETTINGS["cgroup_root"]
+        if not root:
+            return None
+        path = os.path.join(root, f"run-{os.getpid()}-{uuid.uuid4().hex[:12]}")
+        try:
+            os.mkdir(path)
+            cgroup = cls(path)
+            cgroup._write("memory.max", str(memory_limit))
+            with contextlib.suppress(OSError):
+                cgroup._write("memory.swap.max", "0")
+            return cgroup
+        except OSError as e:
+            if not cls._warned:
+                logger.warning("cgroup v2 accounting unavailable under %s, using rusage: %s", root, e)
+                cls._warned = True
+            with contextlib.suppress(OSError):
+                os.rmdir(path)
+            return None
+
+    def enter(self) -> None:
+        """Called in the forked child before exec."""
+        self._write("cgroup.procs", "0")
+
+    def attach(self, pid: int) -> None:
+        """Move an already running process (a warm interpreter) in."""
+        self._write("cgroup.procs", str(pid))
+
+    def cpu_ms(self) -> Optional[float]:
+        try:
+            for line in self._read("cpu.stat").splitlines():
+                key, _, value = line.partition(" ")
+                if key == "usage_usec":
+                    return int(value) / 1000
+        except OSError:
+            pass
+        return None
+
+    def peak_bytes(self) -> Optional[int]:
+        try:
+            return int(self._read("memory.peak"))
+        except (OSError, ValueError):
+            return None
+
+    def oom_killed(self) -> bool:
+        try:
+            for line in self._read("memory.events").splitlines():
+                key, _, value = line.partition(" ")
+                if key == "oom_kill":
+                    return int(value) > 0
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def kill(self) -> None:
+        with contextlib.suppress(OSError):
+            self._write("cgroup.kill", "1")
+
+    def remove(self) -> None:
+        # leftover (orphaned) processes keep the cgroup busy
+        self.kill()
+        for _ in range(50):
+            try:
+                os.rmdir(self.path)
+                return
+            except FileNotFoundError:
+                return
+            except OSError:
+                time.sleep(0.01)
+        logger.warning("Could not remove run cgroup %s", self.path)
+
+    def _read(self, name: str) -> str:
+        with open(os.path.join(self.path, name)) as f:
+            return f.read()
+
+    def _write(self, name: str, value: str) -> None:
+        with open(os.path.join(self.path, name), "w") as f:
+            f.write(value)
+
+
+async def _execute(
+    proc: subprocess.Popen,
+    start: float,
+    stdin_data: bytes,
+    timeout_sec: float,
+    cgroup: Optional[_RunCgroup],
+    cpu_offset_ms: float = 0.0,
+    stdin_path: Optional[str] = None,
+    checker=None,
+) -> _RunUsage:
+    """
+    Feed stdin to a started run, collect stdout/stderr and wait for exit
+    without polling: the exit is signalled by a pidfd and the child is reaped
+    with wait4 to get its rusage. While it runs, a deadline timer wakes up
+    when the CPU budget could first have been used up and re-arms for the
+    remaining budget, so a CPU-bound program is killed right at the limit.
+    `cpu_offset_ms` is CPU time spent before the run started (warm
+    interpreters) and is not charged to it.
+
+    With a `checker`, stdout chunks go to it as they arrive instead of being
+    buffered, and the run is killed the moment it rejects the output.
+    """
+    _PROCESSES["started"] += 1
+    _PROCESSES["running"] += 1
+    try:
+        return await _supervise(
+            proc, start, stdin_data, timeout_sec, cgroup, cpu_offset_ms, stdin_path, checker
+        )
+    finally:
+        _PROCESSES["running"] -= 1
+
+
+async def _supervise(
+    proc: subprocess.Popen,
+    start: float,
+    stdin_data: bytes,
+    timeout_sec: float,
+    cgroup: Optional[_RunCgroup],
+    cpu_offset_ms: float,
+    stdin_path: Optional[str],
+    checker,
+) -> _RunUsage:
+    limit_ms = timeout_sec * 1000 + cpu_offset_ms
+    wall_cap = timeout_sec * _SETTINGS["wall_time_factor"] + _SETTINGS["wall_time_extra_sec"]
+
+    exited = _wait_exit(proc.pid)
+    out_chunks: List[bytes] = []
+    err_chunks: List[bytes] = []
+    diverged = False
+
+    def _kill():
+        _PROCESSES["killed"] += 1
+        if cgroup is not None:
+            cgroup.kill()
+        if exited.done():
+            # reaped, and its group already killed: the ids may be reused
+            return
+        # the run leads its own process group: take its children down too
+        _kill_group(proc.pid)
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(proc.pid, signal.SIGKILL)
+
+    output_limit = _SETTINGS["output_limit_bytes"]
+    out_keep, err_keep = _SETTINGS["stdout_keep_bytes"], _SETTINGS["stderr_keep_bytes"]
+    out_total = err_total = 0
+    output_exceeded = False
+
+    def out_sink(chunk: bytes) -> None:
+        nonlocal out_total, diverged, output_exceeded
+        if out_total < out_keep:
+            out_chunks.append(chunk[:out_keep - out_total])
+        out_total += len(chunk)
+        if diverged or output_exceeded:
+            return
+        if output_limit and out_total > output_limit:
+            output_exceeded = True
+            _kill()
+        elif checker is not None and not checker.feed(chunk):
+            diverged = True
+            _kill()
+
+    def err_sink(chunk: bytes) -> None:
+        nonlocal err_total
+        if err_total < err_keep:
+            err_chunks.append(chunk[:err_keep - err_total])
+        err_total += len(chunk)
+
+    io_tasks = [
+        asyncio.create_task(_read_fd(proc.stdout, out_sink)),
+        asyncio.create_task(_read_fd(proc.stderr, err_sink)),
+    ]
+    if proc.stdin is not None:
+        if stdin_path:
+            io_tasks.append(asyncio.create_task(_copy_file_to_fd(stdin_path, proc.stdin)))
+        else:
+            io_tasks.append(asyncio.create_task(_write_fd(proc.stdin, stdin_data)))
+
+    timed_out = False
+    try:
+        if not _has_cpu_clock(proc.pid, cgroup):
+            # no way to read CPU time while running: fall back to wall clock
+            wall_cap = timeout_sec
+        while not exited.done():
+            remaining_wall = wall_cap - (time.perf_counter() - start)
+            cpu_now = _running_cpu_ms(proc.pid, cgroup)
+            if remaining_wall <= 0 or (cpu_now is not None and cpu_now >= limit_ms):
+                timed_out = True
+                _kill()
+                break
+            # CPU time cannot grow faster than wall time for a single thread,
+            # so nothing can happen before the unused budget has elapsed
+            budget = (limit_ms - (cpu_now or 0)) / 1000 if cpu_now is not None else remaining_wall
+            await asyncio.wait({exited}, timeout=max(min(budget, remaining_wall), 0.005))
+        status, rusage = await exited
+    except asyncio.CancelledError:
+        # the caller gave up on this run (e.g. another test already failed);
+        # the pidfd callback still reaps the child
+        _kill()
+        proc.returncode = -signal.SIGKILL  # keep Popen from reaping it as well
+        for task in io_tasks:
+            task.cancel()
+        logger.info("Run cancelled, killed PID %d", proc.pid)
+        raise
+    except ChildProcessError:
+        proc.returncode = -signal.SIGKILL
+        for task in io_tasks:
+            task.cancel()
+        logger.error("Run PID %d was reaped elsewhere, no usage to report", proc.pid)
+        raise
+    wall_ms = (time.perf_counter() - start) * 1000
+    # Popen must not try to reap the pid again
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    # pipes may be held open by orphaned grandchildren; don't wait for them
+    _, pending = await asyncio.wait(io_tasks, timeout=1.0)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*io_tasks, return_exceptions=True)
+
+    cpu_ms = max((rusage.ru_utime + rusage.ru_stime) * 1000 - cpu_offset_ms, 0.0)
+    peak = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    oom_killed = False
+    if cgroup is not None:
+        cpu_ms = cgroup.cpu_ms() or cpu_ms
+        peak = cgroup.peak_bytes() or peak
+        oom_killed = cgroup.oom_killed()
+
+    return _RunUsage(
+        returncode=proc.returncode,
+        stdout=b"".join(out_chunks),
+        stderr=b"".join(err_chunks),
+        cpu_ms=cpu_ms,
+        wall_ms=wall_ms,
+        peak_bytes=peak,
+        timed_out=timed_out and not diverged and not output_exceeded,
+        oom_killed=oom_killed,
+        diverged=diverged,
+        stdout_bytes=out_total,
+        stderr_bytes=err_total,
+        output_exceeded=output_exceeded,
+    )
+
+
+def _wait_exit(pid: int) -> "asyncio.Future":
+    """
+    Future resolving to (wait status, rusage) once `pid` has exited and been
+    reaped; ChildProcessError if something else reaped it first. Whatever
+    the run forked and left behind is killed with its process group just
+    before the reap, while the unreaped leader still pins the group id.
+    """
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        with contextlib.suppress(OSError):
+            pidfd = os.pidfd_open(pid)
+
+    if pidfd is None:
+        # no pidfd (non-Linux or old kernel): block in a thread instead
+        def _reap():
+            if hasattr(os, "waitid"):
+                os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+                _kill_group(pid)
+            _, status, rusage = os.wait4(pid, 0)
+            return status, rusage
+        return asyncio.ensure_future(asyncio.to_thread(_reap))
+
+    def _on_exit():
+        loop.remove_reader(pidfd)
+        os.close(pidfd)
+        _kill_group(pid)
+        try:
+            _, status, rusage = os.wait4(pid, 0)
+        except ChildProcessError as error:
+            # reaped elsewhere: its status and rusage are gone, so there is
+            # nothing to judge the run by
+            if not fut.done():
+                fut.set_exception(error)
+            return
+        if not fut.done():
+            fut.set_result((status, rusage))
+
+    loop.add_reader(pidfd, _on_exit)
+    return fut
+
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _running_cpu_ms(pid: int, cgroup: Optional[_RunCgroup]) -> Optional[float]:
+    """CPU time used so far by the run, or None if it cannot be read."""
+    if cgroup is not None:
+        return cgroup.cpu_ms()
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # fields after the parenthesised command name; utime, stime, cutime, cstime
+    fields = stat.rsplit(")", 1)[1].split()
+    ticks = sum(int(v) for v in fields[11:15])
+    return ticks * 1000 / _CLK_TCK
+
+
+def _has_cpu_clock(pid: int, cgroup: Optional[_RunCgroup]) -> bool:
+    return cgroup is not None or os.path.exists(f"/proc/{pid}/stat")
+
+
+async def _wait_fd(fd: int, readable: bool) -> None:
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def _ready():
+        if not fut.done():
+            fut.set_result(None)
+
+    if readable:
+        loop.add_reader(fd, _ready)
+    else:
+        loop.add_writer(fd, _ready)
+    try:
+        await fut
+    finally:
+        if readable:
+            loop.remove_reader(fd)
+        else:
+            loop.remove_writer(fd)
+
+
+async def _read_fd(pipe, sink) -> None:
+    """Read a pipe to EOF without blocking the loop, passing chunks to `sink`."""
+    fd = pipe.fileno()
+    os.set_blocking(fd, False)
+    try:
+        while True:
+            try:
+                chunk = os.read(fd, 65536)
+            except BlockingIOError:
+                await _wait_fd(fd, readable=True)
+                continue
+            if not chunk:
+                return
+            sink(chunk)
+    finally:
+        pipe.close()
+
+
+async def _copy_file_to_fd(path: str, pipe) -> None:
+    """Stream a file into a pipe chunk by chunk."""
+    try:
+        with open(path, "rb") as src:
+            while True:
+                chunk = src.read(65536)
+                if not chunk:
+                    break
+                if not await _write_fd(pipe, chunk, close=False):
+                    break
+    finally:
+        pipe.close()
+
+
+async def _write_fd(pipe, data: bytes, close: bool = True) -> bool:
+    """
+    Write `data` to a pipe (and close it); a child that stops reading is
+    fine. Returns False once the reader has gone away.
+    """
+    fd = pipe.fileno()
+    os.set_blocking(fd, False)
+    view = memoryview(data)
+    try:
+        while view:
+            try:
+                view = view[os.write(fd, view):]
+            except BlockingIOError:
+                await _wait_fd(fd, readable=False)
+    except (BrokenPipeError, ConnectionResetError):
+        return False
     finally:
-        shutil.rmtree(workdir, ignore_errors=True)
-        logger.debug("Cleaned up workspace directory: %s", workdir)
+        if close:
+            pipe.close()
+    return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+import shutil
+import sys
+import pytest
+
+from judge_service import benchmark, job_processor
+from judge_service.benchmark import build_corpus, percentile, summarize
+
+has_python = shutil.which("python3") is not None
+is_linux   = sys.platform.startswith("linux")
+
+
+def test_percentile_interpolates():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([], 95) == 0.0
+    assert summarize([3.0, 1.0, 2.0])["p50"] == 2.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (has_python and is_linux), reason="python3 on Linux required")
+async def test_pipeline_reports_every_stage():
+    scenarios = build_corpus(["python"], ["tiny"])
+    report = await benchmark.bench_pipeline(scenarios, jobs=3, concurrency=2)
+
+    assert report["jobs"] == 3 and report["errors"] == 0
+    assert report["scenarios"]["python/tiny"]["statuses"] == {"success": 3}
+    latency = report["latency_ms"]
+    for stage in ("queue_wait", "fetch", "compile", "run", "compare", "persist", "total"):
+        assert latency[stage]["count"] == 3
+    assert latency["total"]["p50"] >= latency["run"]["p50"]
+    assert not job_processor.STAGE_OBSERVERS
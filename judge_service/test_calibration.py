@@ -0,0 +1,27 @@
+import shutil
+import sys
+import pytest
+
+from judge_service.calibration import MAX_SPEED_FACTOR, Benchmark, measure_speed_factor
+
+has_python = shutil.which("python3") is not None
+is_linux   = sys.platform.startswith("linux")
+
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(not (has_python and is_linux), reason="needs python3 on Linux"),
+]
+
+BUSY = "n = 0\nfor i in range(200_000):\n    n += i\nprint(n)"
+
+
+async def test_speed_factor_is_the_ratio_to_the_reference():
+    bench = Benchmark("busy", "python", BUSY, reference_ms=1.0)
+    # any real run takes far longer than 1ms: clamped to the upper bound
+    assert await measure_speed_factor([bench], runs=1) == MAX_SPEED_FACTOR
+
+
+async def test_no_runnable_benchmark_gives_none():
+    broken = Benchmark("broken", "python", "raise SystemExit(3)", reference_ms=100.0)
+    missing = Benchmark("missing", "cobol", "", reference_ms=100.0)
+    assert await measure_speed_factor([broken, missing], runs=1) is None
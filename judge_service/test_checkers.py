@@ -0,0 +1,126 @@
+import io
+import shutil
+import sys
+import pytest
+
+from judge_service import checkers
+from judge_service.checkers import ExactChecker, FloatChecker, TokenChecker, builtin_checker
+from judge_service.sandbox import compile_submission, run_compiled
+
+has_python = shutil.which("python3") is not None
+is_linux   = sys.platform.startswith("linux")
+
+
+def _check(expected: bytes, output: bytes, chunk: int = 2, make=ExactChecker):
+    checker = make(io.BytesIO(expected))
+    for i in range(0, len(output), chunk):
+        if not checker.feed(output[i:i + chunk]):
+            return checker
+    checker.finish()
+    return checker
+
+
+@pytest.mark.parametrize("expected, output, accepted", [
+    (b"1 2\n3\n", b"1 2\n3\n", True),
+    (b"1 2\n3\n", b"\n 1 2\n3", True),          # leading/trailing whitespace ignored
+    (b"1 2\n3", b"1 2\n3\n\n  \n", True),
+    (b"1 2\n3\n", b"1  2\n3\n", False),         # inner whitespace is significant
+    (b"1 2\n3\n", b"1 2\n", False),
+    (b"1 2\n", b"1 2\n3\n", False),
+    (b"", b"  \n", True),
+    (b"", b"x", False),
+])
+def test_matches_strip_equality(monkeypatch, expected, output, accepted):
+    monkeypatch.setattr(checkers, "CHUNK_SIZE", 3)
+    assert _check(expected, output).passed is accepted
+    assert (output.strip() == expected.strip()) is accepted
+
+
+def test_reports_first_difference():
+    checker = _check(b"10\n20\n30\n", b"10\n20\n31\n")
+    assert not checker.passed
+    assert (checker.diff_line, checker.diff_column) == (3, 2)
+
+
+def test_rejects_at_first_wrong_byte():
+    checker = ExactChecker(b"aaaa")
+    assert checker.feed(b"aa")
+    assert not checker.feed(b"b")
+    assert not checker.feed(b"aaaa")
+
+
+@pytest.mark.parametrize("expected, output, accepted", [
+    (b"1 2\n3\n", b"1   2 3", True),             # spacing and line breaks ignored
+    (b"12 3", b"1 23", False),
+    (b"abc def", b"abc", False),
+    (b"abc", b"abc def", False),
+    (b"", b" \n ", True),
+])
+def test_tokens_match_split_equality(monkeypatch, expected, output, accepted):
+    monkeypatch.setattr(checkers, "CHUNK_SIZE", 3)
+    assert _check(expected, output, make=TokenChecker).passed is accepted
+    assert (output.split() == expected.split()) is accepted
+
+
+def test_tokens_report_wrong_token():
+    checker = _check(b"1 2\n3 4\n", b"1 2\n3 5\n", make=TokenChecker)
+    assert (checker.diff_line, checker.diff_column) == (2, 3)
+    assert checker.message == "expected b'4', got b'5'"
+
+
+@pytest.mark.parametrize("output, accepted", [
+    (b"0.3333333 yes", True),
+    (b"0.33333 yes", False),
+    (b"3.333333e-1 yes", True),
+    (b"0.3333333 YES", False),                  # words still compare exactly
+    (b"nan yes", False),
+])
+def test_float_tolerance(output, accepted):
+    checker = _check(b"0.33333333 yes", output, make=FloatChecker)
+    assert checker.passed is accepted
+
+
+def test_builtin_checker_from_problem_config():
+    assert isinstance(builtin_checker(None, b""), ExactChecker)
+    checker = builtin_checker({"type": "float", "absTolerance": 0.5, "relTolerance": 0}, b"")
+    assert (checker.abs_tol, checker.rel_tol) == (0.5, 0.0)
+    with pytest.raises(ValueError):
+        builtin_checker({"type": "custom"}, b"")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (has_python and is_linux), reason="python3 on Linux required")
+async def test_sandbox_kills_run_on_divergence():
+    code = "import sys\nprint('wrong', flush=True)\nwhile True: pass"
+    artifact = await compile_submission("python", code)
+    try:
+        res = await run_compiled(
+            artifact, "", timeout_sec=5, memory_bytes=256 * 1024 * 1024,
+            checker=ExactChecker(b"right\n"),
+        )
+    finally:
+        artifact.cleanup()
+    assert res["verdict"] == "WrongAnswer"
+    assert (res["first_diff_line"], res["first_diff_column"]) == (1, 1)
+    assert res["wall_time_ms"] < 5000
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (has_python and is_linux), reason="python3 on Linux required")
+async def test_sandbox_streams_input_file_and_expected_file(tmp_path):
+    numbers = range(200_000)
+    (tmp_path / "in.txt").write_text("\n".join(map(str, numbers)) + "\n")
+    (tmp_path / "out.txt").write_text("\n".join(str(n * 2) for n in numbers) + "\n")
+    code = "import sys\nsys.stdout.writelines(f'{int(l) * 2}\\n' for l in sys.stdin)"
+    artifact = await compile_submission("python", code)
+    try:
+        with open(tmp_path / "out.txt", "rb") as expected:
+            res = await run_compiled(
+                artifact, timeout_sec=5, memory_bytes=256 * 1024 * 1024,
+                stdin_path=str(tmp_path / "in.txt"), checker=ExactChecker(expected),
+            )
+    finally:
+        artifact.cleanup()
+    assert res["verdict"] == "OK"
+    # only a preview of the output is kept in memory
+    assert len(res["stdout"]) <= 64 * 1024
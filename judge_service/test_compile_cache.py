@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import pytest
+
+from judge_service.compile_cache import CompileCache
+from judge_service.sandbox import compile_submission, run_compiled
+
+has_gpp  = shutil.which("g++") is not None
+is_linux = sys.platform.startswith("linux")
+
+
+@pytest.mark.asyncio
+async def test_store_and_restore_success(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    work = tmp_path / "w1"
+    work.mkdir()
+    (work / "Main.cpp").write_text("src")
+    (work / "Main").write_bytes(b"\x7fELF binary")
+
+    cmd = ["true", "Main.cpp"]
+    assert await cache.restore("cpp", cmd, "src", str(work)) is None
+    await cache.store("cpp", cmd, "src", str(work), ok=True, exclude=["Main.cpp"])
+
+    fresh = tmp_path / "w2"
+    fresh.mkdir()
+    entry = await cache.restore("cpp", cmd, "src", str(fresh))
+    assert entry is not None and entry.ok
+    assert (fresh / "Main").read_bytes() == b"\x7fELF binary"
+    assert not (fresh / "Main.cpp").exists()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_compile_failure_is_remembered(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    work = tmp_path / "w"
+    work.mkdir()
+    cmd = ["true"]
+    await cache.store("cpp", cmd, "bad", str(work), ok=False, compiler_msg="error: nope")
+    entry = await cache.restore("cpp", cmd, "bad", str(work))
+    assert entry == (False, "error: nope")
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_respects_byte_budget(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"), max_bytes=250)
+    cmd = ["true"]
+    for i in range(3):
+        work = tmp_path / f"w{i}"
+        work.mkdir()
+        (work / "Main").write_bytes(b"x" * 100)
+        await cache.store("cpp", cmd, f"src{i}", str(work), ok=True)
+        # make LRU order deterministic regardless of filesystem timestamp granularity
+        key = await cache.key("cpp", cmd, f"src{i}")
+        meta = os.path.join(cache.root, "entries", key, "meta.json")
+        os.utime(meta, (1000 + i, 1000 + i))
+
+    assert cache.stats()["bytes"] <= 250
+    assert cache.stats()["evictions"] == 1
+    assert await cache.restore("cpp", cmd, "src0", str(tmp_path)) is None
+    assert await cache.restore("cpp", cmd, "src2", str(tmp_path)) is not None
+
+
+@pytest.mark.asyncio
+async def test_size_is_tracked_without_rescanning(tmp_path, monkeypatch):
+    root = str(tmp_path / "cache")
+    cmd = ["true"]
+    work = tmp_path / "w"
+    work.mkdir()
+    (work / "Main").write_bytes(b"x" * 100)
+    other = CompileCache(root, max_bytes=1024 * 1024)
+    await other.store("cpp", cmd, "old", str(work), ok=True)
+
+    cache = CompileCache(root, max_bytes=1024 * 1024)  # indexes what is on disk
+    await other.store("cpp", cmd, "new", str(work), ok=True)
+
+    def no_scan():
+        raise AssertionError("meta files rescanned under budget")
+    monkeypatch.setattr(cache, "_scan", no_scan)
+    assert cache.stats()["bytes"] == 100
+    await cache.store("cpp", cmd, "mine", str(work), ok=True)
+    assert cache.stats()["bytes"] == 200
+    # an entry another worker stored is counted once this one hits it
+    assert await cache.restore("cpp", cmd, "new", str(tmp_path)) is not None
+    assert cache.stats()["bytes"] == 300
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (has_gpp and is_linux), reason="g++ on Linux required")
+async def test_sandbox_uses_cache(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"), max_bytes=64 * 1024 * 1024)
+    code = '#include <iostream>\nint main(){ std::cout << 7; }'
+    for _ in range(2):
+        artifact = await compile_submission("cpp", code, cache=cache)
+        try:
+            res = await run_compiled(artifact, "", timeout_sec=2, memory_bytes=256 * 1024 * 1024)
+            assert res["stdout"] == "7"
+        finally:
+            artifact.cleanup()
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
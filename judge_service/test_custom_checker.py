@@ -0,0 +1,98 @@
+import shutil
+import sys
+import pytest
+
+from judge_service.custom_checker import CheckerFailure, CheckerPrograms, CustomChecker, spool
+from judge_service.sandbox import compile_submission, run_compiled
+
+has_python = shutil.which("python3") is not None
+is_linux   = sys.platform.startswith("linux")
+
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(not (has_python and is_linux), reason="python3 on Linux required"),
+]
+
+# accepts any pair of numbers summing to the input value
+CHECKER = {
+    "type": "custom",
+    "language": "python",
+    "sourceCode": (
+        "import sys\n"
+        "n = int(open(sys.argv[1]).read())\n"
+        "a, b = map(int, open(sys.argv[3]).read().split())\n"
+        "if a + b != n:\n"
+        "    print(f'{a} + {b} != {n}', file=sys.stderr)\n"
+        "    sys.exit(1)\n"
+    ),
+}
+
+
+async def _judge(programs, code, output_input="10"):
+    artifact = await compile_submission("python", code)
+    checker_program = await programs.get("p1", CHECKER)
+    input_path, expected_path = spool(output_input, "in_"), spool("", "out_")
+    checker = CustomChecker(checker_program, input_path, expected_path, 5, 256 * 1024 * 1024)
+    try:
+        return await run_compiled(
+            artifact, output_input, timeout_sec=5, memory_bytes=256 * 1024 * 1024,
+            checker=checker,
+        )
+    finally:
+        checker.close()
+        artifact.cleanup()
+
+
+async def test_custom_checker_accepts_and_rejects():
+    programs = CheckerPrograms()
+    try:
+        ok = await _judge(programs, "print(3, 7)")
+        wrong = await _judge(programs, "print(3, 8)")
+    finally:
+        programs.close()
+    assert ok["verdict"] == "OK"
+    assert wrong["verdict"] == "WrongAnswer"
+    assert wrong["checker_message"] == "3 + 8 != 10"
+
+
+async def test_checker_program_compiled_once_per_problem():
+    programs = CheckerPrograms()
+    try:
+        first = await programs.get("p1", CHECKER)
+        assert await programs.get("p1", CHECKER) is first
+        assert await programs.get("p2", CHECKER) is not first
+    finally:
+        programs.close()
+
+
+async def test_crashing_checker_is_a_checker_failure():
+    programs = CheckerPrograms()
+    try:
+        broken = await programs.get("p1", {**CHECKER, "sourceCode": "raise SystemExit(3)"})
+        checker = CustomChecker(broken, spool("", "in_"), spool("", "out_"), 5, 256 * 1024 * 1024)
+        checker.feed(b"1 2")
+        with pytest.raises(CheckerFailure):
+            await checker.finish()
+        checker.close()
+    finally:
+        programs.close()
+
+
+async def test_checker_evicted_while_in_use_survives_until_released():
+    programs = CheckerPrograms(max_entries=1)
+    try:
+        held = await programs.get("p1", CHECKER)
+        other = await programs.get("p2", {**CHECKER, "sourceCode": CHECKER["sourceCode"] + "\n"})
+        assert held.workdir is not None  # evicted, but a job still runs it
+
+        checker = CustomChecker(held, spool("10", "in_"), spool("", "out_"), 5, 256 * 1024 * 1024)
+        checker.feed(b"3 7")
+        assert await checker.finish()
+        checker.close()
+
+        programs.release(held)
+        assert held.workdir is None
+        programs.release(other)
+        assert other.workdir is not None  # still cached
+    finally:
+        programs.close()
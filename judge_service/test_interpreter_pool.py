@@ -0,0 +1,106 @@
+import asyncio
+import shutil
+import sys
+import threading
+import pytest
+
+from judge_service.interpreter_pool import InterpreterPool
+from judge_service.sandbox import compile_submission, run_compiled
+
+has_node = shutil.which("node") is not None
+is_linux = sys.platform.startswith("linux")
+
+pytestmark = pytest.mark.skipif(not is_linux, reason="warm pool needs prlimit/pidfd (Linux)")
+
+
+async def _run_warm(pool, language, code, stdin="", memory_bytes=256 * 1024 * 1024):
+    artifact = await compile_submission(language, code)
+    try:
+        return await run_compiled(artifact, stdin, timeout_sec=2, memory_bytes=memory_bytes, pool=pool)
+    finally:
+        artifact.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_python_runs_in_warm_interpreter():
+    pool = InterpreterPool(1, languages=("python",))
+    pool.start()
+    try:
+        await asyncio.sleep(0.3)
+        code = "import sys\nif __name__ == '__main__':\n    print(sum(map(int, sys.stdin.read().split())))"
+        res = await _run_warm(pool, "python", code, "3 4")
+        assert res["verdict"] == "OK"
+        assert res["stdout"] == "7"
+        assert res["startup_saved_ms"] > 0
+
+        res = await _run_warm(pool, "python", "raise ValueError('boom')")
+        assert res["verdict"] == "RuntimeError"
+        assert "ValueError" in res["stderr"]
+
+        assert pool.stats()["hits"] == 2
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_limits_are_applied_after_hand_out():
+    pool = InterpreterPool(1, languages=("python",))
+    pool.start()
+    try:
+        res = await _run_warm(pool, "python", "x = bytearray(64 * 1024 * 1024)", memory_bytes=2 * 1024 * 1024)
+        assert res["verdict"] == "MemoryLimitExceeded"
+        # the next interpreter is unaffected by the previous run's limit
+        res = await _run_warm(pool, "python", "x = bytearray(64 * 1024 * 1024)\nprint(len(x))")
+        assert res["verdict"] == "OK"
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not has_node, reason="node not on PATH")
+async def test_javascript_runs_in_warm_interpreter():
+    pool = InterpreterPool(1, languages=("javascript",))
+    pool.start()
+    try:
+        code = "const d = require('fs').readFileSync(0, 'utf8').split(' ').map(Number); console.log(d[0] * d[1]);"
+        res = await _run_warm(pool, "javascript", code, "6 7", memory_bytes=1024 * 1024 * 1024)
+        assert res["verdict"] == "OK"
+        assert res["stdout"] == "42"
+        assert pool.stats()["hits"] == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_empty_pool_falls_back_to_cold_start():
+    pool = InterpreterPool(0, languages=("python",))
+    res = await _run_warm(pool, "python", "print('cold')")
+    assert res["verdict"] == "OK" and res["stdout"] == "cold"
+    assert res["startup_saved_ms"] == 0.0
+    assert pool.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_discard_reaps_off_the_event_loop():
+    pool = InterpreterPool(1, languages=("python",))
+    pool.start()
+    warm = pool.acquire("python")
+    reaped_in = []
+    wait = warm.proc.wait
+
+    def recording_wait(timeout=None):
+        reaped_in.append(threading.get_ident())
+        return wait(timeout)
+
+    warm.proc.wait = recording_wait
+    warm.proc.poll = lambda: None  # still running when discarded
+    try:
+        warm.discard()
+        for _ in range(100):
+            if warm.proc.returncode is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert warm.proc.returncode is not None
+        assert reaped_in and threading.get_ident() not in reaped_in
+    finally:
+        await pool.close()
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import pytest
+
+import judge_service.job_processor as jp
+
+
+@pytest.fixture(autouse=True)
+def _no_event_log(monkeypatch):
+    # most tests look at the channel only; the event log has a test of its own
+    monkeypatch.setattr(jp.config, "EVENT_LOG_TTL_SEC", 0)
+
+
+def _fake_runner(durations, failing, started, cancelled):
+    async def fake_run_test_case(artifact, tc, idx, total, submission, submission_id):
+        started.append(idx)
+        try:
+            await asyncio.sleep(durations.get(idx, 0.01))
+        except asyncio.CancelledError:
+            cancelled.append(idx)
+            raise
+        passed = idx not in failing
+        return {"idx": idx, "passed": passed}, passed
+    return fake_run_test_case
+
+
+@pytest.mark.asyncio
+async def test_parallel_reports_lowest_failing_test(monkeypatch):
+    started, cancelled = [], []
+    # test 5 fails first in wall time, test 3 fails later but must win
+    durations = {3: 0.2, 5: 0.01}
+    monkeypatch.setattr(
+        jp, "_run_test_case", _fake_runner(durations, {3, 5}, started, cancelled)
+    )
+    testcases = [{"caseId": str(i)} for i in range(1, 9)]
+
+    details, all_passed = await jp._run_tests_parallel(None, testcases, None, "sub", 4)
+
+    assert not all_passed
+    assert [d["idx"] for d in details] == [1, 2, 3]
+    assert details[-1]["passed"] is False
+    assert 3 not in cancelled
+
+
+@pytest.mark.asyncio
+async def test_parallel_all_passed_keeps_order(monkeypatch):
+    started, cancelled = [], []
+    durations = {1: 0.05, 2: 0.01}
+    monkeypatch.setattr(
+        jp, "_run_test_case", _fake_runner(durations, set(), started, cancelled)
+    )
+    testcases = [{"caseId": str(i)} for i in range(1, 6)]
+
+    details, all_passed = await jp._run_tests_parallel(None, testcases, None, "sub", 2)
+
+    assert all_passed
+    assert [d["idx"] for d in details] == [1, 2, 3, 4, 5]
+    assert started == [1, 2, 3, 4, 5]
+    assert cancelled == []
+
+
+class _UpdateResult:
+    def __init__(self, matched):
+        self.matched_count = matched
+
+
+class FakeSubmissions:
+    """Just enough of a Motor collection for judge_job's conditional updates."""
+
+    def __init__(self, status, followers=()):
+        self.doc = {"status": status}
+        self.updates = []
+        # identical submissions coalesced onto this one, by id
+        self.followers = {fid: {"status": "pending"} for fid in followers}
+
+    async def find(self, query, projection=None):
+        for fid, doc in self.followers.items():
+            if doc["status"] == query["status"]:
+                yield {"_id": fid}
+
+    async def update_one(self, query, update):
+        if query.get("_id") in self.followers:
+            doc = self.followers[query["_id"]]
+            ok = doc["status"] == query["status"]
+            if ok:
+                doc.update(update["$set"])
+            return _UpdateResult(int(ok))
+        self.updates.append((query, update))
+        wanted = query["status"]
+        ok = self.doc["status"] in (wanted["$in"] if isinstance(wanted, dict) else [wanted])
+        if ok:
+            self.doc.update(update["$set"])
+        return _UpdateResult(int(ok))
+
+    async def find_one(self, query, projection=None):
+        raise AssertionError("limits come from the job payload")
+
+
+class FakeEngine:
+    def __init__(self, submissions):
+        self.submissions = submissions
+
+    def get_collection(self, model):
+        return self.submissions
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def xadd(self, *args, **kwargs):
+        self.calls.append(self.redis.xadd(*args, **kwargs))
+
+    def expire(self, *args, **kwargs):
+        self.calls.append(self.redis.expire(*args, **kwargs))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [await call for call in self.calls]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+        self.streams = {}
+        self.ttls = {}
+        self.round_trips = 0  # pipelines and publishes
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def publish(self, channel, message):
+        self.round_trips += 1
+        self.published.append(message)
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        entries = self.streams.setdefault(key, [])
+        entries.append((f"{len(entries) + 1}-0".encode(), fields))
+        return entries[-1][0]
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    async def lpush(self, key, value):
+        self.streams.setdefault(key, []).insert(0, value)
+
+
+def _job():
+    return {
+        "submissionId": "65f000000000000000000001", "problemId": "p",
+        "language": "python", "sourceCode": "print(input())",
+        "timeLimitMs": 1000, "memoryLimitB": 256 * 1024 * 1024,
+    }
+
+
+@pytest.mark.asyncio
+async def test_judge_job_writes_two_small_updates(monkeypatch):
+    async def fake_fetch(client, problem_id, **kwargs):
+        return [{"caseId": "65f0000000000000000000aa", "input": "hi", "expectedOutput": "hi"}]
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+    submissions = FakeSubmissions("pending")
+    redis = FakeRedis()
+
+    await jp.judge_job(_job(), FakeEngine(submissions), redis, None)
+
+    assert len(submissions.updates) == 2
+    (q1, u1), (q2, u2) = submissions.updates
+    assert q1["status"] == {"$in": ["pending", "running"]} and u1["$set"]["status"] == "running"
+    assert q2["status"] == "running" and u2["$set"]["status"] == "success"
+    assert "sourceCode" not in u2["$set"]
+    assert u2["$set"]["result"]["passed_tests"] == 1
+    statuses = [m for m in map(json.loads, redis.published) if "status" in m]
+    assert statuses == [{"status": "running"}, {"status": "success"}]
+    events = [m for m in map(json.loads, redis.published) if "event" in m]
+    assert [(e["event"], e.get("phase")) for e in events] == [
+        ("compile", "started"), ("compile", "finished"), ("tests", None),
+    ]
+    assert events[-1]["tests"][0]["index"] == 1 and events[-1]["tests"][0]["verdict"] == "OK"
+    # progress is flushed before the terminal status
+    assert json.loads(redis.published[-1]) == {"status": "success"}
+
+
+@pytest.mark.asyncio
+async def test_events_are_logged_before_they_are_published(monkeypatch):
+    monkeypatch.setattr(jp.config, "EVENT_LOG_TTL_SEC", 60)
+    async def fake_fetch(client, problem_id, **kwargs):
+        return [{"caseId": "65f0000000000000000000aa", "input": "hi", "expectedOutput": "hi"}]
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+    redis = FakeRedis()
+
+    await jp.judge_job(_job(), FakeEngine(FakeSubmissions("pending")), redis, None)
+
+    key = jp.config.EVENT_LOG_KEY_PREFIX + _job()["submissionId"]
+    assert list(redis.streams) == [key] and redis.ttls == {key: 60}
+    published = [json.loads(m) for m in redis.published]
+    logged = [(entry_id.decode(), json.loads(fields["data"])) for entry_id, fields in redis.streams[key]]
+    # every message is logged, and published with the id of its entry
+    assert [(m.pop("eventId"), m) for m in published] == logged
+    assert logged[0][1] == {"status": "running"} and logged[-1][1] == {"status": "success"}
+    # the append and its TTL share one round trip, PUBLISH takes the other
+    assert redis.round_trips == 2 * len(published)
+
+
+@pytest.mark.asyncio
+async def test_judge_job_skips_finished_submission(monkeypatch):
+    async def fake_fetch(client, problem_id, **kwargs):
+        raise AssertionError("must not judge again")
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+    submissions = FakeSubmissions("success")
+    redis = FakeRedis()
+
+    await jp.judge_job(_job(), FakeEngine(submissions), redis, None)
+
+    assert submissions.doc["status"] == "success"
+    assert redis.published == []
+
+
+@pytest.mark.asyncio
+async def test_judge_job_skips_submission_deleted_before_its_limits_are_read(monkeypatch):
+    async def fake_fetch(client, problem_id, **kwargs):
+        raise AssertionError("a deleted submission must not be judged")
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+
+    class DeletedSubmissions(FakeSubmissions):
+        async def find_one(self, query, projection=None):
+            return None
+
+    submissions = DeletedSubmissions("pending")
+    redis = FakeRedis()
+    job = {k: v for k, v in _job().items() if k not in ("timeLimitMs", "memoryLimitB")}
+
+    await jp.judge_job(job, FakeEngine(submissions), redis, None)
+
+    assert redis.published == []
+    assert len(submissions.updates) == 1  # only the running mark
+
+
+@pytest.mark.asyncio
+async def test_run_mode_executes_stdin_and_samples_without_fetching(monkeypatch):
+    async def fake_fetch(client, problem_id, **kwargs):
+        raise AssertionError("a run must not fetch the problem's test cases")
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+    submissions = FakeSubmissions("pending")
+    job = {
+        **_job(), "mode": "run", "stdin": "custom",
+        "sampleTestCases": [{"input": "a", "expectedOutput": "b"}, {"input": "c", "expectedOutput": "c"}],
+    }
+
+    await jp.judge_job(job, FakeEngine(submissions), FakeRedis(), None)
+
+    tests = submissions.doc["result"]["test_details"]
+    assert [t["test_case_id"] for t in tests] == ["stdin", "sample-1", "sample-2"]
+    assert tests[0]["stdout"].strip() == "custom" and tests[0]["status"] == "passed"
+    # a failing sample does not stop the run
+    assert [t["status"] for t in tests[1:]] == ["failed", "passed"]
+
+
+@pytest.mark.asyncio
+async def test_submissions_store_an_output_preview(monkeypatch):
+    monkeypatch.setattr(jp.config, "OUTPUT_PREVIEW_BYTES", 16)
+    async def fake_fetch(client, problem_id, **kwargs):
+        return [
+            {"caseId": "65f0000000000000000000aa", "input": "out", "expectedOutput": "y" * 1000},
+            {"caseId": "65f0000000000000000000ab", "input": "err", "expectedOutput": ""},
+        ]
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+    submissions = FakeSubmissions("pending")
+    source = "import sys\nif input() == 'out':\n    print('y' * 1000)\nelse:\n    sys.exit('e' * 499)"
+
+    await jp.judge_job({**_job(), "sourceCode": source}, FakeEngine(submissions), FakeRedis(), None)
+
+    out, err = submissions.doc["result"]["test_details"]
+    assert out["verdict"] == "OK"
+    assert out["stdout"] == "y" * 16 and out["stdout_bytes"] == 1001
+    assert err["verdict"] == "RuntimeError"
+    assert err["error_message"] == "e" * 16 and err["stderr_bytes"] == 500
+
+
+@pytest.mark.asyncio
+async def test_fingerprinted_job_shares_its_result(monkeypatch):
+    async def fake_fetch(client, problem_id, **kwargs):
+        return [{"caseId": "65f0000000000000000000aa", "input": "hi", "expectedOutput": "hi"}]
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+    submissions = FakeSubmissions("pending", followers=["f1", "f2"])
+    redis = FakeRedis()
+
+    await jp.judge_job({**_job(), "fingerprint": "abc"}, FakeEngine(submissions), redis, None)
+
+    assert submissions.doc["resultReusable"] is True
+    for follower in submissions.followers.values():
+        assert follower["status"] == "success"
+        assert follower["result"]["passed_tests"] == 1
+    assert redis.published[-2:] == ['{"status": "success"}', '{"status": "success"}']
+
+
+@pytest.mark.asyncio
+async def test_followers_are_requeued_when_the_leader_has_no_reusable_result(monkeypatch):
+    async def failing_fetch(client, problem_id, **kwargs):
+        raise RuntimeError("testcase service down")
+    monkeypatch.setattr(jp, "fetch_testcases", failing_fetch)
+    monkeypatch.setattr(jp.config, "QUEUE_BACKEND", "list")
+    submissions = FakeSubmissions("pending", followers=["65f0000000000000000000f1"])
+    redis = FakeRedis()
+
+    await jp.judge_job({**_job(), "fingerprint": "abc"}, FakeEngine(submissions), redis, None)
+
+    # a transient failure is not copied; the follower is judged on its own
+    assert submissions.doc["status"] == "failed"
+    follower, = submissions.followers.values()
+    assert follower["status"] == "pending" and follower["reusedFrom"] is None
+    job, = [json.loads(raw) for raw in redis.streams[jp.config.QUEUE_KEY]]
+    assert job["submissionId"] == "65f0000000000000000000f1" and job["fingerprint"] == "abc"
+
+
+@pytest.mark.asyncio
+async def test_followers_are_requeued_when_the_leader_crashes(monkeypatch):
+    async def fake_fetch(client, problem_id, **kwargs):
+        return [{"caseId": "65f0000000000000000000aa", "input": "hi", "expectedOutput": "hi"}]
+    async def broken_compile(*args, **kwargs):
+        raise OSError("no space left on device")
+    monkeypatch.setattr(jp, "fetch_testcases", fake_fetch)
+    monkeypatch.setattr(jp, "compile_submission", broken_compile)
+    monkeypatch.setattr(jp.config, "QUEUE_BACKEND", "list")
+    submissions = FakeSubmissions("pending", followers=["65f0000000000000000000f1"])
+    redis = FakeRedis()
+
+    with pytest.raises(OSError):
+        await jp.judge_job({**_job(), "fingerprint": "abc"}, FakeEngine(submissions), redis, None)
+
+    follower, = submissions.followers.values()
+    assert follower["status"] == "pending" and follower["reusedFrom"] is None
+    assert len(redis.streams[jp.config.QUEUE_KEY]) == 1
+
+
+def test_timing_and_judge_errors_are_not_reused():
+    def detail(verdict):
+        return jp.TestDetail(
+            test_case_id="1", verdict=verdict, status="failed", stdout="", runtime_ms=0.0, memory_bytes=0
+        )
+    assert jp._result_reusable("failed", [detail("OK"), detail("WrongAnswer")])
+    assert jp._result_reusable("compile_error", [detail("CompilationError")])
+    assert not jp._result_reusable("failed", [detail("TimeLimitExceeded")])
+    assert not jp._result_reusable("failed", [detail("CheckerError")])
+    assert not jp._result_reusable("timeout", [])
+
+
+@pytest.mark.asyncio
+async def test_abandoned_job_fails_its_submission(monkeypatch):
+    monkeypatch.setattr(jp.config, "QUEUE_BACKEND", "list")
+    submissions = FakeSubmissions("running", followers=["65f0000000000000000000f1"])
+    redis = FakeRedis()
+
+    await jp.fail_abandoned_job(FakeEngine(submissions), redis, {**_job(), "fingerprint": "abc"}, 4)
+
+    assert submissions.doc["status"] == "failed"
+    assert submissions.doc["result"]["test_details"][0]["error_message"] == (
+        "Judging was abandoned after 4 attempts"
+    )
+    assert redis.published == ['{"status": "failed"}']
+    follower, = submissions.followers.values()
+    assert follower["status"] == "pending" and follower["reusedFrom"] is None
+
+    # a job that finished after all is left alone
+    redis = FakeRedis()
+    await jp.fail_abandoned_job(FakeEngine(FakeSubmissions("success")), redis, _job(), 4)
+    assert redis.published == []
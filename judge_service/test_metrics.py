@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+
+from judge_service import metrics
+from judge_service.metrics import Counter, Gauge, Histogram, JudgeMetrics, Registry
+
+
+@pytest.mark.asyncio
+async def test_text_format():
+    registry = Registry()
+    jobs = registry.register(Counter("jobs", "Jobs", ["status"]))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    registry.register(Gauge("depth", "Depth", callback=lambda: {(): 3}))
+    jobs.inc(status="success")
+    jobs.inc(2, status="success")
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = await registry.render()
+
+    assert "# TYPE jobs counter\njobs_total{status=\"success\"} 3\n" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1\n' in text
+    assert 'latency_seconds_bucket{le="1"} 2\n' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3\n' in text
+    assert "latency_seconds_count 3\nlatency_seconds_sum 5.55\n" in text
+    assert "# TYPE depth gauge\ndepth 3\n" in text
+
+
+@pytest.mark.asyncio
+async def test_judge_metrics_endpoint():
+    class FakeQueue:
+        def __init__(self, **stats):
+            self._stats = stats
+
+        async def stats(self):
+            return self._stats
+
+    class FakeWorker:
+        def __init__(self, name, queue, in_flight, concurrency):
+            self.name, self.queue = name, queue
+            self.in_flight, self.concurrency = in_flight, concurrency
+
+    class FakeRedis:
+        async def hgetall(self, key):
+            assert key == "reuse"
+            return {b"judged": b"6", b"reused": b"3", b"coalesced": b"1"}
+
+    workers = [
+        FakeWorker("submit", FakeQueue(backend="stream", length=7, pending=2), 2, 4),
+        FakeWorker("run", FakeQueue(backend="stream", length=1, pending=1), 1, 2),
+    ]
+    judge_metrics = JudgeMetrics(workers, FakeRedis(), "reuse")
+    judge_metrics.observe_stage("compile", 0.3, "sub", "cpp")
+    judge_metrics.observe_stage("run", 0.02, "sub", "cpp")
+    judge_metrics.observe_job("failed", "cpp", ["OK", "WrongAnswer"])
+
+    server = await metrics.serve(judge_metrics.registry, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+        response = (await reader.read()).decode()
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert response.startswith("HTTP/1.0 200 OK")
+    assert 'judge_queue_depth{worker="submit",backend="stream"} 5' in response
+    assert 'judge_queue_depth{worker="run",backend="stream"} 0' in response
+    assert 'judge_queue_pending{worker="submit"} 2' in response
+    assert 'judge_jobs_in_flight{worker="submit"} 2' in response
+    assert 'judge_jobs_in_flight{worker="run"} 1' in response
+    assert 'judge_worker_slots{worker="run"} 2' in response
+    assert 'judge_compile_duration_seconds_count{language="cpp"} 1' in response
+    assert 'judge_stage_duration_seconds_count{stage="run"} 1' in response
+    assert 'judge_test_verdicts_total{language="cpp",verdict="WrongAnswer"} 1' in response
+    assert 'judge_jobs_total{language="cpp",status="failed"} 1' in response
+    assert 'judge_sandbox_processes{state="running"} 0' in response
+    assert 'judge_submission_reuse_total{outcome="reused"} 3' in response
+    assert "judge_submission_reuse_ratio 0.4" in response
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import pytest
+
+from judge_service.progress import ProgressPublisher
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.published = []
+        self.fail = fail
+
+    async def publish(self, channel, message):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.published.append((channel, json.loads(message)))
+
+
+@pytest.mark.asyncio
+async def test_fast_tests_are_coalesced():
+    redis = FakeRedis()
+    progress = ProgressPublisher(redis, "sub", total=50, interval_sec=0.2)
+
+    for idx in range(1, 51):
+        await progress.test_finished(idx, "OK", 1.5, 1024)
+    await progress.close()
+
+    messages = [m for _, m in redis.published]
+    # the first test goes out at once, the other 49 in the closing flush
+    assert [len(m["tests"]) for m in messages] == [1, 49]
+    assert messages[-1]["completed"] == 50 and messages[-1]["total"] == 50
+    assert [t["index"] for m in messages for t in m["tests"]] == list(range(1, 51))
+
+
+@pytest.mark.asyncio
+async def test_pending_tests_are_flushed_after_the_interval():
+    redis = FakeRedis()
+    progress = ProgressPublisher(redis, "sub", total=3, interval_sec=0.05)
+
+    await progress.test_finished(1, "OK", 1.0, 1)
+    await progress.test_finished(2, "OK", 1.0, 1)
+    await progress.test_finished(3, "WrongAnswer", 1.0, 1)
+    assert len(redis.published) == 1
+    await asyncio.sleep(0.1)
+
+    assert [[t["index"] for t in m["tests"]] for _, m in redis.published] == [[1], [2, 3]]
+    await progress.close()
+    assert len(redis.published) == 2
+
+
+@pytest.mark.asyncio
+async def test_zero_interval_publishes_every_test_and_compile_events():
+    redis = FakeRedis()
+    progress = ProgressPublisher(redis, "sub", total=2, interval_sec=0)
+
+    await progress.compile_started()
+    await progress.compile_finished(None, 12.345)
+    await progress.test_finished(1, "OK", 1.0, 1)
+    await progress.test_finished(2, "OK", 1.0, 1)
+    await progress.close()
+
+    messages = [m for _, m in redis.published]
+    assert messages[0] == {"event": "compile", "phase": "started"}
+    assert messages[1] == {"event": "compile", "phase": "finished", "verdict": None, "durationMs": 12.35}
+    assert [m["completed"] for m in messages[2:]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_publish_errors_do_not_propagate():
+    progress = ProgressPublisher(FakeRedis(fail=True), "sub", total=1, interval_sec=0)
+    await progress.compile_started()
+    await progress.test_finished(1, "OK", 1.0, 1)
+    await progress.close()
@@ -0,0 +1,81 @@
+import json
+import pytest
+
+from judge_service.config.config import config
+from judge_service.queue_backends import StreamQueue, get_queue, run_queue_key
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+
+    def xadd(self, key, fields):
+        self.redis.streams.setdefault(key, []).append(fields)
+
+    def xack(self, stream, group, entry_id):
+        self.redis.acked.append(entry_id)
+
+    def xdel(self, stream, entry_id):
+        pass
+
+    async def execute(self):
+        return []
+
+
+class FakeStreamRedis:
+    """A stream whose only entry was abandoned by consumers that kept dying."""
+
+    def __init__(self, job, deliveries):
+        self.abandoned = [(b"1-0", {b"job": json.dumps(job).encode()})]
+        self.deliveries = deliveries
+        self.streams = {}
+        self.acked = []
+
+    async def xgroup_create(self, stream, group, id="0", mkstream=False):
+        pass
+
+    async def xautoclaim(self, stream, group, consumer, min_idle_time, start_id, count):
+        entries, self.abandoned = self.abandoned[:count], self.abandoned[count:]
+        return [b"0-0", entries, []]
+
+    async def xpending_range(self, stream, group, min, max, count):
+        return [{"message_id": min, "times_delivered": self.deliveries}]
+
+    async def xreadgroup(self, group, consumer, streams, count, block):
+        return None
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.mark.asyncio
+async def test_dead_lettered_job_is_settled():
+    job = {"submissionId": "65f000000000000000000001"}
+    redis = FakeStreamRedis(job, deliveries=4)
+    settled = []
+
+    async def on_dead_letter(payload, deliveries):
+        settled.append((payload, deliveries))
+
+    queue = StreamQueue(
+        redis, stream="q:stream", group="judges", consumer="c1",
+        max_in_flight=1, claim_idle_ms=1000, max_deliveries=3,
+        on_dead_letter=on_dead_letter,
+    )
+    try:
+        assert await queue.dequeue(timeout=0.01) is None
+    finally:
+        await queue.close()
+
+    assert redis.acked == ["1-0"]
+    assert len(redis.streams["q:stream:dead"]) == 1
+    assert settled == [(job, 4)]
+
+
+def test_both_lanes_share_the_in_flight_bound(monkeypatch):
+    monkeypatch.setattr(config, "QUEUE_BACKEND", "stream")
+    monkeypatch.setattr(config, "STREAM_MAX_IN_FLIGHT", 3)
+    assert get_queue(None, 8).max_in_flight == 3
+    assert get_queue(None, 2, key=run_queue_key()).max_in_flight == 3
+    monkeypatch.setattr(config, "STREAM_MAX_IN_FLIGHT", 0)
+    assert get_queue(None, 2, key=run_queue_key()).max_in_flight == 2
@@ -1,9 +1,10 @@
 import asyncio
+import os
 import shutil
 import sys
 import pytest
 
-from sandbox import run_in_sandbox
+from sandbox import run_in_sandbox, compile_submission, run_compiled
 
 # Helpers for tool availability and platform checks
 has_gpp    = shutil.which("g++")    is not None
@@ -249,3 +250,216 @@ async def test_js_runtime_exception():
     )
     assert res["verdict"] == "RuntimeError"
     assert "error: fail" in res.get("stderr", "").lower()
+
+
+# ─── Compile-once / run-many ───────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_gpp, reason="g++ not on PATH")
+async def test_cpp_artifact_reused_across_runs():
+    code = r'''
+    #include <iostream>
+    int main() { long long a, b; std::cin >> a >> b; std::cout << a + b; }
+    '''
+    artifact = await compile_submission("cpp", code)
+    try:
+        assert artifact.ok
+        first = await run_compiled(artifact, "1 2", timeout_sec=2, memory_bytes=256 * 1024 * 1024)
+        second = await run_compiled(artifact, "40 2", timeout_sec=2, memory_bytes=256 * 1024 * 1024)
+        assert (first["stdout"], second["stdout"]) == ("3", "42")
+    finally:
+        workdir = artifact.workdir
+        artifact.cleanup()
+    assert artifact.workdir is None and not os.path.exists(workdir)
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_gpp, reason="g++ not on PATH")
+async def test_cpp_compile_error_short_circuits():
+    artifact = await compile_submission("cpp", "int main() { nope; }")
+    assert not artifact.ok
+    assert artifact.workdir is None
+    res = await run_compiled(artifact, "", timeout_sec=2, memory_bytes=256 * 1024 * 1024)
+    assert res["verdict"] == "CompilationError"
+    assert res["compiler_msg"]
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_python_sleep_is_cut_by_wall_cap_not_charged_as_cpu():
+    res = await run_in_sandbox(
+        "python", "import time\ntime.sleep(30)", "",
+        timeout_sec=0.2, memory_bytes=256 * 1024 * 1024
+    )
+    assert res["verdict"] == "TimeLimitExceeded"
+    assert res["cpu_time_ms"] < res["wall_time_ms"]
+    assert res["wall_time_ms"] < 10_000
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_python_reports_cpu_time_and_peak_memory():
+    code = "x = bytearray(40 * 1024 * 1024)\nprint(len(x))"
+    res = await run_in_sandbox(
+        "python", code, "",
+        timeout_sec=2, memory_bytes=256 * 1024 * 1024
+    )
+    assert res["verdict"] == "OK"
+    assert res["memory_bytes"] >= 40 * 1024 * 1024
+    assert res["runtime_ms"] == res["cpu_time_ms"] > 0
+    assert res["wall_time_ms"] > 0
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_limits_are_adjusted_per_node_and_language(monkeypatch):
+    import sandbox
+    monkeypatch.setitem(sandbox._SETTINGS, "speed_factor", 2.0)
+    monkeypatch.setitem(sandbox._SETTINGS, "time_multipliers", {"python": 5.0})
+    monkeypatch.setitem(sandbox._SETTINGS, "memory_overhead_bytes", {"python": 8 * 1024 * 1024})
+    # ~0.3s of CPU: over the raw 0.1s limit, within 0.1 * 2 * 5
+    code = "n = 0\nfor i in range(3_000_000):\n    n += i\nprint(n)"
+    res = await run_in_sandbox(
+        "python", code, "",
+        timeout_sec=0.1, memory_bytes=64 * 1024 * 1024
+    )
+    assert res["verdict"] == "OK"
+    assert res["time_limit_ms"] == 1000
+    assert res["memory_limit_bytes"] == 72 * 1024 * 1024
+
+
+def _alive(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            state = f.read().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return False
+    return state not in ("Z", "X")
+
+
+FORKING_PROGRAM = """
+import os, sys, time
+pid = os.fork()
+if pid == 0:
+    while True:
+        pass
+with open({pid_file!r}, "w") as f:
+    f.write(str(pid))
+{parent}
+"""
+
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+@pytest.mark.parametrize("parent, verdict", [
+    ("time.sleep(30)", "TimeLimitExceeded"),
+    ("print('done')", "OK"),
+])
+async def test_forked_children_are_killed_with_the_run(tmp_path, parent, verdict):
+    pid_file = str(tmp_path / "child.pid")
+    code = FORKING_PROGRAM.format(pid_file=pid_file, parent=parent)
+    res = await run_in_sandbox("python", code, "", timeout_sec=0.5, memory_bytes=256 * 1024 * 1024)
+    assert res["verdict"] == verdict
+    child = int(open(pid_file).read())
+    for _ in range(50):
+        if not _alive(child):
+            break
+        await asyncio.sleep(0.02)
+    assert not _alive(child)
+
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_runs_get_cpu_and_process_rlimits(monkeypatch):
+    import sandbox
+    monkeypatch.setitem(sandbox._SETTINGS, "max_processes", 4096)
+    code = (
+        "import os, resource\n"
+        "print(resource.getrlimit(resource.RLIMIT_CPU), resource.getrlimit(resource.RLIMIT_NPROC),\n"
+        "      os.getpgrp() == os.getpid())"
+    )
+    res = await run_in_sandbox("python", code, "", timeout_sec=1.5, memory_bytes=256 * 1024 * 1024)
+    assert res["verdict"] == "OK"
+    assert res["stdout"] == "(3, 4) (4096, 4096) True"
+
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_group_is_killed_before_its_leader_is_reaped(monkeypatch):
+    import sandbox
+    calls = []
+    real_kill_group, real_wait4 = sandbox._kill_group, os.wait4
+
+    def kill_group(pid):
+        calls.append("killpg")
+        real_kill_group(pid)
+
+    def wait4(pid, options):
+        calls.append("wait4")
+        return real_wait4(pid, options)
+    monkeypatch.setattr(sandbox, "_kill_group", kill_group)
+    monkeypatch.setattr(os, "wait4", wait4)
+    res = await run_in_sandbox("python", "print(1)", "", timeout_sec=1, memory_bytes=256 * 1024 * 1024)
+    assert res["verdict"] == "OK"
+    # once reaped, the group id may belong to someone else
+    assert calls == ["killpg", "wait4"]
+
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_run_reaped_elsewhere_is_an_error_not_a_clean_exit(monkeypatch):
+    real_wait4 = os.wait4
+
+    def reaped_by_someone_else(pid, options):
+        real_wait4(pid, options)
+        raise ChildProcessError(10, "No child processes")
+    monkeypatch.setattr(os, "wait4", reaped_by_someone_else)
+    with pytest.raises(ChildProcessError):
+        await run_in_sandbox("python", "print(1)", "", timeout_sec=1, memory_bytes=256 * 1024 * 1024)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not has_gpp, reason="g++ not on PATH")
+async def test_compile_timeout(monkeypatch):
+    import sandbox
+    monkeypatch.setitem(sandbox._SETTINGS, "compile_timeout_sec", 0.01)
+    artifact = await compile_submission("cpp", "#include <bits/stdc++.h>\nint main() {}")
+    assert artifact.verdict == "CompilationError"
+    assert "timed out" in artifact.compiler_msg
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_endless_output_is_killed(monkeypatch):
+    import sandbox
+    monkeypatch.setitem(sandbox._SETTINGS, "output_limit_bytes", 1024 * 1024)
+    code = "import sys\nwhile True:\n    sys.stdout.write('x' * 4096)"
+    res = await run_in_sandbox(
+        "python", code, "",
+        timeout_sec=5, memory_bytes=128 * 1024 * 1024
+    )
+    assert res["verdict"] == "OutputLimitExceeded"
+    assert res["stdout_bytes"] > 1024 * 1024
+    assert len(res["stdout"]) <= sandbox._SETTINGS["stdout_keep_bytes"]
+    assert res["wall_time_ms"] < 5000
+
+@pytest.mark.asyncio
+@skip_non_linux
+@pytest.mark.skipif(not has_python, reason="python3 not on PATH")
+async def test_stderr_is_capped_but_counted(monkeypatch):
+    import sandbox
+    monkeypatch.setitem(sandbox._SETTINGS, "stderr_keep_bytes", 100)
+    code = "import sys\nsys.stderr.write('e' * 100000)\nprint('done')"
+    res = await run_in_sandbox(
+        "python", code, "",
+        timeout_sec=2, memory_bytes=128 * 1024 * 1024
+    )
+    assert res["verdict"] == "OK"
+    assert res["stdout"].strip() == "done"
+    assert len(res["stderr"]) <= 100
+    assert res["stderr_bytes"] == 100000
@@ -0,0 +1,55 @@
+import httpx
+import pytest
+
+from judge_service.testcase_client import TestcaseCache, fetch_testcases
+
+CASES = [{"caseId": "a", "isRemote": False, "input": "1", "expectedOutput": "1"}]
+
+
+def _client(calls, etag='W/"p-1-all"'):
+    def handler(request):
+        calls.append(request.headers.get("if-none-match"))
+        if etag and request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        headers = {"ETag": etag} if etag else {}
+        return httpx.Response(200, json={"testCases": CASES}, headers=headers)
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_reuses_cached_set():
+    calls = []
+    cache = TestcaseCache(max_bytes=1024 * 1024, ttl_sec=60)
+    async with _client(calls) as client:
+        first = await fetch_testcases(client, "p", cache=cache)
+        second = await fetch_testcases(client, "p", cache=cache)
+    assert first == second == CASES
+    assert calls == [None, 'W/"p-1-all"']
+    assert cache.stats()["misses"] == 1 and cache.stats()["revalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_without_etag_entries_live_for_ttl():
+    calls = []
+    cache = TestcaseCache(max_bytes=1024 * 1024, ttl_sec=60)
+    async with _client(calls, etag=None) as client:
+        await fetch_testcases(client, "p", cache=cache)
+        await fetch_testcases(client, "p", cache=cache)
+    assert calls == [None]
+
+    expired = TestcaseCache(max_bytes=1024 * 1024, ttl_sec=0)
+    async with _client(calls, etag=None) as client:
+        await fetch_testcases(client, "p", cache=expired)
+        await fetch_testcases(client, "p", cache=expired)
+    assert len(calls) == 3
+
+
+def test_lru_respects_memory_cap():
+    cache = TestcaseCache(max_bytes=100, ttl_sec=60)
+    cache.put("a", None, CASES, 60)
+    cache.put("b", None, CASES, 30)
+    cache.get("a")
+    cache.put("c", None, CASES, 30)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 90
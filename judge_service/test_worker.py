@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+
+import judge_service.worker as worker_mod
+from judge_service.queue_backends import QueuedJob
+from judge_service.worker import JudgeWorker, resolve_concurrency
+
+
+def test_resolve_concurrency_explicit():
+    assert resolve_concurrency(3, 512 * 1024 * 1024) == 3
+
+
+def test_resolve_concurrency_auto_is_bounded_by_memory(monkeypatch):
+    monkeypatch.setattr(worker_mod, "_available_cpus", lambda: 16)
+    monkeypatch.setattr(worker_mod, "_available_memory_bytes", lambda: 4 * 1024)
+    assert resolve_concurrency(0, 1024) == 4
+    monkeypatch.setattr(worker_mod, "_available_memory_bytes", lambda: 0)
+    assert resolve_concurrency(0, 1024) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_jobs_concurrently(monkeypatch):
+    jobs = [{"submissionId": str(i)} for i in range(6)]
+    running = 0
+    peak = 0
+    done = []
+
+    acked = []
+
+    class FakeQueue:
+        async def dequeue(self, timeout):
+            if jobs:
+                return QueuedJob(jobs.pop(0))
+            worker.stop()
+            return None
+
+        async def ack(self, queued):
+            acked.append(queued.payload["submissionId"])
+
+        async def release(self, queued):
+            pass
+
+        async def close(self):
+            pass
+
+    async def fake_judge(job, engine, redis, http_client, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        done.append(job["submissionId"])
+
+    monkeypatch.setattr(worker_mod, "judge_job", fake_judge)
+
+    worker = JudgeWorker(None, None, None, FakeQueue(), concurrency=3)
+    await asyncio.wait_for(worker.run(), timeout=5)
+
+    assert sorted(done) == [str(i) for i in range(6)]
+    assert sorted(acked) == sorted(done)
+    assert peak == 3
+    assert worker.in_flight == 0
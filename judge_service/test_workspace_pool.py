@@ -0,0 +1,65 @@
+import os
+import shutil
+import sys
+import pytest
+
+from judge_service.workspace_pool import WorkspacePool
+from judge_service.sandbox import compile_submission, run_compiled, run_in_sandbox
+
+has_python = shutil.which("python3") is not None
+is_linux   = sys.platform.startswith("linux")
+
+
+def test_workspaces_are_scrubbed_and_reused(tmp_path):
+    pool = WorkspacePool(str(tmp_path / "ws"), size=1, max_workspace_bytes=1024)
+    ws = pool.acquire()
+    assert ws.pooled
+    os.makedirs(os.path.join(ws.path, "sub"))
+    with open(os.path.join(ws.path, "sub", "f"), "w") as f:
+        f.write("x")
+    pool.release(ws)
+
+    again = pool.acquire()
+    assert again.path == ws.path
+    assert os.listdir(again.path) == []
+
+
+def test_falls_back_to_disk_when_exhausted(tmp_path):
+    pool = WorkspacePool(str(tmp_path / "ws"), size=1, max_workspace_bytes=1024,
+                         fallback_dir=str(tmp_path))
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first.pooled and not second.pooled
+    assert os.path.dirname(second.path) == str(tmp_path)
+    pool.release(second)
+    assert not os.path.exists(second.path)
+    assert pool.stats()["fallbacks"] == 1
+
+
+def test_pool_is_capped_by_filesystem_size(tmp_path):
+    st = os.statvfs(str(tmp_path))
+    total = st.f_blocks * st.f_frsize
+    pool = WorkspacePool(str(tmp_path / "ws"), size=10, max_workspace_bytes=total // 2)
+    assert pool.size == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (has_python and is_linux), reason="python3 on Linux required")
+async def test_sandbox_runs_in_pooled_workspace(tmp_path):
+    pool = WorkspacePool(str(tmp_path / "ws"), size=1, max_workspace_bytes=1024 * 1024)
+    res = await run_in_sandbox("python", "print(6 * 7)", "", timeout_sec=2,
+                               memory_bytes=256 * 1024 * 1024, workspaces=pool)
+    assert res["verdict"] == "OK" and res["stdout"] == "42"
+    assert res["setup_ms"] > 0 and res["teardown_ms"] > 0
+    assert pool.stats()["free"] == 1
+
+    # files are capped at the per-workspace size
+    artifact = await compile_submission(
+        "python", "open('big', 'wb').write(b'x' * (2 * 1024 * 1024))", workspaces=pool
+    )
+    try:
+        res = await run_compiled(artifact, "", timeout_sec=2, memory_bytes=256 * 1024 * 1024)
+    finally:
+        artifact.cleanup()
+    assert res["verdict"] != "OK"
+    assert os.listdir(pool.acquire().path) == []
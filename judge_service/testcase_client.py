@@ -1,17 +1,83 @@
+import time
 import httpx
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
 import logging
 
 from judge_service.config.config import config
 
 logger = logging.getLogger(__name__)
 
+
+class _CachedSet(NamedTuple):
+    etag: Optional[str]
+    testcases: List[Dict[str, Any]]
+    fetched_at: float
+    size: int
+
+
+class TestcaseCache:
+    """
+    In-memory LRU of test-case sets per problem, bounded by `max_bytes` of
+    response payload. Entries carrying an ETag are revalidated with a
+    conditional GET on every use (a 304 costs the Platform one indexed
+    lookup); entries without one are trusted for `ttl_sec`. If revalidation
+    fails, an entry younger than `ttl_sec` is still served.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, max_bytes: int, ttl_sec: float):
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._entries: "OrderedDict[str, _CachedSet]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0, "stale_served": 0}
+
+    def get(self, problem_id: str) -> Optional[_CachedSet]:
+        entry = self._entries.get(problem_id)
+        if entry is not None:
+            self._entries.move_to_end(problem_id)
+        return entry
+
+    def is_fresh(self, entry: _CachedSet) -> bool:
+        return time.monotonic() - entry.fetched_at < self.ttl_sec
+
+    def touch(self, problem_id: str, entry: _CachedSet) -> None:
+        self._entries[problem_id] = entry._replace(fetched_at=time.monotonic())
+
+    def put(self, problem_id: str, etag: Optional[str],
+            testcases: List[Dict[str, Any]], size: int) -> None:
+        self.discard(problem_id)
+        if size > self.max_bytes:
+            return
+        self._entries[problem_id] = _CachedSet(etag, testcases, time.monotonic(), size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_id, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            logger.debug("Evicted test cases of problem %s from cache", old_id)
+
+    def discard(self, problem_id: str) -> None:
+        old = self._entries.pop(problem_id, None)
+        if old is not None:
+            self._bytes -= old.size
+
+    def record(self, event: str) -> None:
+        self._stats[event] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
+
+
 async def fetch_testcases(
     client: httpx.AsyncClient,
-    problem_id: str
+    problem_id: str,
+    cache: Optional[TestcaseCache] = None,
 ) -> List[Dict[str, Any]]:
     """
     Fetches the list of test cases for the given problem ID.
+    With a `cache`, unchanged sets are served from memory after a 304.
     """
     # Entry log
     logger.info("Starting fetch_testcases for problem_id=%s", problem_id)
@@ -20,12 +86,34 @@ async def fetch_testcases(
     url = config.TESTCASE_API_FORMAT.format(problemId=problem_id)
     logger.debug("Testcases URL: %s", url)
 
+    cached = cache.get(problem_id) if cache else None
+    headers = {}
+    if cached is not None:
+        if cached.etag is None and cache.is_fresh(cached):
+            cache.record("hits")
+            logger.info("Serving %d cached test cases for problem_id=%s", len(cached.testcases), problem_id)
+            return cached.testcases
+        if cached.etag is not None:
+            headers["If-None-Match"] = cached.etag
+
     # Send request
     try:
-        resp = await client.get(url)
+        resp = await client.get(url, headers=headers)
         logger.debug("HTTP GET to %s returned status %d", url, resp.status_code)
+        if resp.status_code == httpx.codes.NOT_MODIFIED and cached is not None:
+            cache.touch(problem_id, cached)
+            cache.record("revalidated")
+            logger.info("Test cases for problem_id=%s not modified, using cache", problem_id)
+            return cached.testcases
         resp.raise_for_status()
     except Exception as e:
+        if cached is not None and cache.is_fresh(cached):
+            cache.record("stale_served")
+            logger.warning(
+                "Revalidation failed for problem_id=%s (%s), serving cached test cases",
+                problem_id, e
+            )
+            return cached.testcases
         logger.error(
             "HTTP error fetching testcases for problem_id=%s: %s",
             problem_id, e, exc_info=True
@@ -46,6 +134,11 @@ async def fetch_testcases(
         )
         raise
 
+    testcases = data['testCases']
+    if cache is not None:
+        cache.record("misses")
+        cache.put(problem_id, resp.headers.get("etag"), testcases, len(resp.content))
+
     # Completion log
     logger.info("Completed fetch_testcases for problem_id=%s", problem_id)
-    return data['testCases']
+    return testcases
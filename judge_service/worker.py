@@ -0,0 +1,178 @@
+import asyncio
+import os
+import logging
+from typing import List, Optional, Set
+
+import httpx
+from odmantic import AIOEngine
+from redis.asyncio import Redis
+
+from judge_service.config.config import config
+from judge_service.config.logging_config import set_request_id
+from judge_service.job_processor import judge_job
+
+logger = logging.getLogger(__name__)
+
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _available_memory_bytes() -> Optional[int]:
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available)
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def resolve_concurrency(requested: int, slot_memory_bytes: int) -> int:
+    """
+    Number of job slots for this worker.
+    A positive `requested` value is used as-is; 0 means "auto", i.e. one slot
+    per usable CPU, capped by how many `slot_memory_bytes` fit in free memory.
+    """
+    if requested > 0:
+        return requested
+
+    cpus = _available_cpus()
+    slots = cpus
+    free = _available_memory_bytes()
+    if free is not None and slot_memory_bytes > 0:
+        slots = min(slots, free // slot_memory_bytes)
+    slots = max(1, slots)
+    logger.info(
+        "Auto-sized worker concurrency: cpus=%d free_memory=%s slot_memory=%d -> %d slots",
+        cpus, free, slot_memory_bytes, slots
+    )
+    return slots
+
+
+def resolve_test_parallelism(requested: int, concurrency: int) -> int:
+    """
+    How many test cases of one submission may run at once.
+    0 means "auto": split the usable CPUs evenly between the job slots.
+    """
+    if requested > 0:
+        return requested
+    return max(1, _available_cpus() // max(1, concurrency))
+
+
+class JudgeWorker:
+    """
+    Runs up to `concurrency` judge jobs at once over shared Mongo, Redis and
+    HTTP clients. A job is only dequeued once a slot is free, so queued work
+    stays visible to other workers instead of piling up in this process.
+    `queue` is one of the backends in queue_backends; jobs are acked there
+    once judged and released (left for redelivery) when judging failed.
+    """
+
+    def __init__(
+        self,
+        engine: AIOEngine,
+        redis: Redis,
+        http_client: httpx.AsyncClient,
+        queue,
+        concurrency: int = 1,
+        test_parallelism: int = 1,
+        name: str = "slot",
+    ):
+        self.engine = engine
+        self.redis = redis
+        self.http_client = http_client
+        self.queue = queue
+        self.concurrency = concurrency
+        self.test_parallelism = test_parallelism
+        self.name = name  # tags log lines: "<name>-<slot>:<submission id>"
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._free_slots: List[int] = list(range(concurrency, 0, -1))
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def stop(self) -> None:
+        """Stop taking new jobs; in-flight jobs are drained by run()."""
+        if not self._stopping.is_set():
+            logger.warning("Stop requested, no new jobs will be taken")
+            self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info(
+            "Judge Worker (%s) running with %d slot(s), %d parallel test(s) per job",
+            self.name,
+            self.concurrency, self.test_parallelism
+        )
+        try:
+            await self._poll()
+        finally:
+            await self._drain()
+            await self.queue.close()
+
+    async def _poll(self) -> None:
+        while not self._stopping.is_set():
+            await self._semaphore.acquire()
+            slot = self._free_slots.pop()
+            try:
+                logger.debug("Slot %d: polling for next job from Redis queue", slot)
+                queued = await self.queue.dequeue(config.QUEUE_POLL_TIMEOUT_SEC)
+            except BaseException:
+                self._release(slot)
+                raise
+
+            if queued is None:
+                self._release(slot)
+                continue
+
+            task = asyncio.create_task(self._run_slot(slot, queued))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_slot(self, slot: int, queued) -> None:
+        job = queued.payload
+        # tasks copy the context, so this only tags log lines of this job
+        set_request_id(f"{self.name}-{slot}:{job.get('submissionId', '-')}")
+        try:
+            await judge_job(
+                job, self.engine, self.redis, self.http_client,
+                test_parallelism=self.test_parallelism,
+            )
+            await self.queue.ack(queued)
+            logger.info("Slot %d: job processed successfully", slot)
+        except asyncio.CancelledError:
+            logger.warning("Slot %d: job cancelled during shutdown", slot)
+            await self.queue.release(queued)
+            raise
+        except Exception as job_err:
+            logger.exception("Slot %d: error processing job: %s", slot, job_err)
+            await self.queue.release(queued)
+        finally:
+            self._release(slot)
+
+    def _release(self, slot: int) -> None:
+        self._free_slots.append(slot)
+        self._semaphore.release()
+
+    async def _drain(self) -> None:
+        if not self._tasks:
+            return
+        logger.info(
+            "Waiting up to %.1fs for %d in-flight job(s)",
+            config.SHUTDOWN_GRACE_SEC, len(self._tasks)
+        )
+        _, pending = await asyncio.wait(set(self._tasks), timeout=config.SHUTDOWN_GRACE_SEC)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning("Cancelled %d job(s) that did not finish in time", len(pending))
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Workspace:
+    """A directory a submission is compiled and run in."""
+
+    def __init__(self, path: str, pooled: bool):
+        self.path = path
+        self.pooled = pooled  # False: one-off directory on disk
+
+
+class WorkspacePool:
+    """
+    Fixed set of workspace directories under `root`, meant to be a tmpfs
+    mount, reused across submissions instead of mkdtemp/rmtree on the root
+    filesystem for every one.
+
+    - At most `size` workspaces exist, and no more than the filesystem can
+      hold at `max_workspace_bytes` each.
+    - A workspace is scrubbed (emptied, the directory itself kept) when it
+      is released.
+    - When every workspace is taken, or the filesystem has less than
+      `max_workspace_bytes` free, `acquire` falls back to a temporary
+      directory on disk (`fallback_dir`, default: the system temp dir).
+
+    Callers should also cap file sizes at `max_workspace_bytes` (the sandbox
+    sets RLIMIT_FSIZE) so one run cannot fill the mount.
+    """
+
+    def __init__(self, root: str, size: int, max_workspace_bytes: int,
+                 fallback_dir: Optional[str] = None):
+        self.root = root
+        self.max_workspace_bytes = max_workspace_bytes
+        self.fallback_dir = fallback_dir
+        os.makedirs(root, exist_ok=True)
+
+        capacity = self._fs_total_bytes() // max_workspace_bytes if max_workspace_bytes else size
+        if capacity < size:
+            logger.warning(
+                "Workspace pool %s holds only %d x %d bytes, shrinking pool from %d",
+                root, capacity, max_workspace_bytes, size
+            )
+        self.size = max(0, min(size, capacity))
+
+        self._free: List[str] = []
+        for i in range(self.size):
+            path = os.path.join(root, f"ws-{i}")
+            os.makedirs(path, exist_ok=True)
+            self._scrub(path)
+            self._free.append(path)
+        self._stats = {"acquired": 0, "fallbacks": 0, "discarded": 0}
+        logger.info("Workspace pool ready: %d workspace(s) under %s", self.size, root)
+
+    def acquire(self) -> Workspace:
+        if self._free and self._fs_free_bytes() >= self.max_workspace_bytes:
+            self._stats["acquired"] += 1
+            return Workspace(self._free.pop(), pooled=True)
+
+        self._stats["fallbacks"] += 1
+        logger.info("Workspace pool exhausted or full, using a disk workspace")
+        return Workspace(tempfile.mkdtemp(prefix="sandbox_", dir=self.fallback_dir), pooled=False)
+
+    def release(self, workspace: Workspace) -> None:
+        if not workspace.pooled:
+            shutil.rmtree(workspace.path, ignore_errors=True)
+            return
+        try:
+            self._scrub(workspace.path)
+        except OSError as e:
+            # something we cannot delete is left behind: retire the directory
+            logger.error("Could not scrub workspace %s, retiring it: %s", workspace.path, e)
+            self._stats["discarded"] += 1
+            return
+        self._free.append(workspace.path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "size": self.size,
+            "free": len(self._free),
+            "fs_free_bytes": self._fs_free_bytes(),
+        }
+
+    # ─── internals ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _scrub(path: str) -> None:
+        os.chmod(path, 0o700)
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+
+    def _fs_free_bytes(self) -> int:
+        st = os.statvfs(self.root)
+        return st.f_bavail * st.f_frsize
+
+    def _fs_total_bytes(self) -> int:
+        st = os.statvfs(self.root)
+        return st.f_blocks * st.f_frsize